@@ -0,0 +1,33 @@
+"""Add allocation sequence counter table for block id reservation.
+
+Revision ID: 008_allocation_sequences
+Revises: 007_manager_tables
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "008_allocation_sequences"
+down_revision = "007_manager_tables"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "allocation_sequences",
+        sa.Column("name", sa.String(length=64), primary_key=True),
+        sa.Column("last_value", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.CheckConstraint("last_value >= 0", name="ck_allocation_sequence_non_negative"),
+    )
+    op.execute(
+        "INSERT INTO allocation_sequences (name, last_value) "
+        "SELECT 'allocations', COALESCE(MAX(allocation_id), 0) FROM allocations"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("allocation_sequences")
@@ -0,0 +1,58 @@
+"""Add (ts, id) keyset indexes for audit event listing.
+
+Revision ID: 009_audit_keyset_indexes
+Revises: 008_allocation_sequences
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+from alembic import op
+from sqlalchemy import text
+from zoneinfo import ZoneInfo
+
+from sma.audit.partitioning import FILTER_INDEX_COLUMNS, ensure_monthly_partition_indexes
+
+
+revision = "009_audit_keyset_indexes"
+down_revision = "008_allocation_sequences"
+branch_labels = None
+depends_on = None
+
+_TZ = ZoneInfo("Asia/Tehran")
+_INDEXES = {
+    "ix_audit_events_ts_id": ["ts", "id"],
+    "ix_audit_events_center_ts_id": ["center_scope", "ts", "id"],
+    "ix_audit_events_action_ts_id": ["action", "ts", "id"],
+    "ix_audit_events_outcome_ts_id": ["outcome", "ts", "id"],
+}
+
+
+def upgrade() -> None:
+    for name, columns in _INDEXES.items():
+        op.create_index(name, "audit_events", columns, if_not_exists=True)
+    # Same window as 006; existing month indexes are skipped, the per-filter ones are added.
+    bind = op.get_bind()
+    now = datetime.now(tz=_TZ)
+    start = now.replace(year=now.year - 2, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = now.replace(month=now.month, day=1, hour=0, minute=0, second=0, microsecond=0)
+    ensure_monthly_partition_indexes(bind, start=start, end=end)
+
+
+def downgrade() -> None:
+    for name in _INDEXES:
+        op.drop_index(name, table_name="audit_events", if_exists=True)
+    # Only the per-filter month indexes are new here; the plain ones belong to 006.
+    bind = op.get_bind()
+    rows = bind.execute(
+        text(
+            """
+            SELECT name FROM sqlite_master
+            WHERE type='index' AND name LIKE 'ix_audit_events_month_%'
+            """
+        )
+    )
+    suffixes = tuple(f"_{column}" for column in FILTER_INDEX_COLUMNS)
+    for name in [row[0] for row in rows if row[0].endswith(suffixes)]:
+        op.drop_index(name, table_name="audit_events", if_exists=True)
@@ -6,11 +6,20 @@ import json
 import logging
 import os
 import sys
+from typing import Callable
 
+from prometheus_client import start_http_server
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
-from sma.phase3_allocation.outbox import OutboxDispatcher, Publisher, SystemClock
+from sma.phase3_allocation.outbox import (
+    AdaptivePolling,
+    OutboxDispatcher,
+    OutboxDrainWorker,
+    OutboxWorkerMetrics,
+    Publisher,
+    SystemClock,
+)
 
 
 logger = logging.getLogger("outbox_dispatcher")
@@ -32,23 +41,62 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Dispatcher outbox")
     parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///allocation.db"))
     parser.add_argument("--once", action="store_true", help="یکبار اجرا شود")
-    parser.add_argument("--sleep", type=float, default=1.0, help="فاصله بررسی در حالت حلقه")
+    parser.add_argument("--sleep", type=float, default=1.0, help="بیشینه فاصله بررسی در حالت حلقه")
+    parser.add_argument("--batch-size", type=int, default=50, help="اندازه دسته ارسال")
+    parser.add_argument("--max-in-flight", type=int, default=1, help="تعداد انتشار همزمان")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=int(os.environ.get("OUTBOX_METRICS_PORT", "0")),
+        help="پورت خروجی Prometheus برای حالت حلقه (۰ یعنی غیرفعال)",
+    )
     return parser.parse_args(argv)
 
 
+def build_worker(
+    args: argparse.Namespace,
+    session_factory: Callable[[], Session],
+    *,
+    metrics: OutboxWorkerMetrics | None = None,
+) -> OutboxDrainWorker:
+    """Build the drain worker with backlog metrics on the default registry."""
+
+    return OutboxDrainWorker(
+        session_factory,
+        StdoutPublisher(),
+        clock=SystemClock(),
+        batch_size=args.batch_size,
+        max_in_flight=args.max_in_flight,
+        polling=AdaptivePolling(max_seconds=max(args.sleep, 0.05)),
+        metrics=metrics or OutboxWorkerMetrics(),
+    )
+
+
 def main(argv: list[str] | None = None) -> int:
     args = parse_args(argv or sys.argv[1:])
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
     engine = create_engine(args.database_url, future=True)
     SessionFactory = sessionmaker(bind=engine, expire_on_commit=False, future=True)
+    if not args.once:
+        metrics = OutboxWorkerMetrics()
+        if args.metrics_port:
+            start_http_server(args.metrics_port, registry=metrics.registry)
+        worker = build_worker(args, SessionFactory, metrics=metrics)
+        try:
+            worker.run()
+        except KeyboardInterrupt:  # pragma: no cover - interactive stop
+            pass
+        return 0
     session = SessionFactory()
     try:
         dispatcher = OutboxDispatcher(
             session=session,
             publisher=StdoutPublisher(),
             clock=SystemClock(),
+            batch_size=args.batch_size,
+            max_in_flight=args.max_in_flight,
         )
-        dispatcher.run_loop(once=args.once, sleep=args.sleep)
+        dispatcher.run_loop(once=True)
         return 0
     except Exception as exc:  # pragma: no cover - CLI guard
         logger.error("اجرای دیسپچر با خطا متوقف شد", extra={"کد": "DISPATCHER_ERROR", "جزئیات": str(exc)})
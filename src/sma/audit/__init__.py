@@ -6,10 +6,11 @@ from .service import AuditService, AuditEventRecord
 from .api import create_audit_api
 from .exporter import AuditExporter
 from .hooks import audited_config_parse, record_config_rejected
-from .repository import AuditRepository, AuditQuery
+from .repository import AuditCursor, AuditRepository, AuditQuery
 from .release_manifest import ReleaseManifest
 from .retention import AuditArchiveConfig, AuditArchiver, AuditRetentionEnforcer
 from .security import AuditSignedURLProvider
+from .writer import AuditWriteBehindConfig
 
 __all__ = [
     "AuditAction",
@@ -19,6 +20,7 @@ __all__ = [
     "AuditEventRecord",
     "AuditRepository",
     "AuditQuery",
+    "AuditCursor",
     "AuditExporter",
     "ReleaseManifest",
     "AuditArchiver",
@@ -26,6 +28,7 @@ __all__ = [
     "AuditArchiveConfig",
     "create_audit_api",
     "AuditSignedURLProvider",
+    "AuditWriteBehindConfig",
     "record_config_rejected",
     "audited_config_parse",
 ]
@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import date, datetime, time
 from pathlib import Path
@@ -18,9 +20,10 @@ from starlette.responses import JSONResponse as StarletteJSONResponse
 
 from .enums import AuditAction, AuditActorRole, AuditOutcome
 from .exporter import AuditExporter
-from .repository import AuditQuery
+from .repository import AuditCursor, AuditQuery
 from .security import AuditSignedURLProvider, SignedURLVerifier
-from .service import AuditService
+from .service import AuditEventRecord, AuditService
+from .writer import AuditWriteBehindConfig
 
 _FA_TO_EN = str.maketrans("۰۱۲۳۴۵۶۷۸۹", "0123456789")
 
@@ -40,6 +43,7 @@ class AuditListParams(BaseModel):
     outcome: AuditOutcome | None = None
     page: int = Field(default=1, ge=1, le=200)
     page_size: int = Field(default=50, ge=1, le=500)
+    cursor: str | None = Field(default=None, max_length=128)
 
     @field_validator("center")
     @classmethod
@@ -209,7 +213,7 @@ class _AuditAuthMiddleware(BaseHTTPMiddleware):
         if self._service is None:
             return
         actor_role = role or AuditActorRole.ADMIN
-        await self._service.record_event(
+        await self._service.submit_event(
             actor_role=actor_role,
             center_scope=center,
             action=AuditAction.AUTHN_OK if outcome is AuditOutcome.OK else AuditAction.AUTHN_FAIL,
@@ -231,7 +235,10 @@ def create_audit_api(
     rate_limit_per_minute: int = 120,
     rate_limit_window_seconds: int = 60,
     idempotency_ttl_seconds: int = 86_400,
+    write_behind: AuditWriteBehindConfig | None = None,
 ) -> FastAPI:
+    if write_behind is not None:
+        service.enable_write_behind(write_behind)
     signer = signer or AuditSignedURLProvider(secret_key or "audit-secret", clock=service.now)
     router = APIRouter()
     templates = Jinja2Templates(directory=str(Path(__file__).parent / "templates"))
@@ -323,6 +330,7 @@ def create_audit_api(
                 for event in events
             ],
             "count": len(events),
+            "next_cursor": _next_cursor(events, params.page_size),
         }
         return JSONResponse(payload)
 
@@ -389,7 +397,14 @@ def create_audit_api(
         data = generate_latest(service.metrics_registry).decode("utf-8")
         return PlainTextResponse(data, media_type="text/plain; version=0.0.4")
 
-    app = FastAPI()
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            await service.aclose()
+
+    app = FastAPI(lifespan=lifespan)
     app.state.audit_service = service
     app.state.audit_signer = signer
     app.include_router(router)
@@ -416,6 +431,7 @@ def _build_query(service: AuditService, params: AuditListParams, principal: Prin
     to_ts = _combine(service, params.to_date, time.max)
     role = params.role or principal.role
     center = params.center or principal.center_scope
+    after = _decode_cursor(params.cursor) if params.cursor else None
     return AuditQuery(
         from_ts=from_ts,
         to_ts=to_ts,
@@ -424,10 +440,30 @@ def _build_query(service: AuditService, params: AuditListParams, principal: Prin
         center_scope=center,
         outcome=params.outcome,
         limit=params.page_size,
-        offset=(params.page - 1) * params.page_size,
+        offset=0 if after is not None else (params.page - 1) * params.page_size,
+        after=after,
     )
 
 
+def _decode_cursor(token: str) -> AuditCursor:
+    try:
+        return AuditCursor.decode(token)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail={"error_code": "AUDIT_VALIDATION_ERROR", "message": "نشانگر صفحه نامعتبر است."},
+        ) from exc
+
+
+def _next_cursor(events: list[AuditEventRecord], page_size: int) -> str | None:
+    """Keyset token for the page after ``events``; ``None`` on the last page."""
+
+    if len(events) < page_size:
+        return None
+    last = events[-1]
+    return AuditCursor(ts=last.ts, id=last.id).encode()
+
+
 def _combine(service: AuditService, day: date | None, default_time: time) -> datetime | None:
     if day is None:
         return None
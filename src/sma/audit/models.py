@@ -48,6 +48,11 @@ class AuditEvent(Base):
     __table_args__ = (
         Index("ix_audit_events_ts_action", "ts", "action"),
         Index("ix_audit_events_actor_center_ts", "actor_role", "center_scope", "ts"),
+        # Keyset pagination walks (ts, id) descending, optionally behind one equality filter.
+        Index("ix_audit_events_ts_id", "ts", "id"),
+        Index("ix_audit_events_center_ts_id", "center_scope", "ts", "id"),
+        Index("ix_audit_events_action_ts_id", "action", "ts", "id"),
+        Index("ix_audit_events_outcome_ts_id", "outcome", "ts", "id"),
         {"sqlite_autoincrement": True},
     )
 
@@ -10,6 +10,8 @@ from sqlalchemy.engine import Connection, Engine
 from zoneinfo import ZoneInfo
 
 _TZ = ZoneInfo("Asia/Tehran")
+# Equality filters exposed by ``/audit``; each gets a (column, ts, id) index per month.
+FILTER_INDEX_COLUMNS = ("center_scope", "action", "outcome")
 
 
 @dataclass(slots=True)
@@ -41,7 +43,11 @@ def iter_months(start: datetime, end: datetime, *, tz: ZoneInfo = _TZ) -> Iterab
 
 
 def ensure_monthly_partition_indexes(engine: Engine | Connection, *, start: datetime, end: datetime) -> list[str]:
-    """Create partial indexes per month to emulate partitioning under SQLite tests."""
+    """Create partial indexes per month to emulate partitioning under SQLite tests.
+
+    Besides the plain ``ts`` index, every month gets a ``(column, ts, id)`` index for
+    each of :data:`FILTER_INDEX_COLUMNS` so filtered keyset pages seek instead of scanning the month.
+    """
 
     plans = list(iter_months(start, end))
     created: list[str] = []
@@ -51,39 +57,43 @@ def ensure_monthly_partition_indexes(engine: Engine | Connection, *, start: date
     else:
         connection = engine.connect()
         should_close = True
-    transaction = connection.begin()
+    # Alembic hands over a connection that is already inside its transaction.
+    transaction = None if connection.in_transaction() else connection.begin()
     try:
         dialect = connection.dialect.name
         for plan in plans:
             idx_name = f"ix_audit_events_month_{plan.month_key}"
-            if dialect == "sqlite":
-                start_literal = plan.start.isoformat()
-                end_literal = plan.end.isoformat()
-                stmt = text(
-                    f"""
-                    CREATE INDEX IF NOT EXISTS {idx_name}
-                    ON audit_events(ts)
-                    WHERE ts >= '{start_literal}' AND ts < '{end_literal}'
-                    """
-                )
-                connection.execute(stmt)
-                created.append(idx_name)
-                continue
-            else:
-                stmt = text(
-                    f"""
-                    CREATE INDEX IF NOT EXISTS {idx_name}
-                    ON audit_events(ts)
-                    WHERE ts >= :start AND ts < :end
-                    """
-                )
-            connection.execute(stmt, {"start": plan.start, "end": plan.end})
-            created.append(idx_name)
+            targets = [(idx_name, "ts")] + [
+                (f"{idx_name}_{column}", f"{column}, ts, id") for column in FILTER_INDEX_COLUMNS
+            ]
+            for name, columns in targets:
+                if dialect == "sqlite":
+                    start_literal = plan.start.isoformat()
+                    end_literal = plan.end.isoformat()
+                    stmt = text(
+                        f"""
+                        CREATE INDEX IF NOT EXISTS {name}
+                        ON audit_events({columns})
+                        WHERE ts >= '{start_literal}' AND ts < '{end_literal}'
+                        """
+                    )
+                    connection.execute(stmt)
+                else:
+                    stmt = text(
+                        f"""
+                        CREATE INDEX IF NOT EXISTS {name}
+                        ON audit_events({columns})
+                        WHERE ts >= :start AND ts < :end
+                        """
+                    )
+                    connection.execute(stmt, {"start": plan.start, "end": plan.end})
+                created.append(name)
     finally:
-        transaction.commit()
+        if transaction is not None:
+            transaction.commit()
         if should_close:
             connection.close()
     return created
 
 
-__all__ = ["ensure_monthly_partition_indexes", "PartitionPlan", "iter_months", "month_key"]
+__all__ = ["FILTER_INDEX_COLUMNS", "ensure_monthly_partition_indexes", "PartitionPlan", "iter_months", "month_key"]
@@ -2,11 +2,15 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import binascii
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass, asdict
 from datetime import datetime
-from typing import AsyncIterator
+from typing import AsyncIterator, Sequence
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, insert, literal, select, tuple_
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import DBAPIError, OperationalError
 from sqlalchemy.orm import Session, sessionmaker
@@ -31,6 +35,27 @@ class AuditEventCreate:
     artifact_sha256: str | None
 
 
+@dataclass(slots=True, frozen=True)
+class AuditCursor:
+    """Keyset position ``(ts, id)`` of the last row on a page."""
+
+    ts: datetime
+    id: int
+
+    def encode(self) -> str:
+        raw = f"{self.ts.isoformat()}|{self.id}".encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "AuditCursor":
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("utf-8")
+            ts_raw, id_raw = raw.split("|", 1)
+            return cls(ts=datetime.fromisoformat(ts_raw), id=int(id_raw))
+        except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+            raise ValueError("AUDIT_VALIDATION_ERROR: نشانگر صفحه نامعتبر است") from exc
+
+
 @dataclass(slots=True)
 class AuditQuery:
     from_ts: datetime | None = None
@@ -41,6 +66,7 @@ class AuditQuery:
     outcome: AuditOutcome | None = None
     limit: int | None = 200
     offset: int = 0
+    after: AuditCursor | None = None
 
 
 class AuditRepository:
@@ -53,6 +79,8 @@ class AuditRepository:
         replica: Engine | None = None,
         retry_attempts: int = 4,
         base_delay: float = 0.05,
+        stream_batch_size: int = 1_000,
+        stream_queue_size: int = 4,
     ) -> None:
         self._writer_engine = writer
         self._replica_engine = replica or writer
@@ -60,6 +88,8 @@ class AuditRepository:
         self._reader_factory: sessionmaker[Session] = sessionmaker(bind=self._replica_engine, expire_on_commit=False)
         self._retry_attempts = retry_attempts
         self._base_delay = base_delay
+        self._stream_batch_size = max(1, stream_batch_size)
+        self._stream_queue_size = max(1, stream_queue_size)
 
     async def init(self) -> None:
         await asyncio.to_thread(Base.metadata.create_all, self._writer_engine)
@@ -86,6 +116,31 @@ class AuditRepository:
             retry_exceptions=(OperationalError, DBAPIError),
         )
 
+    async def insert_many(self, payloads: Sequence[AuditEventCreate], *, rid: str) -> list[int]:
+        """Persist ``payloads`` with one multi-row INSERT and a single commit."""
+
+        if not payloads:
+            return []
+        rows = [asdict(payload) for payload in payloads]
+
+        def _sync_insert() -> list[int]:
+            with self._writer_factory() as session:
+                stmt = insert(AuditEvent).returning(AuditEvent.id, sort_by_parameter_order=True)
+                event_ids = list(session.scalars(stmt, rows))
+                session.commit()
+                return event_ids
+
+        async def _op() -> list[int]:
+            return await asyncio.to_thread(_sync_insert)
+
+        return await retry_async(
+            _op,
+            attempts=self._retry_attempts,
+            base_delay=self._base_delay,
+            rid=rid,
+            retry_exceptions=(OperationalError, DBAPIError),
+        )
+
     async def fetch_one(self, event_id: int) -> AuditEvent | None:
         def _sync_fetch() -> AuditEvent | None:
             with self._reader_factory() as session:
@@ -94,21 +149,20 @@ class AuditRepository:
         return await asyncio.to_thread(_sync_fetch)
 
     async def fetch_many(self, query: AuditQuery) -> list[AuditEvent]:
+        """Return events newest first, paging by ``query.after`` (keyset) or offset."""
+
         def _sync_fetch() -> list[AuditEvent]:
             with self._reader_factory() as session:
-                stmt = select(AuditEvent).order_by(AuditEvent.ts.desc())
-                if query.from_ts is not None:
-                    stmt = stmt.where(AuditEvent.ts >= query.from_ts)
-                if query.to_ts is not None:
-                    stmt = stmt.where(AuditEvent.ts <= query.to_ts)
-                if query.actor_role is not None:
-                    stmt = stmt.where(AuditEvent.actor_role == query.actor_role)
-                if query.action is not None:
-                    stmt = stmt.where(AuditEvent.action == query.action)
-                if query.center_scope is not None:
-                    stmt = stmt.where(AuditEvent.center_scope == query.center_scope)
-                if query.outcome is not None:
-                    stmt = stmt.where(AuditEvent.outcome == query.outcome)
+                stmt = select(AuditEvent).order_by(AuditEvent.ts.desc(), AuditEvent.id.desc())
+                filters = _query_filters(query)
+                if query.after is not None:
+                    position = tuple_(
+                        literal(query.after.ts, AuditEvent.ts.type),
+                        literal(query.after.id, AuditEvent.id.type),
+                    )
+                    filters.append(tuple_(AuditEvent.ts, AuditEvent.id) < position)
+                if filters:
+                    stmt = stmt.where(and_(*filters))
                 if query.limit is not None:
                     stmt = stmt.limit(query.limit)
                 if query.offset:
@@ -119,30 +173,79 @@ class AuditRepository:
         return await asyncio.to_thread(_sync_fetch)
 
     async def stream(self, query: AuditQuery) -> AsyncIterator[AuditEvent]:
-        def _sync_stream() -> list[AuditEvent]:
-            with self._reader_factory() as session:
-                stmt = select(AuditEvent).order_by(AuditEvent.ts.asc())
-                filters = []
-                if query.from_ts is not None:
-                    filters.append(AuditEvent.ts >= query.from_ts)
-                if query.to_ts is not None:
-                    filters.append(AuditEvent.ts <= query.to_ts)
-                if query.actor_role is not None:
-                    filters.append(AuditEvent.actor_role == query.actor_role)
-                if query.action is not None:
-                    filters.append(AuditEvent.action == query.action)
-                if query.center_scope is not None:
-                    filters.append(AuditEvent.center_scope == query.center_scope)
-                if query.outcome is not None:
-                    filters.append(AuditEvent.outcome == query.outcome)
-                if filters:
-                    stmt = stmt.where(and_(*filters))
-                result = session.execute(stmt)
-                return list(result.scalars())
-
-        events = await asyncio.to_thread(_sync_stream)
-        for event in events:
-            yield event
+        """Yield events in ``ts`` order without materialising the result set.
 
+        A worker thread reads the replica through a server-side cursor
+        (``yield_per``) and hands batches over a bounded queue, so at most
+        ``stream_queue_size`` batches are held in memory at once and the
+        cursor stalls while the consumer is slower than the database.
+        """
 
-__all__ = ["AuditRepository", "AuditQuery", "AuditEventCreate"]
+        loop = asyncio.get_running_loop()
+        batches: asyncio.Queue[list[AuditEvent] | BaseException | None] = asyncio.Queue(
+            maxsize=self._stream_queue_size
+        )
+        stop = threading.Event()
+
+        def _hand_over(item: list[AuditEvent] | BaseException | None) -> bool:
+            future = asyncio.run_coroutine_threadsafe(batches.put(item), loop)
+            while True:
+                try:
+                    future.result(timeout=0.1)
+                    return True
+                except FutureTimeoutError:
+                    if stop.is_set():
+                        future.cancel()
+                        return False
+
+        def _sync_stream() -> None:
+            try:
+                with self._reader_factory() as session:
+                    stmt = select(AuditEvent).order_by(AuditEvent.ts.asc())
+                    filters = _query_filters(query)
+                    if filters:
+                        stmt = stmt.where(and_(*filters))
+                    stmt = stmt.execution_options(yield_per=self._stream_batch_size)
+                    for partition in session.scalars(stmt).partitions():
+                        if stop.is_set() or not _hand_over(list(partition)):
+                            return
+            except BaseException as exc:  # noqa: BLE001 - re-raised in the consumer
+                _hand_over(exc)
+                return
+            _hand_over(None)
+
+        producer = asyncio.ensure_future(asyncio.to_thread(_sync_stream))
+        try:
+            while True:
+                item = await batches.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                for event in item:
+                    yield event
+        finally:
+            stop.set()
+            while not batches.empty():
+                batches.get_nowait()
+            await producer
+
+
+def _query_filters(query: AuditQuery) -> list:
+    filters = []
+    if query.from_ts is not None:
+        filters.append(AuditEvent.ts >= query.from_ts)
+    if query.to_ts is not None:
+        filters.append(AuditEvent.ts <= query.to_ts)
+    if query.actor_role is not None:
+        filters.append(AuditEvent.actor_role == query.actor_role)
+    if query.action is not None:
+        filters.append(AuditEvent.action == query.action)
+    if query.center_scope is not None:
+        filters.append(AuditEvent.center_scope == query.center_scope)
+    if query.outcome is not None:
+        filters.append(AuditEvent.outcome == query.outcome)
+    return filters
+
+
+__all__ = ["AuditRepository", "AuditQuery", "AuditCursor", "AuditEventCreate"]
@@ -14,13 +14,14 @@ from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, TypeVar
+from typing import Any, TextIO, TypeVar
 
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 from zoneinfo import ZoneInfo
 
 from sma.phase7_release.hashing import sha256_file
+from sma.utils.hashing_io import HashingWriter, hashing_text_writer
 from sma.reliability.clock import Clock
 
 from .release_manifest import ReleaseManifest, make_manifest_entry
@@ -434,9 +435,10 @@ class AuditArchiver:
     ) -> tuple[int, AuditArchiveArtifact, AuditArchiveArtifact]:
         row_count = 0
         with self._stream_rows(window) as rows:
-            with _atomic_writer(csv_path, mode="w", encoding="utf-8", newline="") as csv_handle, _atomic_writer(
-                json_path, mode="w", encoding="utf-8", newline="\r\n"
-            ) as json_handle:
+            with _hashing_atomic_writer(csv_path, encoding="utf-8", newline="") as (
+                csv_handle,
+                csv_sink,
+            ), _hashing_atomic_writer(json_path, encoding="utf-8", newline="\r\n") as (json_handle, json_sink):
                 if self._config.csv_bom:
                     csv_handle.write("\ufeff")
                 writer = csv.writer(csv_handle, quoting=csv.QUOTE_ALL, lineterminator="\r\n")
@@ -493,13 +495,13 @@ class AuditArchiver:
                     row_count += 1
         csv_artifact = AuditArchiveArtifact(
             path=csv_path,
-            sha256=sha256_file(csv_path),
-            size_bytes=csv_path.stat().st_size,
+            sha256=csv_sink.hexdigest(),
+            size_bytes=csv_sink.bytes_written,
         )
         json_artifact = AuditArchiveArtifact(
             path=json_path,
-            sha256=sha256_file(json_path),
-            size_bytes=json_path.stat().st_size,
+            sha256=json_sink.hexdigest(),
+            size_bytes=json_sink.bytes_written,
         )
         return row_count, csv_artifact, json_artifact
 
@@ -778,16 +780,34 @@ class AuditRetentionEnforcer:
 
 @contextmanager
 def _atomic_writer(path: Path, *, mode: str, encoding: str, newline: str) -> Iterator[Any]:
+    if mode != "w":
+        raise ValueError(f"unsupported mode: {mode}")
+    with _hashing_atomic_writer(path, encoding=encoding, newline=newline) as (handle, _sink):
+        yield handle
+
+
+@contextmanager
+def _hashing_atomic_writer(
+    path: Path, *, encoding: str, newline: str
+) -> Iterator[tuple[TextIO, HashingWriter]]:
+    """Atomic text writer that hashes and counts bytes while they are written."""
+
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
     fd = None
     tmp_path = None
     try:
         fd, tmp_path = tempfile.mkstemp(prefix=path.name, suffix=".part", dir=path.parent)
-        with os.fdopen(fd, mode, encoding=encoding, newline=newline) as handle:
-            yield handle
-            handle.flush()
-            os.fsync(handle.fileno())
+        with os.fdopen(fd, "wb") as raw:
+            fd = None
+            handle, sink = hashing_text_writer(raw, encoding=encoding, newline=newline)
+            try:
+                yield handle, sink
+                handle.flush()
+                raw.flush()
+                os.fsync(raw.fileno())
+            finally:
+                handle.close()
         os.replace(tmp_path, path)
     except Exception:  # noqa: BLE001
         if fd is not None:
@@ -5,7 +5,7 @@ import logging
 import re
 from dataclasses import dataclass
 from datetime import datetime
-from typing import AsyncIterator
+from typing import AsyncIterator, Sequence
 from zoneinfo import ZoneInfo
 
 from prometheus_client import CollectorRegistry, Counter
@@ -14,6 +14,7 @@ from sma.reliability.clock import Clock
 
 from .enums import AuditAction, AuditActorRole, AuditOutcome
 from .repository import AuditEventCreate, AuditQuery, AuditRepository
+from .writer import AuditEventWriter, AuditWriteBehindConfig
 
 _LOGGER = logging.getLogger("audit.service")
 _REQUEST_ID_RE = re.compile(r"^(?:[0-9a-fA-F]{32,64}|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})$")
@@ -132,11 +133,27 @@ class AuditService:
         *,
         metrics: AuditMetrics,
         timezone: ZoneInfo = _DEFAULT_TZ,
+        write_behind: AuditWriteBehindConfig | None = None,
     ) -> None:
         self._repository = repository
         self._clock = clock
         self._timezone = timezone
         self._metrics = metrics
+        self._writer: AuditEventWriter | None = None
+        if write_behind is not None:
+            self.enable_write_behind(write_behind)
+
+    def enable_write_behind(self, config: AuditWriteBehindConfig) -> None:
+        """Buffer :meth:`submit_event` writes according to ``config``."""
+
+        if self._writer is not None:
+            raise RuntimeError("AUDIT_WRITER_CONFIGURED: بافر ممیزی قبلاً پیکربندی شده است")
+        self._writer = AuditEventWriter(
+            self._repository,
+            config,
+            on_written=self._on_batch_written,
+            on_failed=self._on_batch_failed,
+        )
 
     @property
     def metrics_registry(self) -> CollectorRegistry:
@@ -165,39 +182,73 @@ class AuditService:
         error_code: str | None = None,
         artifact_sha256: str | None = None,
     ) -> int:
-        self._validate_identifier(resource_type)
-        self._validate_identifier(resource_id)
-        if center_scope is not None:
-            self._validate_center(center_scope)
-        self._validate_request_id(request_id)
-        ts = self._clock.now().astimezone(self._timezone)
-        payload = AuditEventCreate(
-            ts=ts,
+        payload = self._build_payload(
             actor_role=actor_role,
-            center_scope=center_scope or None,
+            center_scope=center_scope,
             action=action,
-            resource_type=self._normalize(resource_type),
-            resource_id=self._normalize(resource_id),
-            job_id=self._normalize(job_id) if job_id else None,
+            resource_type=resource_type,
+            resource_id=resource_id,
             request_id=request_id,
             outcome=outcome,
-            error_code=self._normalize(error_code) if error_code else None,
-            artifact_sha256=self._normalize(artifact_sha256) if artifact_sha256 else None,
+            job_id=job_id,
+            error_code=error_code,
+            artifact_sha256=artifact_sha256,
         )
         rid = request_id
         event_id = await self._repository.insert(payload, rid=rid)
-        self._metrics.events_total.labels(action=action.value, outcome=outcome.value).inc()
-        _LOGGER.info(
-            "AUDIT_EVENT_RECORDED",
-            extra={
-                "rid": rid,
-                "action": action.value,
-                "outcome": outcome.value,
-                "resource": resource_type,
-            },
-        )
+        self._mark_recorded(payload, rid)
         return event_id
 
+    async def submit_event(
+        self,
+        *,
+        actor_role: AuditActorRole,
+        center_scope: str | None,
+        action: AuditAction,
+        resource_type: str,
+        resource_id: str,
+        request_id: str,
+        outcome: AuditOutcome,
+        job_id: str | None = None,
+        error_code: str | None = None,
+        artifact_sha256: str | None = None,
+    ) -> None:
+        """Record an event without waiting for its commit when write-behind is enabled.
+
+        Validation still happens inline.  Without a write-behind config this is
+        :meth:`record_event` minus the returned id.
+        """
+
+        payload = self._build_payload(
+            actor_role=actor_role,
+            center_scope=center_scope,
+            action=action,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            request_id=request_id,
+            outcome=outcome,
+            job_id=job_id,
+            error_code=error_code,
+            artifact_sha256=artifact_sha256,
+        )
+        if self._writer is None:
+            await self._repository.insert(payload, rid=request_id)
+            self._mark_recorded(payload, request_id)
+            return
+        await self._writer.submit(payload, rid=request_id)
+
+    async def flush(self) -> None:
+        """Wait for buffered events submitted so far to be persisted."""
+
+        if self._writer is not None:
+            await self._writer.flush()
+
+    async def aclose(self) -> None:
+        """Drain the write-behind buffer; call on application shutdown."""
+
+        if self._writer is not None:
+            await self._writer.aclose()
+
     async def list_events(self, query: AuditQuery) -> list[AuditEventRecord]:
         events = await self._repository.fetch_many(query)
         return [self._to_record(event) for event in events]
@@ -227,6 +278,61 @@ class AuditService:
             },
         )
 
+    def _build_payload(
+        self,
+        *,
+        actor_role: AuditActorRole,
+        center_scope: str | None,
+        action: AuditAction,
+        resource_type: str,
+        resource_id: str,
+        request_id: str,
+        outcome: AuditOutcome,
+        job_id: str | None,
+        error_code: str | None,
+        artifact_sha256: str | None,
+    ) -> AuditEventCreate:
+        self._validate_identifier(resource_type)
+        self._validate_identifier(resource_id)
+        if center_scope is not None:
+            self._validate_center(center_scope)
+        self._validate_request_id(request_id)
+        ts = self._clock.now().astimezone(self._timezone)
+        return AuditEventCreate(
+            ts=ts,
+            actor_role=actor_role,
+            center_scope=center_scope or None,
+            action=action,
+            resource_type=self._normalize(resource_type),
+            resource_id=self._normalize(resource_id),
+            job_id=self._normalize(job_id) if job_id else None,
+            request_id=request_id,
+            outcome=outcome,
+            error_code=self._normalize(error_code) if error_code else None,
+            artifact_sha256=self._normalize(artifact_sha256) if artifact_sha256 else None,
+        )
+
+    def _mark_recorded(self, payload: AuditEventCreate, rid: str) -> None:
+        self._metrics.events_total.labels(action=payload.action.value, outcome=payload.outcome.value).inc()
+        _LOGGER.info(
+            "AUDIT_EVENT_RECORDED",
+            extra={
+                "rid": rid,
+                "action": payload.action.value,
+                "outcome": payload.outcome.value,
+                "resource": payload.resource_type,
+            },
+        )
+
+    def _on_batch_written(self, batch: Sequence[tuple[AuditEventCreate, str]]) -> None:
+        for payload, rid in batch:
+            self._mark_recorded(payload, rid)
+
+    def _on_batch_failed(self, batch: Sequence[tuple[AuditEventCreate, str]], error: Exception) -> None:
+        self._metrics.retry_exhausted_total.labels(stage="write").inc()
+        for _, rid in batch:
+            self.log_failure(rid=rid, op="write_behind", namespace="audit", error=error)
+
     def _to_record(self, event) -> AuditEventRecord:
         return AuditEventRecord(
             id=event.id,
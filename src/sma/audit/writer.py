@@ -0,0 +1,163 @@
+"""Write-behind buffering for audit events."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from .repository import AuditEventCreate, AuditRepository
+
+QueuedEvent = tuple[AuditEventCreate, str]
+# Queued by flush(): write the current batch without waiting for it to fill.
+_FLUSH = None
+
+_LOGGER = logging.getLogger("audit.writer")
+
+
+@dataclass(slots=True, frozen=True)
+class AuditWriteBehindConfig:
+    """Batching knobs for :class:`AuditEventWriter`.
+
+    ``batch_size`` events or ``flush_interval`` seconds after the first queued
+    event, whichever comes first, trigger a flush.  ``max_pending`` bounds the
+    in-memory queue; producers wait once it is full.
+    """
+
+    batch_size: int = 256
+    flush_interval: float = 0.05
+    max_pending: int = 10_000
+
+    def __post_init__(self) -> None:
+        if self.batch_size < 1 or self.max_pending < 1 or self.flush_interval < 0:
+            raise ValueError("AUDIT_CONFIG_INVALID: پیکربندی بافر ممیزی نامعتبر است")
+
+
+class AuditEventWriter:
+    """Queue audit events in memory and persist them in multi-row INSERT batches.
+
+    Each batch goes through :meth:`AuditRepository.insert_many`, so the usual
+    retry policy applies per batch; a batch that still fails is written again
+    row by row with :meth:`AuditRepository.insert`.  :meth:`aclose` drains
+    everything still queued before returning and must be awaited on shutdown.
+    """
+
+    def __init__(
+        self,
+        repository: AuditRepository,
+        config: AuditWriteBehindConfig,
+        *,
+        on_written: Callable[[Sequence[QueuedEvent]], None],
+        on_failed: Callable[[Sequence[QueuedEvent], Exception], None],
+    ) -> None:
+        self._repository = repository
+        self._config = config
+        self._on_written = on_written
+        self._on_failed = on_failed
+        self._queue: asyncio.Queue[QueuedEvent | None] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, payload: AuditEventCreate, *, rid: str) -> None:
+        """Queue ``payload``; waits only while the buffer is full."""
+
+        if self._closed:
+            raise RuntimeError("AUDIT_WRITER_CLOSED: بافر ممیزی بسته شده است")
+        queue = self._ensure_started()
+        await queue.put((payload, rid))
+
+    async def flush(self) -> None:
+        """Wait until every event queued so far has been written (or failed)."""
+
+        if self._queue is not None:
+            queue = self._ensure_started()
+            await queue.put(_FLUSH)
+            await queue.join()
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def _ensure_started(self) -> asyncio.Queue[QueuedEvent | None]:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._config.max_pending)
+        if self._task is None or self._task.done():
+            # A dead task leaves its backlog in the queue; resume on the same
+            # queue so nothing already accepted is dropped.
+            if self._task is not None and not self._task.cancelled() and self._task.exception() is not None:
+                _LOGGER.error(
+                    "AUDIT_WRITER_RESTART",
+                    extra={"pending": self._queue.qsize()},
+                    exc_info=self._task.exception(),
+                )
+            self._task = asyncio.get_running_loop().create_task(self._run(self._queue))
+        return self._queue
+
+    async def _run(self, queue: asyncio.Queue[QueuedEvent | None]) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue.get()
+            taken = 1
+            batch = [] if item is _FLUSH else [item]
+            deadline = loop.time() + self._config.flush_interval
+            while item is not _FLUSH and len(batch) < self._config.batch_size:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                taken += 1
+                if item is not _FLUSH:
+                    batch.append(item)
+            try:
+                if batch:
+                    await self._write(batch)
+            finally:
+                for _ in range(taken):
+                    queue.task_done()
+
+    async def _write(self, batch: list[QueuedEvent]) -> None:
+        try:
+            await self._repository.insert_many([payload for payload, _ in batch], rid=batch[0][1])
+        except Exception as exc:  # noqa: BLE001 - surfaced through on_failed
+            if len(batch) == 1:
+                self._on_failed(batch, exc)
+                return
+            # One bad row fails the whole INSERT; retry row by row so only
+            # the offending events are lost.
+            await self._write_rows(batch)
+        else:
+            self._on_written(batch)
+
+    async def _write_rows(self, batch: list[QueuedEvent]) -> None:
+        written: list[QueuedEvent] = []
+        for event in batch:
+            payload, rid = event
+            try:
+                await self._repository.insert(payload, rid=rid)
+            except Exception as exc:  # noqa: BLE001 - surfaced through on_failed
+                self._on_failed([event], exc)
+            else:
+                written.append(event)
+        if written:
+            self._on_written(written)
+
+
+__all__ = ["AuditEventWriter", "AuditWriteBehindConfig"]
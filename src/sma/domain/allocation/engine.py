@@ -11,6 +11,7 @@ from sma.domain.allocation.reasons import (
     RuleResult,
     build_reason,
 )
+from sma.domain.allocation.scheduler import BucketKey, CapacityHeap, eligibility_bucket
 from sma.domain.allocation.rules import (
     AllowedCenterRule,
     AllowedGroupRule,
@@ -101,6 +102,67 @@ class AllocationEngine:
         best, trace = ranked[0]
         return SelectionResult(best.mentor_id, None, trace, self._fairness_config.strategy, fairness_key)
 
+    def allocate_cohort(
+        self,
+        students: Iterable[Student],
+        mentors: Iterable[Mentor],
+        *,
+        academic_year: str | None = None,
+    ) -> List[SelectionResult]:
+        """Allocate students in order, consuming mentor capacity as it goes.
+
+        The result matches calling :meth:`select_best` per student and
+        incrementing ``current_load`` of the chosen mentor, which this method
+        does in place.  Rules are evaluated once per eligibility bucket (see
+        :func:`eligibility_bucket`); mentors passing them are kept in a
+        :class:`CapacityHeap` so each assignment costs ``O(log m)``.
+        ``BUCKET_ROUND_ROBIN`` needs the full ordering and re-ranks the live
+        heap contents instead.
+        """
+
+        roster = list(mentors)
+        heaps: dict[BucketKey, CapacityHeap] = {}
+        no_candidate: dict[BucketKey, tuple[int, SelectionResult]] = {}
+        assignments = 0
+        results: List[SelectionResult] = []
+        strategy = self._fairness_config.strategy
+        for student in students:
+            fairness_key = self._resolve_fairness_key(student, academic_year)
+            bucket = eligibility_bucket(student, fairness_key)
+            heap = heaps.get(bucket)
+            if heap is None:
+                heap = heaps[bucket] = self._build_heap(student, roster, fairness_key)
+            if strategy is FairnessStrategy.BUCKET_ROUND_ROBIN:
+                live = heap.ordered()
+                picked = self._fairness.rank(live, academic_year=fairness_key)[0] if live else None
+            else:
+                picked = heap.peek()
+            if picked is None:
+                cached = no_candidate.get(bucket)
+                if cached is None or cached[0] != assignments:
+                    failure = self.select_best(student, roster, academic_year=academic_year)
+                    cached = no_candidate[bucket] = (assignments, failure)
+                results.append(cached[1])
+                continue
+            best, trace = picked
+            best.current_load += 1
+            assignments += 1
+            results.append(SelectionResult(best.mentor_id, None, list(trace), strategy, fairness_key))
+        return results
+
+    def _build_heap(self, student: Student, roster: Sequence[Mentor], fairness_key: str) -> CapacityHeap:
+        heap = CapacityHeap(lambda mentor: self._fairness.ordering_key(mentor, academic_year=fairness_key))
+        for position, mentor in enumerate(roster):
+            trace: list[LocalizedReason | None] = []
+            for rule in self.rules:
+                r: RuleResult = rule.check(student, mentor)
+                trace.append(r.reason)
+                if not r.ok:
+                    break
+            else:
+                heap.push(position, mentor, trace)
+        return heap
+
     @staticmethod
     def _resolve_fairness_key(student: Student, academic_year: str | None) -> str:
         if academic_year:
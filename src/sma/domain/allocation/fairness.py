@@ -44,6 +44,22 @@ class FairnessPlanner:
             return self._with_bucket_round_robin(items, key)
         return list(items)
 
+    def ordering_key(self, mentor: Mentor, *, academic_year: str | None) -> Tuple[float, int, int]:
+        """Return the load-dependent ranking key used before interleaving.
+
+        The key only grows as ``current_load`` grows, which lets callers keep
+        mentors in a heap and refresh entries lazily.
+        """
+
+        ratio = mentor.occupancy_ratio
+        if self._config.strategy is FairnessStrategy.DETERMINISTIC_JITTER:
+            ratio += self._jitter(academic_year or "default", mentor.mentor_id)
+        return (ratio, mentor.current_load, mentor.mentor_id)
+
+    @staticmethod
+    def _jitter(key: str, mentor_id: int) -> float:
+        return (stable_counter_hash(f"{key}:{mentor_id}") % 10_000) / 1_000_000.0
+
     def _with_deterministic_jitter(
         self,
         items: Sequence[Tuple[Mentor, List[object]]],
@@ -51,8 +67,7 @@ class FairnessPlanner:
     ) -> List[Tuple[Mentor, List[object]]]:
         jittered = []
         for mentor, trace in items:
-            seed = f"{key}:{mentor.mentor_id}"
-            jitter = (stable_counter_hash(seed) % 10_000) / 1_000_000.0
+            jitter = self._jitter(key, mentor.mentor_id)
             jittered.append((mentor, trace, jitter))
         jittered.sort(
             key=lambda entry: (
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import heapq
+from typing import Callable, List, Tuple
+
+from sma.domain.allocation.reasons import LocalizedReason
+from sma.domain.mentor.entities import Mentor
+from sma.domain.student.entities import Student
+
+OrderingKey = Tuple[float, int, int]
+Trace = List[LocalizedReason | None]
+BucketKey = Tuple[object, ...]
+
+
+def eligibility_bucket(student: Student, fairness_key: str) -> BucketKey:
+    """Student attributes that decide the static (load independent) rule outcomes."""
+
+    return (
+        student.gender,
+        student.group_code,
+        int(student.reg_center),
+        student.edu_status,
+        student.student_type,
+        student.school_code,
+        fairness_key,
+    )
+
+
+class CapacityHeap:
+    """Lazy min-heap of mentors with spare capacity.
+
+    Loads only grow during a cohort run, so an entry whose stored key differs
+    from ``key(mentor)`` is stale and merely needs to sink: it is refreshed
+    when it reaches the top instead of being located and updated eagerly.
+    Mentors that are shared between buckets therefore stay consistent without
+    cross-heap bookkeeping.
+    """
+
+    __slots__ = ("_key", "_heap")
+
+    def __init__(self, key: Callable[[Mentor], OrderingKey]) -> None:
+        self._key = key
+        self._heap: list[tuple[OrderingKey, int, Mentor, Trace]] = []
+
+    def push(self, position: int, mentor: Mentor, trace: Trace) -> None:
+        heapq.heappush(self._heap, (self._key(mentor), position, mentor, trace))
+
+    def peek(self) -> Tuple[Mentor, Trace] | None:
+        heap = self._heap
+        while heap:
+            key, position, mentor, trace = heap[0]
+            if not mentor.has_capacity():
+                heapq.heappop(heap)
+                continue
+            fresh = self._key(mentor)
+            if fresh == key:
+                return mentor, trace
+            heapq.heapreplace(heap, (fresh, position, mentor, trace))
+        return None
+
+    def ordered(self) -> List[Tuple[Mentor, Trace]]:
+        """Return live mentors in ranking order, refreshing every entry."""
+
+        live = [
+            (self._key(mentor), position, mentor, trace)
+            for _key, position, mentor, trace in self._heap
+            if mentor.has_capacity()
+        ]
+        live.sort(key=lambda entry: (entry[0], entry[1]))
+        self._heap = list(live)
+        return [(mentor, trace) for _key, _position, mentor, trace in live]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+__all__ = ["CapacityHeap", "eligibility_bucket"]
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from sma.domain.allocation.engine import AllocationEngine, SelectionResult
+from sma.domain.allocation.fairness import FairnessConfig, FairnessStrategy
+from sma.domain.allocation.rules import Rule
+from sma.domain.mentor.entities import Mentor
+from sma.domain.student.entities import Student
+
+ShardKey = Tuple[int, int]
+
+
+def shard_key(student: Student) -> ShardKey:
+    return (int(student.gender), int(student.reg_center))
+
+
+@dataclass(slots=True)
+class AllocationShard:
+    """Students and mentors that can only interact with each other.
+
+    Mentors allowed in several centers link those ``(gender, center)``
+    partitions, so a shard is a connected component of partitions and every
+    mentor belongs to exactly one shard.  Capacity bookkeeping is therefore
+    local to the process allocating the shard.
+    """
+
+    keys: Tuple[ShardKey, ...]
+    student_positions: List[int] = field(default_factory=list)
+    students: List[Student] = field(default_factory=list)
+    mentor_positions: List[int] = field(default_factory=list)
+    mentors: List[Mentor] = field(default_factory=list)
+
+
+class _DisjointSet:
+    def __init__(self) -> None:
+        self._parent: Dict[ShardKey, ShardKey] = {}
+
+    def find(self, key: ShardKey) -> ShardKey:
+        parent = self._parent.setdefault(key, key)
+        if parent != key:
+            parent = self._parent[key] = self.find(parent)
+        return parent
+
+    def keys(self) -> List[ShardKey]:
+        return sorted(self._parent)
+
+    def union(self, left: ShardKey, right: ShardKey) -> None:
+        a, b = self.find(left), self.find(right)
+        if a != b:
+            self._parent[max(a, b)] = min(a, b)
+
+
+def plan_shards(students: Sequence[Student], mentors: Sequence[Mentor]) -> List[AllocationShard]:
+    """Split a cohort and roster into independent shards, ordered by key."""
+
+    partitions = _DisjointSet()
+    for student in students:
+        partitions.find(shard_key(student))
+    for mentor in mentors:
+        keys = [(int(mentor.gender), int(center)) for center in sorted(mentor.allowed_centers)]
+        for key in keys:
+            partitions.find(key)
+        for key in keys[1:]:
+            partitions.union(keys[0], key)
+
+    members: Dict[ShardKey, List[ShardKey]] = {}
+    for key in partitions.keys():
+        members.setdefault(partitions.find(key), []).append(key)
+    shards = {root: AllocationShard(keys=tuple(keys)) for root, keys in members.items()}
+    for position, student in enumerate(students):
+        shard = shards[partitions.find(shard_key(student))]
+        shard.student_positions.append(position)
+        shard.students.append(student)
+    for position, mentor in enumerate(mentors):
+        if not mentor.allowed_centers:
+            continue
+        key = (int(mentor.gender), int(min(mentor.allowed_centers)))
+        shard = shards[partitions.find(key)]
+        shard.mentor_positions.append(position)
+        shard.mentors.append(mentor)
+    return [shards[root] for root in sorted(shards)]
+
+
+def _allocate_shard(
+    shard: AllocationShard,
+    rules: Sequence[Rule] | None,
+    fairness: FairnessConfig,
+    academic_year: str | None,
+) -> Tuple[List[SelectionResult], List[int]]:
+    engine = AllocationEngine(rules, fairness=fairness)
+    results = engine.allocate_cohort(shard.students, shard.mentors, academic_year=academic_year)
+    return results, [mentor.current_load for mentor in shard.mentors]
+
+
+class ShardedCohortAllocator:
+    """Allocate a cohort across processes, one shard per task.
+
+    Shards come from :func:`plan_shards`; each is allocated with
+    :meth:`AllocationEngine.allocate_cohort` in a process pool and the results
+    are merged back in the original student order.  Final mentor loads are
+    written back to the caller's ``Mentor`` objects, and results match a
+    single-process ``allocate_cohort`` run:
+
+    * a student without an eligible mentor gets the trace of the last roster
+      mentor, so that trace is rebuilt when the mentor lies in another shard;
+    * ``BUCKET_ROUND_ROBIN`` rotation state spans the whole academic year, so
+      that strategy is always allocated in a single process.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[Rule] | None = None,
+        *,
+        fairness: FairnessConfig | None = None,
+        max_workers: int | None = None,
+        mp_context: str | None = "spawn",
+    ) -> None:
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        self._rules = tuple(rules) if rules else None
+        self._fairness = fairness or FairnessConfig()
+        self._max_workers = max_workers
+        self._mp_context = mp_context
+
+    def allocate(
+        self,
+        students: Iterable[Student],
+        mentors: Iterable[Mentor],
+        *,
+        academic_year: str | None = None,
+    ) -> List[SelectionResult]:
+        cohort = list(students)
+        roster = list(mentors)
+        engine = AllocationEngine(self._rules, fairness=self._fairness)
+        if self._fairness.strategy is FairnessStrategy.BUCKET_ROUND_ROBIN:
+            return engine.allocate_cohort(cohort, roster, academic_year=academic_year)
+        shards = [shard for shard in plan_shards(cohort, roster) if shard.students]
+        merged: Dict[int, SelectionResult] = {}
+        foreign_tail: List[int] = []
+        last_mentor = len(roster) - 1
+        for shard, (shard_results, loads) in zip(shards, self._run(shards, academic_year), strict=True):
+            owns_tail = bool(shard.mentor_positions) and shard.mentor_positions[-1] == last_mentor
+            for position, result in zip(shard.student_positions, shard_results, strict=True):
+                merged[position] = result
+                if result.mentor_id is None and roster and not owns_tail:
+                    foreign_tail.append(position)
+            for position, load in zip(shard.mentor_positions, loads, strict=True):
+                roster[position].current_load = load
+        for position in foreign_tail:
+            # Every mentor failed, so the trace is the one of roster[-1]; it
+            # belongs to another shard and fails on gender or center alone.
+            merged[position] = engine.select_best(
+                cohort[position], roster[-1:], academic_year=academic_year
+            )
+        results: List[SelectionResult] = [merged[position] for position in range(len(cohort))]
+        return results
+
+    def _run(
+        self, shards: List[AllocationShard], academic_year: str | None
+    ) -> List[Tuple[List[SelectionResult], List[int]]]:
+        args = (self._rules, self._fairness, academic_year)
+        if self._max_workers == 1 or len(shards) <= 1:
+            return [_allocate_shard(shard, *args) for shard in shards]
+        context = multiprocessing.get_context(self._mp_context) if self._mp_context else None
+        workers = min(self._max_workers or os.cpu_count() or 1, len(shards))
+        # Largest shards first so the pool does not idle on a straggler.
+        order = sorted(range(len(shards)), key=lambda index: -len(shards[index].students))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {index: pool.submit(_allocate_shard, shards[index], *args) for index in order}
+            return [futures[index].result() for index in range(len(shards))]
+
+
+__all__ = ["AllocationShard", "ShardedCohortAllocator", "plan_shards", "shard_key"]
@@ -2,10 +2,11 @@
 from __future__ import annotations
 
 import csv
-import hashlib
 import itertools
 import os
+from collections import deque
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
@@ -15,11 +16,13 @@ from openpyxl import Workbook  # type: ignore[import-untyped]
 from openpyxl.cell import WriteOnlyCell  # type: ignore[import-untyped]
 from openpyxl.styles import numbers  # type: ignore[import-untyped]
 
+from sma.export.xlsx_stream import NativeXLSXWriter, validate_backend
 from sma.phase6_import_to_sabt.sanitization import (  # type: ignore[import-not-found]
     guard_formula,
     sanitize_phone,
     sanitize_text,
 )
+from sma.utils.hashing_io import HashingWriter, hashing_text_writer
 
 from src.utils.atomic import write_atomic
 
@@ -72,7 +75,24 @@ TEXT_COLUMNS: frozenset[str] = frozenset(
     }
 )
 
+# Columns ``ImportToSabtExporter._normalize_row`` emits as validated digits
+# (or an ISO timestamp), so they can never start with a formula prefix.
+_NORMALIZED_FORMULA_SAFE: frozenset[str] = frozenset(
+    {
+        "counter",
+        "gender",
+        "mobile",
+        "reg_center",
+        "reg_status",
+        "student_type",
+        "allocation_date",
+    }
+)
+_FORMULA_PREFIXES: frozenset[str] = frozenset({"=", "+", "-", "@", "\t", "'", '"'})
+_PREPARE_BATCH_SIZE = 1024
+
 _CHUNK_SIZE_ERROR = "chunk_size must be positive"
+_WRITE_WORKERS_ERROR = "write_workers must be positive"
 
 
 @dataclass(frozen=True)
@@ -93,7 +113,23 @@ class ExportResult:
 
 
 class ExportWriter:
-    """Stream CSV/XLSX rows with atomic writes, CRLF and Excel-safety rules."""
+    """Stream CSV/XLSX rows with atomic writes, CRLF and Excel-safety rules.
+
+    With ``write_workers > 1`` CSV chunks are materialised on the calling
+    thread and written (prepare, fsync, hash) by a bounded thread pool; at
+    most ``write_workers`` chunks are buffered at once and files are still
+    returned in chunk order.
+
+    XLSX output uses the streaming :class:`NativeXLSXWriter` by default;
+    ``xlsx_backend="openpyxl"`` keeps the write-only openpyxl workbook as a
+    fallback.  The backend is recorded in ``excel_safety["backend"]``.
+
+    Row preparation runs a per-column plan compiled once per writer and is
+    applied to batches of rows column by column.  ``prenormalized=True``
+    declares that rows come from ``ImportToSabtExporter._normalize_row``:
+    text/phone sanitising and ``school_code`` padding are then skipped, and
+    columns that are validated digits skip the formula guard.
+    """
 
     def __init__(  # noqa: PLR0913
         self,
@@ -106,9 +142,14 @@ class ExportWriter:
         formula_guard: bool = True,
         sheet_template: str = "Sheet_{index:03d}",
         sha256_factory: Callable[[Path], str] | None = None,
+        write_workers: int = 1,
+        xlsx_backend: str = "native",
+        prenormalized: bool = False,
     ) -> None:
         if chunk_size <= 0:
             raise ValueError(_CHUNK_SIZE_ERROR)
+        if write_workers <= 0:
+            raise ValueError(_WRITE_WORKERS_ERROR)
         self._columns = tuple(columns)
         self._sensitive = tuple(sensitive_columns)
         self._sensitive_lookup = frozenset(self._sensitive)
@@ -122,7 +163,22 @@ class ExportWriter:
         self._chunk_size = chunk_size
         self._formula_guard = formula_guard
         self._sheet_template = sheet_template
-        self._sha256 = sha256_factory or _sha256_file
+        # ``None`` means digests are computed while the bytes are written.
+        self._sha256 = sha256_factory
+        self._write_workers = write_workers
+        self._xlsx_backend = validate_backend(xlsx_backend)
+        self._prenormalized = prenormalized
+        self._row_plan = tuple(
+            (
+                column,
+                _compile_column(
+                    column,
+                    formula_guard=formula_guard,
+                    prenormalized=prenormalized,
+                ),
+            )
+            for column in self._columns
+        )
 
     def write_csv(
         self,
@@ -132,24 +188,14 @@ class ExportWriter:
     ) -> ExportResult:
         """Stream rows into chunked CSV files while enforcing Excel-safety guards."""
 
-        files: list[ExportedFile] = []
-        total_rows = 0
-        for index, chunk in enumerate(
-            _chunk_iterable(rows, self._chunk_size), start=1
-        ):
-            path = path_factory(index)
-            byte_size, row_count = self._write_csv_chunk(path, chunk)
-            digest = self._sha256(path)
-            files.append(
-                ExportedFile(
-                    path=path,
-                    name=path.name,
-                    sha256=digest,
-                    byte_size=byte_size,
-                    row_count=row_count,
-                )
-            )
-            total_rows += row_count
+        if self._write_workers > 1:
+            files = self._write_csv_pooled(rows, path_factory)
+        else:
+            files = [
+                self._write_csv_file(path_factory(index), chunk)
+                for index, chunk in enumerate(_chunk_iterable(rows, self._chunk_size), start=1)
+            ]
+        total_rows = sum(item.row_count for item in files)
         safety = {
             "normalized": True,
             "digit_folded": True,
@@ -171,8 +217,71 @@ class ExportWriter:
         """Stream rows into an XLSX workbook without materialising large chunks."""
 
         path = path_factory(1)
+        if self._xlsx_backend == "native":
+            row_counts, sink = self._write_xlsx_native(path, rows)
+        else:
+            row_counts, sink = self._write_xlsx_openpyxl(path, rows)
+        total_rows = sum(row_counts.values())
+
+        byte_size = sink.bytes_written
+        digest = self._sha256(path) if self._sha256 is not None else sink.hexdigest()
+        sheets = tuple(sorted(row_counts.items()))
+        files: list[ExportedFile] = [
+            ExportedFile(
+                path=path,
+                name=path.name,
+                sha256=digest,
+                byte_size=byte_size,
+                row_count=total_rows,
+                sheets=sheets,
+            )
+        ]
+        safety = {
+            "normalized": True,
+            "digit_folded": True,
+            "formula_guard": self._formula_guard,
+            "sensitive_text_columns": list(self._sensitive),
+            "numeric_columns": list(NUMERIC_COLUMNS),
+            "backend": self._xlsx_backend,
+            "write_only": True,
+            "rtl": True,
+        }
+        return ExportResult(files=files, total_rows=total_rows, excel_safety=safety)
+
+    def _write_xlsx_native(
+        self,
+        path: Path,
+        rows: Iterable[Mapping[str, Any]],
+    ) -> tuple[dict[str, int], HashingWriter]:
         row_counts: dict[str, int] = {}
-        total_rows = 0
+        sinks: list[HashingWriter] = []
+
+        def _write(handle: BinaryIO) -> None:
+            sink = HashingWriter(handle)
+            sinks.append(sink)
+            with NativeXLSXWriter(sink, rtl=True) as workbook:
+                for index, chunk in enumerate(_chunk_iterable(rows, self._chunk_size), start=1):
+                    sheet_name = self._sheet_template.format(index=index)
+                    row_counts[sheet_name] = workbook.write_sheet(
+                        sheet_name,
+                        self._columns,
+                        self._iter_prepared(chunk),
+                        text_columns=self._sensitive_indexes,
+                    )
+                if not row_counts:
+                    sheet_name = self._sheet_template.format(index=1)
+                    row_counts[sheet_name] = workbook.write_sheet(sheet_name, self._columns, ())
+
+        write_atomic(path, _write)
+        return row_counts, sinks[-1]
+
+    def _write_xlsx_openpyxl(
+        self,
+        path: Path,
+        rows: Iterable[Mapping[str, Any]],
+    ) -> tuple[dict[str, int], HashingWriter]:
+        row_counts: dict[str, int] = {}
+        sinks: list[HashingWriter] = []
         workbook = Workbook(write_only=True)
         default_sheet = workbook.active
         if default_sheet is not None:
@@ -187,7 +296,7 @@ class ExportWriter:
                 worksheet.sheet_view.rightToLeft = True
                 worksheet.append(list(self._columns))
                 count = 0
-                for prepared in (self._prepare_row(item) for item in chunk):
+                for prepared in self._iter_prepared(chunk):
                     cells: list[WriteOnlyCell] = []
                     for column_index, value in enumerate(prepared):
                         cell = WriteOnlyCell(worksheet, value=value)
@@ -198,7 +307,6 @@ class ExportWriter:
                     worksheet.append(cells)
                     count += 1
                 row_counts[sheet_name] = count
-                total_rows += count
             if not row_counts:
                 sheet_name = self._sheet_template.format(index=1)
                 worksheet = workbook.create_sheet(title=sheet_name)
@@ -207,47 +315,60 @@ class ExportWriter:
                 row_counts[sheet_name] = 0
 
             def _write(handle: BinaryIO) -> None:
-                workbook.save(handle)
+                sink = HashingWriter(handle)
+                sinks.append(sink)
+                workbook.save(sink)
 
             write_atomic(path, _write)
         finally:
             workbook.close()
+        return row_counts, sinks[-1]
 
-        byte_size = path.stat().st_size
-        digest = self._sha256(path)
-        sheets = tuple(sorted(row_counts.items()))
-        files: list[ExportedFile] = [
-            ExportedFile(
-                path=path,
-                name=path.name,
-                sha256=digest,
-                byte_size=byte_size,
-                row_count=total_rows,
-                sheets=sheets,
-            )
-        ]
-        safety = {
-            "normalized": True,
-            "digit_folded": True,
-            "formula_guard": self._formula_guard,
-            "sensitive_text_columns": list(self._sensitive),
-            "numeric_columns": list(NUMERIC_COLUMNS),
-            "backend": "openpyxl",
-            "write_only": True,
-            "rtl": True,
-        }
-        return ExportResult(files=files, total_rows=total_rows, excel_safety=safety)
+    def _write_csv_pooled(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        path_factory: Callable[[int], Path],
+    ) -> list[ExportedFile]:
+        files: list[ExportedFile] = []
+        pending: deque[Future[ExportedFile]] = deque()
+        with ThreadPoolExecutor(
+            max_workers=self._write_workers, thread_name_prefix="export-csv"
+        ) as pool:
+            try:
+                for index, chunk in enumerate(_chunk_iterable(rows, self._chunk_size), start=1):
+                    if len(pending) >= self._write_workers:
+                        files.append(pending.popleft().result())
+                    pending.append(pool.submit(self._write_csv_file, path_factory(index), list(chunk)))
+                while pending:
+                    files.append(pending.popleft().result())
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        return files
+
+    def _write_csv_file(self, path: Path, chunk: Iterable[Mapping[str, Any]]) -> ExportedFile:
+        byte_size, row_count, digest = self._write_csv_chunk(path, chunk)
+        if self._sha256 is not None:
+            digest = self._sha256(path)
+        return ExportedFile(
+            path=path,
+            name=path.name,
+            sha256=digest,
+            byte_size=byte_size,
+            row_count=row_count,
+        )
 
     def _write_csv_chunk(
         self,
         path: Path,
         chunk: Iterable[Mapping[str, Any]],
-    ) -> tuple[int, int]:
-        """Persist a single CSV chunk and return its byte size and row count."""
+    ) -> tuple[int, int, str]:
+        """Persist a single CSV chunk and return its byte size, row count and SHA-256."""
 
         encoding = "utf-8"
         row_count = 0
-        with atomic_writer(path, newline="", encoding=encoding) as handle:
+        with _hashing_atomic_writer(path, newline="", encoding=encoding) as (handle, sink):
             if self._include_bom:
                 handle.write("\ufeff")
             writer = csv.writer(
@@ -256,39 +377,100 @@ class ExportWriter:
                 quoting=csv.QUOTE_ALL,
             )
             writer.writerow(self._columns)
-            for prepared in (self._prepare_row(row) for row in chunk):
-                writer.writerow(prepared)
-                row_count += 1
-        return path.stat().st_size, row_count
+            for batch in _batched(chunk, _PREPARE_BATCH_SIZE):
+                prepared = self._prepare_rows(batch)
+                writer.writerows(prepared)
+                row_count += len(prepared)
+        return sink.bytes_written, row_count, sink.hexdigest()
 
     def _prepare_row(self, raw: Mapping[str, Any]) -> list[str]:
         """Normalise a raw mapping into Excel-safe textual values."""
 
-        prepared: list[str] = []
-        for column in self._columns:
-            value = raw.get(column)
-            if value is None:
-                text = ""
-            elif isinstance(value, str):
-                text = value
+        return list(self._prepare_rows((raw,))[0])
+
+    def _prepare_rows(self, batch: Sequence[Mapping[str, Any]]) -> list[tuple[str, ...]]:
+        """Apply the compiled column plan to ``batch`` one column at a time."""
+
+        columns: list[list[str]] = []
+        for column, transform in self._row_plan:
+            if self._prenormalized:
+                values = [raw.get(column) or "" for raw in batch]
             else:
-                text = str(value)
-            if text and not text.isascii():
-                if column in PHONE_COLUMNS:
-                    text = sanitize_phone(text)
-                elif column in TEXT_COLUMNS:
-                    text = sanitize_text(text)
-            if self._formula_guard and text:
-                first = text[0]
-                if first in ("=", "+", "-", "@", "\t", "'", '"'):
-                    text = guard_formula(text)
-            if column == "school_code" and text:
-                try:
-                    text = f"{int(text):06d}"
-                except ValueError:
-                    text = text.zfill(6)
-            prepared.append(text)
-        return prepared
+                values = [_as_text(raw.get(column)) for raw in batch]
+            if transform is not None:
+                values = list(map(transform, values))
+            columns.append(values)
+        return list(zip(*columns))
+
+    def _iter_prepared(self, rows: Iterable[Mapping[str, Any]]) -> Iterator[tuple[str, ...]]:
+        for batch in _batched(rows, _PREPARE_BATCH_SIZE):
+            yield from self._prepare_rows(batch)
+
+
+def _as_text(value: Any) -> str:
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def _sanitize_non_ascii(sanitize: Callable[[str], str]) -> Callable[[str], str]:
+    def step(text: str) -> str:
+        return text if text.isascii() else sanitize(text)
+
+    return step
+
+
+def _guard_formula_prefix(text: str) -> str:
+    return guard_formula(text) if text[:1] in _FORMULA_PREFIXES else text
+
+
+def _pad_school_code(text: str) -> str:
+    if not text:
+        return text
+    try:
+        return f"{int(text):06d}"
+    except ValueError:
+        return text.zfill(6)
+
+
+def _compile_column(
+    column: str,
+    *,
+    formula_guard: bool,
+    prenormalized: bool,
+) -> Callable[[str], str] | None:
+    """Build the transformer for one column, or ``None`` when values pass through."""
+
+    steps: list[Callable[[str], str]] = []
+    if not prenormalized:
+        if column in PHONE_COLUMNS:
+            steps.append(_sanitize_non_ascii(sanitize_phone))
+        elif column in TEXT_COLUMNS:
+            steps.append(_sanitize_non_ascii(sanitize_text))
+    if formula_guard and not (prenormalized and column in _NORMALIZED_FORMULA_SAFE):
+        steps.append(_guard_formula_prefix)
+    if column == "school_code" and not prenormalized:
+        steps.append(_pad_school_code)
+    if not steps:
+        return None
+    if len(steps) == 1:
+        return steps[0]
+
+    def transform(text: str) -> str:
+        for step in steps:
+            text = step(text)
+        return text
+
+    return transform
+
+
+def _batched(
+    rows: Iterable[Mapping[str, Any]],
+    size: int,
+) -> Iterator[list[Mapping[str, Any]]]:
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
 
 
 def _chunk_iterable(
@@ -306,36 +488,46 @@ def _chunk_iterable(
         yield itertools.chain((first,), itertools.islice(iterator, size - 1))
 
 
-def _sha256_file(path: Path) -> str:
-    digest = hashlib.sha256()
-    with open(path, "rb") as handle:
-        for part in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(part)
-    return digest.hexdigest()
-
-
 @contextmanager
-def atomic_writer(
+def _hashing_atomic_writer(
     path: Path,
     *,
     newline: str = "\n",
     encoding: str = "utf-8",
-) -> Iterator[TextIO]:
+) -> Iterator[tuple[TextIO, HashingWriter]]:
+    """Atomic ``.part`` text writer that hashes and counts bytes as they are written."""
+
     temp_path = path.with_suffix(path.suffix + ".part")
     temp_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(temp_path, "w", encoding=encoding, newline=newline) as handle:
+    with open(temp_path, "wb") as raw:
+        handle, sink = hashing_text_writer(raw, encoding=encoding, newline=newline)
         try:
-            yield handle
+            yield handle, sink
             handle.flush()
-            os.fsync(handle.fileno())
+            raw.flush()
+            os.fsync(raw.fileno())
         except Exception:
             handle.close()
+            raw.close()
             if temp_path.exists():
                 temp_path.unlink()
             raise
+        finally:
+            handle.close()
     os.replace(temp_path, path)
 
 
+@contextmanager
+def atomic_writer(
+    path: Path,
+    *,
+    newline: str = "\n",
+    encoding: str = "utf-8",
+) -> Iterator[TextIO]:
+    with _hashing_atomic_writer(path, newline=newline, encoding=encoding) as (handle, _sink):
+        yield handle
+
+
 __all__ = [
     "ExportResult",
     "ExportWriter",
@@ -0,0 +1,273 @@
+"""Native streaming XLSX backend writing SpreadsheetML parts directly."""
+from __future__ import annotations
+
+import re
+import shutil
+import tempfile
+import zipfile
+from collections.abc import Collection, Iterable, Sequence
+from types import TracebackType
+from typing import Protocol
+from xml.sax.saxutils import escape, quoteattr
+
+XLSX_BACKENDS: tuple[str, ...] = ("native", "openpyxl")
+
+_BACKEND_ERROR = "xlsx backend must be one of: native, openpyxl"
+_SHEET_OPEN_ERROR = "workbook is closed"
+
+# Same set openpyxl rejects; dropped so one bad byte cannot abort an export.
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_FLUSH_ROWS = 512
+_SPOOL_BYTES = 8 * 1024 * 1024
+_COPY_BYTES = 1024 * 1024
+
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_CT_PREFIX = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+
+_STYLES = (
+    _XML_DECL
+    + f'<styleSheet xmlns="{_NS_MAIN}">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/><family val="2"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="49" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+_TEXT_STYLE = ' s="1"'
+
+
+def validate_backend(backend: str) -> str:
+    if backend not in XLSX_BACKENDS:
+        raise ValueError(_BACKEND_ERROR)
+    return backend
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _text_element(text: str) -> str:
+    escaped = escape(_ILLEGAL_XML.sub("", text))
+    if escaped != escaped.strip():
+        return f'<t xml:space="preserve">{escaped}</t>'
+    return f"<t>{escaped}</t>"
+
+
+class BinarySink(Protocol):
+    """Minimal writable binary stream accepted by :class:`NativeXLSXWriter`."""
+
+    def write(self, data: bytes, /) -> int: ...
+
+    def flush(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class NativeXLSXWriter:
+    """Write an XLSX package sheet by sheet without a cell object model.
+
+    Rows of a sheet are serialised straight to XML into a spooled temporary
+    file (in memory up to 8 MiB) and then copied into the zip entry behind a
+    ``<dimension>`` element, so memory stays flat regardless of sheet size
+    and readers still see the used range.  Repeated strings are
+    interned in ``xl/sharedStrings.xml`` until ``shared_strings_limit``
+    distinct values are stored; later new values are written inline so a
+    column of unique identifiers cannot grow the table without bound.
+    Columns listed in ``text_columns`` use the built-in ``@`` (text) number
+    format, matching ``numbers.FORMAT_TEXT`` in the openpyxl backend.
+
+    ``handle`` may be non-seekable (e.g. :class:`HashingWriter`); entries
+    are then written with data descriptors.
+    """
+
+    def __init__(
+        self,
+        handle: BinarySink,
+        *,
+        rtl: bool = True,
+        shared_strings_limit: int = 100_000,
+    ) -> None:
+        self._archive: zipfile.ZipFile | None = zipfile.ZipFile(
+            handle, "w", compression=zipfile.ZIP_DEFLATED
+        )
+        self._rtl = rtl
+        self._shared_limit = shared_strings_limit
+        self._shared: dict[str, int] = {}
+        self._shared_refs = 0
+        self._sheets: list[str] = []
+
+    def __enter__(self) -> NativeXLSXWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def write_sheet(
+        self,
+        name: str,
+        header: Sequence[str],
+        rows: Iterable[Sequence[str]],
+        *,
+        text_columns: Collection[int] = (),
+    ) -> int:
+        """Stream ``header`` and ``rows`` into a new sheet; return the data row count."""
+
+        if self._archive is None:
+            raise ValueError(_SHEET_OPEN_ERROR)
+        self._sheets.append(name)
+        part = f"xl/worksheets/sheet{len(self._sheets)}.xml"
+        letters = [_column_letter(index) for index in range(len(header))]
+        styles = [_TEXT_STYLE if index in text_columns else "" for index in range(len(header))]
+        plain = [""] * len(header)
+        view = ' rightToLeft="1"' if self._rtl else ""
+        count = 0
+        with tempfile.SpooledTemporaryFile(max_size=_SPOOL_BYTES) as body:
+            buffer = [self._row(1, header, letters, plain)]
+            for number, values in enumerate(rows, start=2):
+                buffer.append(self._row(number, values, letters, styles))
+                count += 1
+                if count % _FLUSH_ROWS == 0:
+                    body.write("".join(buffer).encode("utf-8"))
+                    buffer.clear()
+            body.write("".join(buffer).encode("utf-8"))
+            body.seek(0)
+            last_cell = f"{letters[-1]}{count + 1}" if letters else "A1"
+            with self._archive.open(part, "w", force_zip64=True) as stream:
+                stream.write(
+                    (
+                        _XML_DECL
+                        + f'<worksheet xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}">'
+                        f'<dimension ref="A1:{last_cell}"/>'
+                        f'<sheetViews><sheetView{view} workbookViewId="0"/></sheetViews>'
+                        "<sheetData>"
+                    ).encode("utf-8")
+                )
+                shutil.copyfileobj(body, stream, _COPY_BYTES)
+                stream.write(b"</sheetData></worksheet>")
+        return count
+
+    def close(self) -> None:
+        """Write workbook, styles, shared strings and package metadata parts."""
+
+        archive = self._archive
+        if archive is None:
+            return
+        self._archive = None
+        try:
+            archive.writestr("[Content_Types].xml", self._content_types())
+            archive.writestr(
+                "_rels/.rels",
+                _XML_DECL
+                + f'<Relationships xmlns="{_NS_PKG_REL}">'
+                f'<Relationship Id="rId1" Type="{_REL_TYPE}/officeDocument" Target="xl/workbook.xml"/>'
+                "</Relationships>",
+            )
+            archive.writestr("xl/workbook.xml", self._workbook())
+            archive.writestr("xl/_rels/workbook.xml.rels", self._workbook_rels())
+            archive.writestr("xl/styles.xml", _STYLES)
+            archive.writestr("xl/sharedStrings.xml", self._shared_strings())
+        finally:
+            archive.close()
+
+    def _row(
+        self,
+        number: int,
+        values: Sequence[str],
+        letters: Sequence[str],
+        styles: Sequence[str],
+    ) -> str:
+        shared = self._shared
+        cells = [f'<row r="{number}">']
+        for letter, style, value in zip(letters, styles, values):
+            if not value:
+                cells.append(f'<c r="{letter}{number}"{style}/>')
+                continue
+            index = shared.get(value)
+            if index is None and len(shared) < self._shared_limit:
+                index = shared[value] = len(shared)
+            if index is None:
+                cells.append(
+                    f'<c r="{letter}{number}"{style} t="inlineStr"><is>{_text_element(value)}</is></c>'
+                )
+            else:
+                self._shared_refs += 1
+                cells.append(f'<c r="{letter}{number}"{style} t="s"><v>{index}</v></c>')
+        cells.append("</row>")
+        return "".join(cells)
+
+    def _content_types(self) -> str:
+        overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{index}.xml" '
+            f'ContentType="{_CT_PREFIX}.worksheet+xml"/>'
+            for index in range(1, len(self._sheets) + 1)
+        )
+        return (
+            _XML_DECL
+            + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            f'<Override PartName="/xl/workbook.xml" ContentType="{_CT_PREFIX}.sheet.main+xml"/>'
+            f'<Override PartName="/xl/styles.xml" ContentType="{_CT_PREFIX}.styles+xml"/>'
+            f'<Override PartName="/xl/sharedStrings.xml" ContentType="{_CT_PREFIX}.sharedStrings+xml"/>'
+            f"{overrides}</Types>"
+        )
+
+    def _workbook(self) -> str:
+        sheets = "".join(
+            f'<sheet name={quoteattr(name)} sheetId="{index}" r:id="rId{index}"/>'
+            for index, name in enumerate(self._sheets, start=1)
+        )
+        return (
+            _XML_DECL
+            + f'<workbook xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}">'
+            f"<sheets>{sheets}</sheets></workbook>"
+        )
+
+    def _workbook_rels(self) -> str:
+        count = len(self._sheets)
+        relations = [
+            f'<Relationship Id="rId{index}" Type="{_REL_TYPE}/worksheet" '
+            f'Target="worksheets/sheet{index}.xml"/>'
+            for index in range(1, count + 1)
+        ]
+        relations.append(
+            f'<Relationship Id="rId{count + 1}" Type="{_REL_TYPE}/styles" Target="styles.xml"/>'
+        )
+        relations.append(
+            f'<Relationship Id="rId{count + 2}" Type="{_REL_TYPE}/sharedStrings" '
+            'Target="sharedStrings.xml"/>'
+        )
+        return _XML_DECL + f'<Relationships xmlns="{_NS_PKG_REL}">' + "".join(relations) + "</Relationships>"
+
+    def _shared_strings(self) -> str:
+        items = "".join(f"<si>{_text_element(text)}</si>" for text in self._shared)
+        return (
+            _XML_DECL
+            + f'<sst xmlns="{_NS_MAIN}" count="{self._shared_refs}" uniqueCount="{len(self._shared)}">'
+            f"{items}</sst>"
+        )
+
+
+__all__ = ["BinarySink", "NativeXLSXWriter", "XLSX_BACKENDS", "validate_backend"]
@@ -202,6 +202,19 @@ class AllocationRecord(Base):
     )
 
 
+class AllocationSequenceCounterModel(Base):
+    """Hi/lo counter rows from which allocation id blocks are reserved."""
+
+    __tablename__ = "allocation_sequences"
+
+    name = Column(String(64), primary_key=True)
+    last_value = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        CheckConstraint("last_value >= 0", name="ck_allocation_sequence_non_negative"),
+    )
+
+
 class OutboxMessageModel(Base):
     """Transport-agnostic outbox records for reliable dispatch."""
 
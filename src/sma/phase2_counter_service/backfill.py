@@ -100,7 +100,8 @@ def run_backfill(
     chunk_size:
         Number of rows to process per batch.
     apply:
-        When ``True`` the assignments are persisted; otherwise the run is a dry-run.
+        When ``True`` the assignments are persisted, one transaction per chunk via
+        :meth:`CounterAssignmentService.assign_counters`; otherwise the run is a dry-run.
     observer:
         Optional hook receiving per-chunk statistics, useful for CLI progress output.
 
@@ -127,6 +128,7 @@ def run_backfill(
         applied_chunk = 0
         reused_chunk = 0
         skipped_chunk = 0
+        pending: List[BackfillRow] = []
         for row in chunk:
             prefix = COUNTER_PREFIX[row.gender]
             seq_key = (row.year_code, prefix)
@@ -159,10 +161,16 @@ def run_backfill(
                 skipped += 1
                 skipped_chunk += 1
                 continue
-            counter = service.assign_counter(row.national_id, row.gender, row.year_code)
-            seq_snapshot[seq_key] = max(seq_snapshot.get(seq_key, 0), int(counter[-4:]))
-            applied += 1
-            applied_chunk += 1
+            pending.append(row)
+        if pending:
+            counters = service.assign_counters(
+                [(row.national_id, row.gender, row.year_code) for row in pending]
+            )
+            for row, counter in zip(pending, counters):
+                seq_key = (row.year_code, COUNTER_PREFIX[row.gender])
+                seq_snapshot[seq_key] = max(seq_snapshot.get(seq_key, 0), int(counter[-4:]))
+            applied += len(counters)
+            applied_chunk += len(counters)
         if observer is not None:
             observer.on_chunk(chunk_index, applied_chunk, reused_chunk, skipped_chunk)
 
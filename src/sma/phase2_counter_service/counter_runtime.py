@@ -3,10 +3,11 @@ from __future__ import annotations
 
 import json
 import logging
+from functools import partial
 import unicodedata
 from dataclasses import dataclass
 from hashlib import blake2s
-from typing import Any, Mapping
+from typing import Any, Mapping, Sequence
 
 from sma.core.normalize import normalize_digits
 from sma.hardened_api.redis_support import RedisExecutor, RedisLike, RedisNamespaces
@@ -15,6 +16,13 @@ from .academic_year import AcademicYearProvider
 from .runtime_metrics import CounterRuntimeMetrics
 from .validation import COUNTER_PREFIX, COUNTER_PATTERN
 
+try:  # pragma: no cover - optional dependency
+    from redis.exceptions import NoScriptError
+except ImportError:  # pragma: no cover - fallback when redis extras missing
+    _NOSCRIPT_ERRORS: tuple[type[BaseException], ...] = ()
+else:
+    _NOSCRIPT_ERRORS = (NoScriptError,)
+
 logger = logging.getLogger("counter.runtime")
 
 
@@ -67,6 +75,43 @@ class CounterRuntimeError(Exception):
         self.details = details
 
 
+def _is_noscript(exc: Exception) -> bool:
+    if isinstance(exc, _NOSCRIPT_ERRORS):
+        return True
+    return str(exc).startswith("NOSCRIPT")
+
+
+class _ScriptRunner:
+    """Run Lua scripts by SHA, loading each script once per client.
+
+    ``SCRIPT LOAD`` is issued on first use and again after ``NOSCRIPT``
+    (server restart, failover or ``SCRIPT FLUSH``); every other call sends
+    only the SHA.  Clients without ``evalsha``/``script_load`` keep using
+    ``EVAL`` with the full source.
+    """
+
+    def __init__(self, redis: RedisLike) -> None:
+        self._redis = redis
+        self._shas: dict[str, str] = {}
+        self._cached = hasattr(redis, "evalsha") and hasattr(redis, "script_load")
+
+    async def run(self, script: str, numkeys: int, *keys_and_args: Any) -> Any:
+        redis: Any = self._redis
+        if not self._cached:
+            return await redis.eval(script, numkeys, *keys_and_args)
+        sha = self._shas.get(script)
+        if sha is not None:
+            try:
+                return await redis.evalsha(sha, numkeys, *keys_and_args)
+            except Exception as exc:
+                if not _is_noscript(exc):
+                    raise
+        loaded = await redis.script_load(script)
+        sha = loaded.decode("ascii") if isinstance(loaded, bytes) else str(loaded)
+        self._shas[script] = sha
+        return await redis.evalsha(sha, numkeys, *keys_and_args)
+
+
 class CounterRuntime:
     """High-level orchestrator for counter allocation via Redis."""
 
@@ -96,6 +141,7 @@ class CounterRuntime:
         self._wait_attempts = max(1, wait_attempts)
         self._wait_base = max(5, wait_base_ms)
         self._wait_max = max(self._wait_base, wait_max_ms)
+        self._scripts = _ScriptRunner(redis)
 
     async def allocate(self, payload: Mapping[str, Any], *, correlation_id: str) -> CounterResult:
         try:
@@ -208,7 +254,7 @@ class CounterRuntime:
         sequence_key = self._namespaces.counter_sequence(normalized["year_code"], normalized["gender"])
 
         async def _run_script() -> str:
-            return await self._redis.eval(
+            return await self._scripts.run(
                 _ALLOCATE_SCRIPT,
                 2,
                 student_key,
@@ -232,88 +278,242 @@ class CounterRuntime:
                 correlation_id=correlation_id,
             )
             result = json.loads(response)
-            status = result.get("status")
-            if status == "NEW":
-                counter = result["counter"]
-                if not COUNTER_PATTERN.fullmatch(counter):
-                    raise CounterRuntimeError("COUNTER_STATE_ERROR", "الگوی شماره نامعتبر است.")
-                self._metrics.record_alloc("success")
-                if attempt > 1:
-                    self._metrics.record_retry("counter_allocate", attempts=attempt - 1)
-                return CounterResult(counter=counter, year_code=normalized["year_code"], status="new")
-            if status == "REUSED":
-                counter = result["counter"]
-                if not COUNTER_PATTERN.fullmatch(counter):
-                    raise CounterRuntimeError("COUNTER_STATE_ERROR", "الگوی شماره نامعتبر است.")
-                self._metrics.record_alloc("reused")
-                if attempt > 1:
-                    self._metrics.record_retry("counter_allocate", attempts=attempt - 1)
-                return CounterResult(counter=counter, year_code=normalized["year_code"], status="reused")
-            if status == "PENDING":
+            if result.get("status") == "PENDING":
                 if attempt == self._wait_attempts:
                     break
                 self._metrics.record_retry("counter_allocate")
                 await self._executor.sleep(min(backoff, self._wait_max / 1000.0))
                 backoff = min(backoff * 2, self._wait_max / 1000.0)
                 continue
-            if status == "EXHAUSTED":
-                self._metrics.record_exhausted(normalized["year_code"], normalized["gender"])
-                raise CounterRuntimeError(
-                    "COUNTER_EXHAUSTED",
-                    "ظرفیت شماره ثبت برای این سال تکمیل شده است.",
+            return self._settle(result, normalized, attempt)
+
+        raise _retry_exhausted(attempts)
+
+    async def allocate_many(
+        self,
+        payloads: Sequence[Mapping[str, Any]],
+        *,
+        correlation_id: str,
+        batch_size: int = 500,
+    ) -> list[CounterResult | CounterRuntimeError]:
+        """Allocate counters for many students with one Redis round trip per batch.
+
+        Each batch of up to ``batch_size`` students runs through a single Lua
+        script that applies the :meth:`allocate` logic to every student in
+        order, so counters match calling :meth:`allocate` in a loop (a student
+        repeated in the batch is ``reused``).  Students still held by another
+        writer's placeholder are retried together with the usual backoff.
+        The returned list follows ``payloads``; an entry is the
+        :class:`CounterRuntimeError` that :meth:`allocate` would have raised
+        for that student instead of a :class:`CounterResult`.
+        """
+
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        outcomes: list[CounterResult | CounterRuntimeError | None] = [None] * len(payloads)
+        pending: list[tuple[int, dict[str, Any], str]] = []
+        for index, payload in enumerate(payloads):
+            try:
+                normalized = self._normalize_payload(payload)
+            except ValueError as exc:
+                self._metrics.record_alloc("validation_error")
+                outcomes[index] = CounterRuntimeError(
+                    "COUNTER_VALIDATION_ERROR",
+                    "درخواست نامعتبر است؛ سال/جنسیت/مرکز را بررسی کنید.",
+                    details=str(exc),
                 )
-            raise CounterRuntimeError(
-                "COUNTER_STATE_ERROR",
-                "پاسخ نامعتبر از زیرساخت شمارنده دریافت شد.",
-                details=json.dumps(result, ensure_ascii=False),
+                continue
+            student_hash = _hash_student(normalized["student_id"], salt=self._hash_salt)
+            pending.append((index, normalized, student_hash))
+
+        logger.info(
+            json.dumps(
+                {
+                    "event": "counter.allocate_many.start",
+                    "correlation_id": correlation_id,
+                    "students": len(pending),
+                    "rejected": len(payloads) - len(pending),
+                },
+                ensure_ascii=False,
             )
+        )
+        for start in range(0, len(pending), batch_size):
+            await self._allocate_batch(pending[start : start + batch_size], outcomes, correlation_id)
+        missing = [index for index, outcome in enumerate(outcomes) if outcome is None]
+        if missing:
+            raise RuntimeError(f"COUNTER_OUTCOME_MISSING|نتیجه‌ای برای ردیف‌های {missing} ساخته نشد")
+        results: list[CounterResult | CounterRuntimeError] = [
+            outcome for outcome in outcomes if outcome is not None
+        ]
+        return results
+
+    async def _allocate_batch(
+        self,
+        batch: list[tuple[int, dict[str, Any], str]],
+        outcomes: list[CounterResult | CounterRuntimeError | None],
+        correlation_id: str,
+    ) -> None:
+        backoff = self._wait_base / 1000.0
+        for attempt in range(1, self._wait_attempts + 1):
+            keys: list[str] = []
+            args: list[str] = [_PENDING_JSON, str(self._max_serial), str(self._placeholder_ttl)]
+            for _, normalized, _ in batch:
+                keys.append(self._namespaces.counter_student(normalized["year_code"], normalized["student_id"]))
+                keys.append(self._namespaces.counter_sequence(normalized["year_code"], normalized["gender"]))
+                args.extend(
+                    (
+                        normalized["year_code"],
+                        COUNTER_PREFIX[normalized["gender"]],
+                        str(normalized["center"]),
+                        str(normalized["gender"]),
+                    )
+                )
 
+            response = await self._executor.call(
+                partial(self._scripts.run, _ALLOCATE_MANY_SCRIPT, len(keys), *keys, *args),
+                op_name="counter_allocate_many",
+                correlation_id=correlation_id,
+            )
+            waiting: list[tuple[int, dict[str, Any], str]] = []
+            for item, result in zip(batch, json.loads(response), strict=True):
+                index, normalized, student_hash = item
+                if result.get("status") == "PENDING":
+                    waiting.append(item)
+                    continue
+                try:
+                    outcome: CounterResult | CounterRuntimeError = self._settle(result, normalized, attempt)
+                except CounterRuntimeError as exc:
+                    outcome = exc
+                outcomes[index] = outcome
+                self._log_finish(correlation_id, student_hash, outcome)
+            if not waiting:
+                return
+            batch = waiting
+            if attempt == self._wait_attempts:
+                break
+            for _ in batch:
+                self._metrics.record_retry("counter_allocate")
+            await self._executor.sleep(min(backoff, self._wait_max / 1000.0))
+            backoff = min(backoff * 2, self._wait_max / 1000.0)
+
+        for index, _, student_hash in batch:
+            outcomes[index] = _retry_exhausted(self._wait_attempts)
+            self._log_finish(correlation_id, student_hash, outcomes[index])
+
+    def _settle(self, result: Mapping[str, Any], normalized: Mapping[str, Any], attempt: int) -> CounterResult:
+        status = result.get("status")
+        if status in {"NEW", "REUSED"}:
+            counter = result["counter"]
+            if not COUNTER_PATTERN.fullmatch(counter):
+                raise CounterRuntimeError("COUNTER_STATE_ERROR", "الگوی شماره نامعتبر است.")
+            self._metrics.record_alloc("success" if status == "NEW" else "reused")
+            if attempt > 1:
+                self._metrics.record_retry("counter_allocate", attempts=attempt - 1)
+            return CounterResult(counter=counter, year_code=normalized["year_code"], status=status.lower())
+        if status == "EXHAUSTED":
+            self._metrics.record_exhausted(normalized["year_code"], normalized["gender"])
+            raise CounterRuntimeError(
+                "COUNTER_EXHAUSTED",
+                "ظرفیت شماره ثبت برای این سال تکمیل شده است.",
+            )
         raise CounterRuntimeError(
-            "COUNTER_RETRY_EXHAUSTED",
-            "امکان تخصیص شماره ثبت وجود ندارد؛ دوباره تلاش کنید.",
-            details=f"attempts={attempts}",
+            "COUNTER_STATE_ERROR",
+            "پاسخ نامعتبر از زیرساخت شمارنده دریافت شد.",
+            details=json.dumps(result, ensure_ascii=False),
         )
 
+    @staticmethod
+    def _log_finish(
+        correlation_id: str, student_hash: str, outcome: CounterResult | CounterRuntimeError | None
+    ) -> None:
+        fields: dict[str, object]
+        if isinstance(outcome, CounterResult):
+            fields = {"counter": outcome.counter, "status": outcome.status}
+        else:
+            fields = {"status": "error", "code": getattr(outcome, "code", None)}
+        logger.info(
+            json.dumps(
+                {
+                    "event": "counter.allocate.finish",
+                    "correlation_id": correlation_id,
+                    "student": student_hash,
+                    **fields,
+                },
+                ensure_ascii=False,
+            )
+        )
+
+
+def _retry_exhausted(attempts: int) -> CounterRuntimeError:
+    return CounterRuntimeError(
+        "COUNTER_RETRY_EXHAUSTED",
+        "امکان تخصیص شماره ثبت وجود ندارد؛ دوباره تلاش کنید.",
+        details=f"attempts={attempts}",
+    )
+
 
 _PENDING_JSON = json.dumps({"status": "PENDING"})
 
-_ALLOCATE_SCRIPT = """
--- counter_allocate
+_ALLOCATE_FUNCTION = """
 local json = cjson
-local student_key = KEYS[1]
-local sequence_key = KEYS[2]
-local placeholder = ARGV[1]
-local year_code = ARGV[2]
-local prefix = ARGV[3]
-local center = ARGV[4]
-local gender = ARGV[5]
-local seq_max = tonumber(ARGV[6])
-local ttl_ms = tonumber(ARGV[7])
-
-local existing_json = redis.call('GET', student_key)
-if existing_json then
-    local ok, decoded = pcall(json.decode, existing_json)
-    if not ok or decoded == nil then
-        return json.encode({status = 'PENDING'})
+
+local function allocate(student_key, sequence_key, placeholder, year_code, prefix, center, gender, seq_max, ttl_ms)
+    local existing_json = redis.call('GET', student_key)
+    if existing_json then
+        local ok, decoded = pcall(json.decode, existing_json)
+        if not ok or decoded == nil then
+            return {status = 'PENDING'}
+        end
+        if decoded.status == 'PENDING' then
+            return {status = 'PENDING'}
+        end
+        return {status = 'REUSED', counter = decoded.counter, serial = decoded.serial}
     end
-    if decoded.status == 'PENDING' then
-        return json.encode({status = 'PENDING'})
+
+    redis.call('SET', student_key, placeholder, 'PX', ttl_ms)
+    local seq = redis.call('INCR', sequence_key)
+    if seq > seq_max then
+        redis.call('DEL', student_key)
+        return {status = 'EXHAUSTED'}
     end
-    return json.encode({status = 'REUSED', counter = decoded.counter, serial = decoded.serial})
+    local serial = string.format('%04d', seq)
+    local counter = year_code .. prefix .. serial
+    local payload = {status = 'ASSIGNED', counter = counter, center = center, gender = gender, serial = serial, year_code = year_code}
+    redis.call('SET', student_key, json.encode(payload))
+    return {status = 'NEW', counter = counter, serial = serial}
 end
+"""
 
-redis.call('SET', student_key, placeholder, 'PX', ttl_ms)
-local seq = redis.call('INCR', sequence_key)
-if seq > seq_max then
-    redis.call('DEL', student_key)
-    return json.encode({status = 'EXHAUSTED'})
+_ALLOCATE_SCRIPT = (
+    "-- counter_allocate"
+    + _ALLOCATE_FUNCTION
+    + """
+return json.encode(allocate(
+    KEYS[1], KEYS[2], ARGV[1], ARGV[2], ARGV[3], ARGV[4], ARGV[5], tonumber(ARGV[6]), tonumber(ARGV[7])
+))
+"""
+)
+
+# KEYS: (student_key, sequence_key) per student.
+# ARGV: placeholder, seq_max, ttl_ms, then (year_code, prefix, center, gender) per student.
+_ALLOCATE_MANY_SCRIPT = (
+    "-- counter_allocate_many"
+    + _ALLOCATE_FUNCTION
+    + """
+local placeholder = ARGV[1]
+local seq_max = tonumber(ARGV[2])
+local ttl_ms = tonumber(ARGV[3])
+local results = {}
+for i = 1, #KEYS / 2 do
+    local base = 3 + (i - 1) * 4
+    results[i] = allocate(
+        KEYS[2 * i - 1], KEYS[2 * i], placeholder,
+        ARGV[base + 1], ARGV[base + 2], ARGV[base + 3], ARGV[base + 4], seq_max, ttl_ms
+    )
 end
-local serial = string.format('%04d', seq)
-local counter = year_code .. prefix .. serial
-local payload = {status = 'ASSIGNED', counter = counter, center = center, gender = gender, serial = serial, year_code = year_code}
-redis.call('SET', student_key, json.encode(payload))
-return json.encode({status = 'NEW', counter = counter, serial = serial})
+return json.encode(results)
 """
+)
 
 
 __all__ = ["CounterRuntime", "CounterRuntimeError", "CounterResult"]
@@ -3,17 +3,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable, Mapping, Optional, Sequence, Tuple, cast
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple, cast
 
-from sqlalchemy import Select, select
+from sqlalchemy import Select, select, update
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlalchemy.orm import Session, sessionmaker
 
 from sma.infrastructure.persistence.models import CounterSequenceModel, StudentModel
 
-from .errors import CounterServiceError, db_conflict, invalid_national_id
-from .types import CounterRepository, GenderLiteral
-from .validation import COUNTER_PREFIX, ensure_counter_format, ensure_sequence_bounds
+from .errors import CounterServiceError, counter_exhausted, db_conflict, invalid_national_id
+from .types import CounterRepository, CounterReservation, GenderLiteral
+from .validation import COUNTER_MAX_SEQ, COUNTER_PREFIX, ensure_counter_format, ensure_sequence_bounds
 
 
 @dataclass(slots=True)
@@ -87,6 +87,29 @@ class SqlAlchemyCounterRepository(CounterRepository):
                         return existing
                     continue
 
+    def reserve_and_bind_many(
+        self, rows: Sequence[Tuple[str, GenderLiteral, str]]
+    ) -> List[CounterReservation]:
+        """Bind counters for a whole chunk of normalized rows in one transaction.
+
+        Sequence numbers are reserved as a contiguous range per ``(year_code, prefix)``,
+        skipping numbers already held by another student (reported as a ``"counter"``
+        conflict on the row that skipped them), and written with a single bulk UPDATE.
+        If the batch still hits an integrity error it is rolled back and replayed row
+        by row through :meth:`reserve_and_bind`, so conflicts stay classified per row.
+        """
+
+        if not rows:
+            return []
+        with self._session_factory() as session:
+            try:
+                outcomes = self._reserve_batch(session, rows)
+                session.commit()
+                return outcomes
+            except IntegrityError:
+                session.rollback()
+        return [self._reserve_row(national_id, gender, year_code) for national_id, gender, year_code in rows]
+
     def fetch_existing_counters(self, national_ids: Sequence[str]) -> Mapping[str, str]:
         if not national_ids:
             return {}
@@ -126,6 +149,104 @@ class SqlAlchemyCounterRepository(CounterRepository):
             session.flush()
         return counter
 
+    def _reserve_batch(
+        self,
+        session: Session,
+        rows: Sequence[Tuple[str, GenderLiteral, str]],
+    ) -> List[CounterReservation]:
+        stmt = select(StudentModel.national_id, StudentModel.counter).where(
+            StudentModel.national_id.in_(list(dict.fromkeys(national_id for national_id, _, _ in rows)))
+        )
+        if session.bind and session.bind.dialect.name != "sqlite":  # pragma: no branch - dialect guard
+            stmt = stmt.with_for_update()
+        current: Dict[str, Optional[str]] = {nid: counter for nid, counter in session.execute(stmt)}
+
+        outcomes: List[Optional[CounterReservation]] = [None] * len(rows)
+        pending: Dict[Tuple[str, str], List[int]] = {}
+        first_seen: Dict[str, int] = {}
+        duplicates: List[Tuple[int, int]] = []
+        for index, (national_id, gender, year_code) in enumerate(rows):
+            if national_id in first_seen:
+                duplicates.append((index, first_seen[national_id]))
+                continue
+            first_seen[national_id] = index
+            if national_id not in current:
+                outcomes[index] = CounterReservation(
+                    national_id, None, error=invalid_national_id("دانش‌آموز وجود ندارد.")
+                )
+                continue
+            existing = current[national_id]
+            if existing:
+                try:
+                    outcomes[index] = CounterReservation(national_id, ensure_counter_format(existing), reused=True)
+                except CounterServiceError as err:
+                    outcomes[index] = CounterReservation(national_id, None, error=err)
+                continue
+            pending.setdefault((year_code, COUNTER_PREFIX[gender]), []).append(index)
+
+        bindings: List[Dict[str, str]] = []
+        for (year_code, prefix), indexes in pending.items():
+            seq_row = self._sequence_row(session, year_code, prefix)
+            seq = int(seq_row.last_seq)
+            taken = self._taken_sequences(session, year_code, prefix, seq + 1)
+            for index in indexes:
+                national_id = rows[index][0]
+                conflict_type: Optional[str] = None
+                seq += 1
+                while seq in taken:
+                    conflict_type = "counter"
+                    seq += 1
+                if seq > COUNTER_MAX_SEQ:
+                    outcomes[index] = CounterReservation(
+                        national_id,
+                        None,
+                        error=counter_exhausted("محدوده شماره شمارنده به پایان رسیده است."),
+                    )
+                    continue
+                counter = ensure_counter_format(f"{year_code}{prefix}{seq:04d}")
+                setattr(seq_row, "last_seq", seq)
+                bindings.append({"national_id": national_id, "counter": counter})
+                outcomes[index] = CounterReservation(national_id, counter, conflict_type=conflict_type)
+
+        for index, first in duplicates:
+            original = cast(CounterReservation, outcomes[first])
+            outcomes[index] = CounterReservation(
+                original.national_id,
+                original.counter,
+                reused=original.counter is not None,
+                error=original.error,
+            )
+
+        if bindings:
+            self._faults.raise_if("duplicate_counter")
+            session.execute(update(StudentModel), bindings)
+        return cast(List[CounterReservation], outcomes)
+
+    def _reserve_row(self, national_id: str, gender: GenderLiteral, year_code: str) -> CounterReservation:
+        conflicts: List[str] = []
+        conflict_type: Optional[str] = None
+        try:
+            existing = self.fetch_student_counter(national_id)
+            if existing:
+                return CounterReservation(national_id, existing, reused=True)
+            counter = self.reserve_and_bind(national_id, gender, year_code, on_conflict=conflicts.append)
+        except CounterServiceError as err:
+            conflict_type = conflicts[-1] if conflicts else None
+            return CounterReservation(national_id, None, conflict_type=conflict_type, error=err)
+        if conflicts:
+            conflict_type = conflicts[-1]
+        return CounterReservation(national_id, counter, conflict_type=conflict_type)
+
+    def _taken_sequences(self, session: Session, year_code: str, prefix: str, start: int) -> Set[int]:
+        """Return sequence numbers at or above ``start`` already bound to a student."""
+
+        if start > COUNTER_MAX_SEQ:
+            return set()
+        stmt = select(StudentModel.counter).where(
+            StudentModel.counter.between(f"{year_code}{prefix}{start:04d}", f"{year_code}{prefix}{COUNTER_MAX_SEQ:04d}")
+        )
+        return {int(counter[-4:]) for counter in session.execute(stmt).scalars()}
+
     def _lock_student(self, session: Session, national_id: str) -> StudentModel:
         stmt: Select[Tuple[StudentModel]] = select(StudentModel).where(StudentModel.national_id == national_id)
         if session.bind and session.bind.dialect.name != "sqlite":  # pragma: no branch - dialect guard
@@ -137,6 +258,17 @@ class SqlAlchemyCounterRepository(CounterRepository):
         return result
 
     def _next_sequence(self, session: Session, year_code: str, prefix: str) -> int:
+        seq_row = self._sequence_row(session, year_code, prefix)
+        with session.begin_nested():
+            next_value = ensure_sequence_bounds(int(seq_row.last_seq) + 1)
+            setattr(seq_row, "last_seq", next_value)
+            self._faults.raise_if("duplicate_national_id")
+            session.flush()
+        return next_value
+
+    def _sequence_row(self, session: Session, year_code: str, prefix: str) -> CounterSequenceModel:
+        """Lock the sequence row for ``(year_code, prefix)``, creating it when missing."""
+
         for _ in range(self._max_retries):
             seq_row = self._select_sequence_row(session, year_code, prefix)
             if seq_row is None:
@@ -147,12 +279,7 @@ class SqlAlchemyCounterRepository(CounterRepository):
                 seq_row = self._select_sequence_row(session, year_code, prefix)
                 if seq_row is None:
                     continue
-            with session.begin_nested():
-                next_value = ensure_sequence_bounds(int(seq_row.last_seq) + 1)
-                setattr(seq_row, "last_seq", next_value)
-                self._faults.raise_if("duplicate_national_id")
-                session.flush()
-            return next_value
+            return seq_row
         raise db_conflict("Could not fetch sequence row after retries")
 
     def _select_sequence_row(
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple, cast
 
 from .errors import CounterServiceError
 from .types import CounterRepository, GenderLiteral, HashFunc, LoggerLike, MeterLike
@@ -20,28 +20,12 @@ class CounterAssignmentService:
     hash_fn: HashFunc
 
     def assign_counter(self, national_id: str, gender: GenderLiteral, year_code: str) -> str:
-        normalized_nid: str
-        normalized_year: str
-        try:
-            normalized_nid, normalized_year = ensure_valid_inputs(national_id, gender, year_code)
-        except CounterServiceError as err:
-            self.meters.record_validation_error(err.detail.code)
-            self.logger.warning(
-                "validation_failed",
-                extra={"کد": err.detail.code, "شناسه": self.hash_fn(normalize(national_id))},
-            )
-            raise
-
+        normalized_nid, normalized_year = self._validate(national_id, gender, year_code)
         hashed_nid = self.hash_fn(normalized_nid)
 
         existing = self.repository.fetch_student_counter(normalized_nid)
         if existing:
-            self._audit_prefix(existing, gender, normalized_year, hashed_nid)
-            self.meters.record_reuse(gender)
-            self.logger.info(
-                "counter_reused",
-                extra={"شناسه": hashed_nid, "counter": existing},
-            )
+            self._record_reuse(existing, gender, normalized_year, hashed_nid)
             return existing
 
         conflict_type: Optional[str] = None
@@ -58,21 +42,93 @@ class CounterAssignmentService:
                 on_conflict=_on_conflict,
             )
         except CounterServiceError as err:
-            if err.detail.code == "E_COUNTER_EXHAUSTED":
-                self.meters.record_sequence_exhausted(normalized_year, gender)
+            self._record_failure(err, gender, normalized_year, hashed_nid)
+            raise
+
+        self._record_bound(counter, gender, normalized_year, hashed_nid, conflict_type)
+        return counter
+
+    def assign_counters(self, rows: Sequence[Tuple[str, GenderLiteral, str]]) -> List[str]:
+        """Assign counters for a chunk of ``(national_id, gender, year_code)`` rows.
+
+        Uses :meth:`CounterRepository.reserve_and_bind_many` so the whole chunk is
+        bound in one transaction; metrics and logs are still emitted per row as in
+        :meth:`assign_counter`.  The first per-row error is raised after every row
+        has been accounted for.
+        """
+
+        normalized: List[Tuple[str, GenderLiteral, str]] = []
+        for national_id, gender, year_code in rows:
+            normalized_nid, normalized_year = self._validate(national_id, gender, year_code)
+            normalized.append((normalized_nid, gender, normalized_year))
+
+        reservations = self.repository.reserve_and_bind_many(normalized)
+        counters: List[str] = []
+        first_error: Optional[CounterServiceError] = None
+        for (normalized_nid, gender, normalized_year), reservation in zip(normalized, reservations):
+            hashed_nid = self.hash_fn(normalized_nid)
+            if reservation.error is not None:
+                self._record_failure(reservation.error, gender, normalized_year, hashed_nid)
+                first_error = first_error or reservation.error
+                continue
+            counter = cast(str, reservation.counter)
+            if reservation.reused:
+                self._record_reuse(counter, gender, normalized_year, hashed_nid)
             else:
-                self.meters.record_failure(err.detail.code)
-            self.logger.error(
-                "counter_failed",
-                extra={
-                    "کد": err.detail.code,
-                    "جزئیات": err.detail.details,
-                    "شناسه": hashed_nid,
-                },
+                self._record_bound(counter, gender, normalized_year, hashed_nid, reservation.conflict_type)
+            counters.append(counter)
+        if first_error is not None:
+            raise first_error
+        return counters
+
+    def _validate(self, national_id: str, gender: GenderLiteral, year_code: str) -> Tuple[str, str]:
+        try:
+            return ensure_valid_inputs(national_id, gender, year_code)
+        except CounterServiceError as err:
+            self.meters.record_validation_error(err.detail.code)
+            self.logger.warning(
+                "validation_failed",
+                extra={"کد": err.detail.code, "شناسه": self.hash_fn(normalize(national_id))},
             )
             raise
 
-        self._audit_prefix(counter, gender, normalized_year, hashed_nid)
+    def _record_reuse(self, counter: str, gender: GenderLiteral, year_code: str, hashed_nid: str) -> None:
+        self._audit_prefix(counter, gender, year_code, hashed_nid)
+        self.meters.record_reuse(gender)
+        self.logger.info(
+            "counter_reused",
+            extra={"شناسه": hashed_nid, "counter": counter},
+        )
+
+    def _record_failure(
+        self,
+        err: CounterServiceError,
+        gender: GenderLiteral,
+        year_code: str,
+        hashed_nid: str,
+    ) -> None:
+        if err.detail.code == "E_COUNTER_EXHAUSTED":
+            self.meters.record_sequence_exhausted(year_code, gender)
+        else:
+            self.meters.record_failure(err.detail.code)
+        self.logger.error(
+            "counter_failed",
+            extra={
+                "کد": err.detail.code,
+                "جزئیات": err.detail.details,
+                "شناسه": hashed_nid,
+            },
+        )
+
+    def _record_bound(
+        self,
+        counter: str,
+        gender: GenderLiteral,
+        year_code: str,
+        hashed_nid: str,
+        conflict_type: Optional[str],
+    ) -> None:
+        self._audit_prefix(counter, gender, year_code, hashed_nid)
         if conflict_type is not None:
             self.meters.record_conflict(conflict_type)
             self.logger.warning(
@@ -84,7 +140,7 @@ class CounterAssignmentService:
                     "counter": counter,
                 },
             )
-            return counter
+            return
 
         self.meters.record_success(gender)
         self.logger.info(
@@ -92,11 +148,10 @@ class CounterAssignmentService:
             extra={
                 "شناسه": hashed_nid,
                 "counter": counter,
-                "کد_سال": normalized_year,
+                "کد_سال": year_code,
                 "پیشوند": COUNTER_PREFIX[gender],
             },
         )
-        return counter
 
     def _audit_prefix(
         self,
@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Callable, Literal, Mapping, Optional, Protocol, Sequence, Tuple
+from typing import TYPE_CHECKING, Any, Callable, List, Literal, Mapping, Optional, Protocol, Sequence, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle guard
+    from .errors import CounterServiceError
 
 GenderLiteral = Literal[0, 1]
 
@@ -27,6 +30,32 @@ class ErrorDetail:
     details: str
 
 
+@dataclass(frozen=True, slots=True)
+class CounterReservation:
+    """Per-row outcome of :meth:`CounterRepository.reserve_and_bind_many`.
+
+    Attributes
+    ----------
+    national_id:
+        Normalized national identifier of the row.
+    counter:
+        Counter bound to the student, or ``None`` when ``error`` is set.
+    reused:
+        ``True`` when the student already held a counter.
+    conflict_type:
+        Conflict classification (``"counter"``, ``"national_id"``, ...) when the
+        row was bound only after resolving a conflict.
+    error:
+        Domain error for rows that could not be bound.
+    """
+
+    national_id: str
+    counter: Optional[str]
+    reused: bool = False
+    conflict_type: Optional[str] = None
+    error: Optional["CounterServiceError"] = None
+
+
 class LoggerLike(Protocol):
     """Protocol representing the structured logger adapter used by the service."""
 
@@ -82,6 +111,10 @@ class CounterRepository(Protocol):
         on_conflict: Optional[Callable[[str], None]] = None,
     ) -> str: ...
 
+    def reserve_and_bind_many(
+        self, rows: Sequence[Tuple[str, GenderLiteral, str]]
+    ) -> List[CounterReservation]: ...
+
     def fetch_existing_counters(self, national_ids: Sequence[str]) -> Mapping[str, str]: ...
 
     def snapshot_sequences(self) -> Mapping[Tuple[str, str], int]: ...
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-import io
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Optional, cast
 from uuid import uuid4
 
 from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 from prometheus_client import CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest
 from redis import Redis
 
@@ -16,8 +16,9 @@ from sma.audit.service import AuditService
 
 from .clock import Clock, SystemClock
 from .config import DEFAULT_CONFIG, UploadsConfig
-from .errors import UploadError, envelope
+from .errors import UploadError
 from .metrics import UploadsMetrics
+from .multipart_stream import FormFileReader, StreamedMultipartForm, parse_boundary
 # from .middleware import AuthMiddleware, IdempotencyMiddleware, RateLimitMiddleware # حذف شد
 # فرض بر این است که میدلویرهای امنیتی دیگر در جای دیگری تعریف نمی‌شوند یا جایگزین می‌شوند
 # اگر میدلویرهای غیرامنیتی وجود داشتند، ممکن بود وارد شوند
@@ -108,89 +109,13 @@ def create_app(
     def get_service() -> UploadService:
         return app.state.upload_service
 
-    def _parse_multipart(content_type: str | None, body: bytes):
-        def _multipart_error(reason: str) -> UploadError:
-            return UploadError(
-                envelope(
-                    "UPLOAD_MULTIPART_INVALID",
-                    details={"reason": reason},
-                )
-            )
-
-        if not content_type:
-            raise _multipart_error("missing-content-type")
-        if "boundary=" not in content_type:
-            raise _multipart_error("missing-boundary")
-        boundary = content_type.split("boundary=")[-1].strip()
-        if not boundary:
-            raise _multipart_error("empty-boundary")
-        delimiter = f"--{boundary}".encode("utf-8")
-        if delimiter not in body:
-            raise _multipart_error("boundary-not-found")
-        if not body.strip().endswith(delimiter + b"--") and not body.strip().endswith(
-            delimiter + b"--\r\n"
-        ):
-            raise _multipart_error("missing-closing-boundary")
-
-        fields: dict[str, str] = {}
-        file_payload: bytes | None = None
-        filename = "upload.csv"
-        file_parts = 0
-        parts = body.split(delimiter)
-        for raw_part in parts:
-            if not raw_part or raw_part in (b"", b"--"):
-                continue
-            part = raw_part.lstrip(b"\r\n")
-            if part in (b"", b"--", b"--\r\n"):
-                continue
-            if b"\r\n\r\n" not in part:
-                raise _multipart_error("header-terminator-missing")
-            header, _, value = part.partition(b"\r\n\r\n")
-            headers = header.decode("utf-8", errors="ignore").split("\r\n")
-            disposition_line = next(
-                (h for h in headers if h.lower().startswith("content-disposition")),
-                "",
-            )
-            if not disposition_line:
-                raise _multipart_error("disposition-missing")
-            attrs: dict[str, str] = {}
-            for item in disposition_line.split(";"):
-                if "=" not in item:
-                    continue
-                key, val = item.strip().split("=", 1)
-                attrs[key.lower()] = val.strip().strip('"')
-            name = attrs.get("name")
-            if not name:
-                raise _multipart_error("name-missing")
-            if value.endswith(b"\r\n"):
-                payload = value[:-2]
-            else:
-                payload = value
-            if attrs.get("filename") is not None:
-                file_parts += 1
-                if file_parts > 1:
-                    raise UploadError(envelope("UPLOAD_MULTIPART_FILE_COUNT"))
-                filename = attrs.get("filename") or filename
-                if not payload:
-                    raise _multipart_error("file-empty")
-                file_payload = payload
-            else:
-                try:
-                    fields[name] = payload.decode("utf-8").strip()
-                except UnicodeDecodeError as exc:  # pragma: no cover - strict decode
-                    raise _multipart_error("field-decode-error") from exc
-        if file_payload is None:
-            raise _multipart_error("file-missing")
-        return fields, filename, file_payload
-
-    @app.post("/uploads")
-    async def post_upload(
+    async def _handle_upload(
         request: Request,
-        service: UploadService = Depends(get_service),
+        service: UploadService,
+        form: StreamedMultipartForm,
+        source: BinaryIO,
     ):
-        fields, filename, file_bytes = _parse_multipart(
-            request.headers.get("content-type"), await request.body()
-        )
+        fields, filename = form.fields, form.filename
         profile = fields.get("profile")
         year = fields.get("year")
         if not profile or profile not in service.config.allowed_profiles:
@@ -221,7 +146,7 @@ def create_app(
         center_scope = _resolve_center(request.headers.get("X-Center"))
         audit = app.state.audit_service
         try:
-            record = service.upload(context, io.BytesIO(file_bytes))
+            record = await run_in_threadpool(service.upload, context, source)
         except UploadError as exc:
             if audit is not None:
                 await audit.record_event(
@@ -263,6 +188,31 @@ def create_app(
         # فرض بر این است که middleware_chain دیگر معنایی ندارد
         return response
 
+    @app.post("/uploads")
+    async def post_upload(
+        request: Request,
+        service: UploadService = Depends(get_service),
+    ):
+        form = StreamedMultipartForm(
+            request.stream(), parse_boundary(request.headers.get("content-type"))
+        )
+        await form.open_file()
+        spooled: Optional[BinaryIO] = None
+        source: BinaryIO
+        if "profile" in form.fields and "year" in form.fields:
+            # فیلدها پیش از فایل آمده‌اند؛ بدنه مستقیم به سرویس جریان می‌یابد
+            source = cast(BinaryIO, FormFileReader(form))
+        else:
+            source = spooled = await form.spool_file(
+                max_bytes=service.config.max_upload_bytes,
+                directory=service.storage.base_dir,
+            )
+        try:
+            return await _handle_upload(request, service, form, source)
+        finally:
+            if spooled is not None:
+                spooled.close()
+
     @app.get("/uploads/{upload_id}")
     async def get_upload(upload_id: str, service: UploadService = Depends(get_service)):
         record = service.get_upload(upload_id)
@@ -12,6 +12,7 @@ DEFAULT_RETRY_BASE_DELAY = 0.05
 DEFAULT_RETRY_MAX_DELAY = 0.6
 DEFAULT_UI_PREVIEW_ROWS = 5
 DEFAULT_NAMESPACE = "default"
+DEFAULT_IDEMPOTENCY_TTL_SECONDS = 86_400
 
 
 @dataclass(frozen=True, slots=True)
@@ -26,6 +27,7 @@ class UploadsConfig:
     retry_max_delay: float = DEFAULT_RETRY_MAX_DELAY
     ui_preview_rows: int = DEFAULT_UI_PREVIEW_ROWS
     namespace: str = DEFAULT_NAMESPACE
+    idempotency_ttl_seconds: int = DEFAULT_IDEMPOTENCY_TTL_SECONDS
 
     @staticmethod
     def _assert_keys(data: dict[str, Any], allowed: Iterable[str]) -> None:
@@ -48,6 +50,7 @@ class UploadsConfig:
             "retry_max_delay",
             "ui_preview_rows",
             "namespace",
+            "idempotency_ttl_seconds",
         }
         cls._assert_keys(data, allowed)
         base_dir = Path(data.get("base_dir", Path.cwd())).resolve()
@@ -70,6 +73,9 @@ class UploadsConfig:
             retry_max_delay=float(data.get("retry_max_delay", DEFAULT_RETRY_MAX_DELAY)),
             ui_preview_rows=int(data.get("ui_preview_rows", DEFAULT_UI_PREVIEW_ROWS)),
             namespace=str(data.get("namespace", DEFAULT_NAMESPACE)),
+            idempotency_ttl_seconds=int(
+                data.get("idempotency_ttl_seconds", DEFAULT_IDEMPOTENCY_TTL_SECONDS)
+            ),
         )
 
     def ensure_directories(self) -> None:
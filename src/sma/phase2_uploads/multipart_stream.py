@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import io
+import tempfile
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Deque, List, Optional, Union, cast
+
+import anyio.from_thread
+
+from .errors import UploadError, envelope
+
+HEADER_LIMIT = 16 * 1024
+FIELD_LIMIT = 64 * 1024
+SPOOL_MEMORY_BYTES = 4 * 1024 * 1024
+DEFAULT_FILENAME = "upload.csv"
+
+
+def multipart_error(reason: str) -> UploadError:
+    return UploadError(envelope("UPLOAD_MULTIPART_INVALID", details={"reason": reason}))
+
+
+def parse_boundary(content_type: str | None) -> bytes:
+    if not content_type:
+        raise multipart_error("missing-content-type")
+    if "boundary=" not in content_type:
+        raise multipart_error("missing-boundary")
+    boundary = content_type.split("boundary=")[-1].strip()
+    if not boundary:
+        raise multipart_error("empty-boundary")
+    return boundary.encode("utf-8")
+
+
+@dataclass(frozen=True, slots=True)
+class PartStart:
+    name: str
+    filename: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class PartData:
+    data: bytes
+
+
+@dataclass(frozen=True, slots=True)
+class PartEnd:
+    pass
+
+
+Event = Union[PartStart, PartData, PartEnd]
+
+_PREAMBLE, _DELIMITER, _HEADERS, _BODY, _DONE = range(5)
+
+
+class MultipartParser:
+    """Push parser for ``multipart/form-data`` bodies fed in arbitrary chunks.
+
+    Only the unmatched tail of a part body (shorter than the boundary) is
+    kept between :meth:`feed` calls, so memory does not depend on part size.
+    """
+
+    def __init__(self, boundary: bytes) -> None:
+        self._delimiter = b"--" + boundary
+        self._separator = b"\r\n" + self._delimiter
+        self._buffer = bytearray()
+        self._state = _PREAMBLE
+
+    def feed(self, data: bytes) -> List[Event]:
+        self._buffer += data
+        events: List[Event] = []
+        while True:
+            if self._state == _PREAMBLE:
+                index = self._buffer.find(self._delimiter)
+                if index < 0:
+                    keep = len(self._delimiter) - 1
+                    if len(self._buffer) > keep:
+                        del self._buffer[: len(self._buffer) - keep]
+                    return events
+                del self._buffer[: index + len(self._delimiter)]
+                self._state = _DELIMITER
+            elif self._state == _DELIMITER:
+                if len(self._buffer) < 2:
+                    return events
+                if self._buffer.startswith(b"--"):
+                    self._state = _DONE
+                    self._buffer.clear()
+                    return events
+                line_end = self._buffer.find(b"\r\n")
+                if line_end < 0:
+                    if len(self._buffer) > HEADER_LIMIT:
+                        raise multipart_error("header-terminator-missing")
+                    return events
+                del self._buffer[: line_end + 2]
+                self._state = _HEADERS
+            elif self._state == _HEADERS:
+                if self._buffer.startswith(b"\r\n"):
+                    header_end, skip = 0, 2
+                else:
+                    header_end, skip = self._buffer.find(b"\r\n\r\n"), 4
+                if header_end < 0:
+                    if len(self._buffer) > HEADER_LIMIT:
+                        raise multipart_error("header-terminator-missing")
+                    return events
+                raw_headers = bytes(self._buffer[:header_end])
+                del self._buffer[: header_end + skip]
+                events.append(self._part_start(raw_headers))
+                self._state = _BODY
+            elif self._state == _BODY:
+                index = self._buffer.find(self._separator)
+                if index < 0:
+                    safe = len(self._buffer) - (len(self._separator) - 1)
+                    if safe > 0:
+                        events.append(PartData(bytes(self._buffer[:safe])))
+                        del self._buffer[:safe]
+                    return events
+                if index:
+                    events.append(PartData(bytes(self._buffer[:index])))
+                events.append(PartEnd())
+                del self._buffer[: index + len(self._separator)]
+                self._state = _DELIMITER
+            else:
+                self._buffer.clear()
+                return events
+
+    def close(self) -> None:
+        if self._state == _PREAMBLE:
+            raise multipart_error("boundary-not-found")
+        if self._state == _HEADERS:
+            raise multipart_error("header-terminator-missing")
+        if self._state != _DONE:
+            raise multipart_error("missing-closing-boundary")
+
+    @staticmethod
+    def _part_start(raw_headers: bytes) -> PartStart:
+        headers = raw_headers.decode("utf-8", errors="ignore").split("\r\n")
+        disposition_line = next(
+            (h for h in headers if h.lower().startswith("content-disposition")),
+            "",
+        )
+        if not disposition_line:
+            raise multipart_error("disposition-missing")
+        attrs: dict[str, str] = {}
+        for item in disposition_line.split(";"):
+            if "=" not in item:
+                continue
+            key, val = item.strip().split("=", 1)
+            attrs[key.lower()] = val.strip().strip('"')
+        name = attrs.get("name")
+        if not name:
+            raise multipart_error("name-missing")
+        return PartStart(name=name, filename=attrs.get("filename"))
+
+
+class StreamedMultipartForm:
+    """Walk a request body and expose its single file part as a chunk stream.
+
+    Text fields are collected into :attr:`fields`.  The end of the file is
+    only reported once the whole body has been parsed, so a second file or a
+    truncated body fails the upload instead of being silently ignored.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], boundary: bytes) -> None:
+        self._chunks = chunks
+        self._parser = MultipartParser(boundary)
+        self._pending: Deque[bytes] = deque()
+        self._field: Optional[str] = None
+        self._field_value = bytearray()
+        self._in_file = False
+        self._file_seen = False
+        self._file_bytes = 0
+        self._done = False
+        self.fields: dict[str, str] = {}
+        self.filename = DEFAULT_FILENAME
+
+    async def open_file(self) -> None:
+        """Parse up to the start of the file part (``file-missing`` when absent)."""
+
+        while not self._file_seen:
+            if self._done:
+                raise multipart_error("file-missing")
+            await self._pump()
+
+    async def read_file_chunk(self) -> bytes:
+        """Return the next file chunk, or ``b""`` once the body is exhausted."""
+
+        while not self._pending:
+            if self._done:
+                return b""
+            await self._pump()
+        return self._pending.popleft()
+
+    async def spool_file(self, *, max_bytes: int, directory: Path) -> BinaryIO:
+        """Copy the file part into a spooled temporary file and rewind it."""
+
+        spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES, dir=str(directory))
+        total = 0
+        try:
+            while chunk := await self.read_file_chunk():
+                total += len(chunk)
+                if total > max_bytes:
+                    raise UploadError(envelope("UPLOAD_SIZE_EXCEEDED"))
+                spooled.write(chunk)
+        except BaseException:
+            spooled.close()
+            raise
+        spooled.seek(0)
+        return cast(BinaryIO, spooled)
+
+    async def _pump(self) -> None:
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self._parser.close()
+            self._done = True
+            if not self._file_seen:
+                raise multipart_error("file-missing") from None
+            return
+        for event in self._parser.feed(chunk):
+            if isinstance(event, PartStart):
+                self._start(event)
+            elif isinstance(event, PartData):
+                self._data(event.data)
+            else:
+                self._end()
+
+    def _start(self, event: PartStart) -> None:
+        if event.filename is None:
+            self._field = event.name
+            self._field_value.clear()
+            return
+        if self._file_seen:
+            raise UploadError(envelope("UPLOAD_MULTIPART_FILE_COUNT"))
+        self._file_seen = True
+        self._in_file = True
+        self.filename = event.filename or DEFAULT_FILENAME
+
+    def _data(self, data: bytes) -> None:
+        if self._in_file:
+            self._file_bytes += len(data)
+            self._pending.append(data)
+            return
+        self._field_value += data
+        if len(self._field_value) > FIELD_LIMIT:
+            raise multipart_error("field-too-large")
+
+    def _end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+            if not self._file_bytes:
+                raise multipart_error("file-empty")
+            return
+        if self._field is None:
+            return
+        try:
+            self.fields[self._field] = bytes(self._field_value).decode("utf-8").strip()
+        except UnicodeDecodeError as exc:  # pragma: no cover - strict decode
+            raise multipart_error("field-decode-error") from exc
+        self._field = None
+
+
+class FormFileReader(io.RawIOBase):
+    """Blocking, non-seekable view of a form's file part for worker threads.
+
+    Each read hops back to the event loop with :func:`anyio.from_thread.run`,
+    so it must be consumed from a thread started by anyio (for example
+    ``starlette.concurrency.run_in_threadpool``).
+    """
+
+    def __init__(self, form: StreamedMultipartForm) -> None:
+        super().__init__()
+        self._form = form
+        self._leftover = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._leftover or anyio.from_thread.run(self._form.read_file_chunk)
+        if 0 <= size < len(chunk):
+            chunk, self._leftover = chunk[:size], chunk[size:]
+        else:
+            self._leftover = b""
+        return chunk
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        chunk = self.read(len(buffer))
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+
+__all__ = [
+    "FormFileReader",
+    "MultipartParser",
+    "PartData",
+    "PartEnd",
+    "PartStart",
+    "StreamedMultipartForm",
+    "multipart_error",
+    "parse_boundary",
+]
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 import json
 import os
+import tempfile
 import time
 from dataclasses import dataclass
 from hashlib import sha256
 from pathlib import Path
-from typing import Iterator, Tuple
+from typing import BinaryIO, Iterator, Tuple, cast
 
 from redis import Redis
 from sqlalchemy.exc import IntegrityError
@@ -19,13 +20,20 @@ from .metrics import UploadsMetrics
 from .repository import UploadRecord, UploadRepository
 from .retry import retry
 from .storage import AtomicStorage
-from .validator import CSVValidator
-from .zip_utils import ZipCSVStream, iter_csv_from_zip
+from .validator import CSVValidator, ValidationResult
+from .zip_utils import open_csv_from_zip
 
 
 CHUNK_SIZE = 4 * 1024 * 1024
 
 
+def _is_seekable(file_obj: BinaryIO) -> bool:
+    try:
+        return bool(file_obj.seekable())
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
 @dataclass(slots=True)
 class UploadContext:
     profile: str
@@ -58,16 +66,35 @@ class UploadService:
         self.logger = setup_json_logging()
 
     # --------------- helpers ---------------
-    def _read_stream(self, file_obj) -> bytes:
-        data = bytearray()
+    def _iter_stream(self, file_obj: BinaryIO) -> Iterator[bytes]:
         while True:
             chunk = file_obj.read(CHUNK_SIZE)
             if not chunk:
-                break
-            data.extend(chunk)
-            if len(data) > self.config.max_upload_bytes:
-                raise UploadError(envelope("UPLOAD_SIZE_EXCEEDED"))
-        return bytes(data)
+                return
+            yield chunk
+
+    def _spool_zip(self, file_obj: BinaryIO) -> BinaryIO:
+        """Copy a non-seekable ZIP body to a spooled file so members can be located."""
+
+        spooled = tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE, dir=str(self.storage.base_dir))
+        total = 0
+        try:
+            for chunk in self._iter_stream(file_obj):
+                total += len(chunk)
+                if total > self.config.max_upload_bytes:
+                    raise UploadError(envelope("UPLOAD_SIZE_EXCEEDED"))
+                spooled.write(chunk)
+        except BaseException:
+            spooled.close()
+            raise
+        return cast(BinaryIO, spooled)
+
+    def _ensure_zip_size(self, file_obj: BinaryIO) -> None:
+        origin = file_obj.tell()
+        size = file_obj.seek(0, os.SEEK_END) - origin
+        file_obj.seek(origin)
+        if size > self.config.max_upload_bytes:
+            raise UploadError(envelope("UPLOAD_SIZE_EXCEEDED"))
 
     def _detect_format(self, filename: str) -> str:
         lower = filename.lower()
@@ -78,36 +105,65 @@ class UploadService:
         raise UploadError(envelope("UPLOAD_FORMAT_UNSUPPORTED"))
 
     def _validate_crlf(self, chunk: bytes, previous: int | None) -> int | None:
-        last = previous
-        for index, byte in enumerate(chunk):
-            if byte == 10:  # \n
-                prev = chunk[index - 1] if index > 0 else last
-                if prev != 13:
-                    raise UploadError(
-                        envelope(
-                            "UPLOAD_VALIDATION_ERROR",
-                            details={"reason": "CRLF_REQUIRED"},
-                        )
+        """Ensure every LF in ``chunk`` follows a CR; return the last byte seen.
+
+        CRLF pairs cannot overlap, so the chunk is valid exactly when its LF
+        count equals its CRLF count, plus one when the chunk opens with LF
+        right after a CR that ended the previous chunk.  Both counts run over
+        the whole buffer in C instead of a per-byte Python loop.
+        """
+
+        if not chunk:
+            return previous
+        newlines = chunk.count(b"\n")
+        if newlines:
+            paired = chunk.count(b"\r\n")
+            if chunk[0] == 10 and previous == 13:
+                paired += 1
+            if paired != newlines:
+                raise UploadError(
+                    envelope(
+                        "UPLOAD_VALIDATION_ERROR",
+                        details={"reason": "CRLF_REQUIRED"},
                     )
-            last = byte
-        return last
+                )
+        return chunk[-1]
+
+    def _write_csv(self, chunks: Iterator[bytes]) -> Tuple[str, Path, int, ValidationResult]:
+        """Write, hash and validate the upload in a single pass over ``chunks``.
+
+        Each chunk is size-checked, CRLF-checked, hashed and written before
+        the incremental :meth:`CSVValidator.validate_stream` parser sees it,
+        so the stored file is never re-read.  Any failure aborts the writer.
+        """
 
-    def _write_csv(self, chunks: Iterator[bytes]) -> Tuple[str, Path, int]:
         writer = self.storage.writer()
         digest = sha256()
         total = 0
-        last_byte: int | None = None
-        for chunk in chunks:
-            total += len(chunk)
-            if total > self.config.max_upload_bytes:
-                writer.abort()
-                raise UploadError(envelope("UPLOAD_SIZE_EXCEEDED"))
-            last_byte = self._validate_crlf(chunk, last_byte)
-            digest.update(chunk)
-            writer.write(chunk)
+
+        def tee() -> Iterator[bytes]:
+            nonlocal total
+            last_byte: int | None = None
+            for chunk in chunks:
+                total += len(chunk)
+                if total > self.config.max_upload_bytes:
+                    raise UploadError(envelope("UPLOAD_SIZE_EXCEEDED"))
+                last_byte = self._validate_crlf(chunk, last_byte)
+                digest.update(chunk)
+                writer.write(chunk)
+                yield chunk
+
+        stream = tee()
+        try:
+            validation = self.validator.validate_stream(stream)
+            for _ in stream:  # drain whatever the parser left unread
+                pass
+        except BaseException:
+            writer.abort()
+            raise
         sha_hex = digest.hexdigest()
         path = self.storage.finalize(sha_hex, writer)
-        return sha_hex, path, total
+        return sha_hex, path, total, validation
 
     def _create_manifest(
         self,
@@ -174,16 +230,30 @@ class UploadService:
         return f"uploads:{self.config.namespace}:activate:{year}"
 
     # --------------- public API ---------------
-    def upload(self, context: UploadContext, file_obj) -> UploadRecord:
+    def upload(self, context: UploadContext, file_obj: BinaryIO) -> UploadRecord:
+        """Stream ``file_obj`` into storage in ``CHUNK_SIZE`` blocks.
+
+        Size, CRLF and SHA-256 are computed on the fly, so memory per upload
+        does not depend on the file size.  Seekable sources are rewound when
+        a write is retried; ZIP bodies that are not seekable are spooled to a
+        temporary file before the CSV member is streamed out of them.
+        """
+
         start = time.perf_counter()
         fmt = self._detect_format(context.filename)
         existing_id, redis_key = self._acquire_idempotency(context)
         if existing_id:
             return self.repository.get(existing_id)
+        spooled: BinaryIO | None = None
         try:
-            raw_bytes = self._read_stream(file_obj)
+            attempts = self.config.retry_attempts
             if fmt == "zip":
-                inner_name, csv_stream = iter_csv_from_zip(raw_bytes)
+                if _is_seekable(file_obj):
+                    self._ensure_zip_size(file_obj)
+                    source = file_obj
+                else:
+                    source = spooled = self._spool_zip(file_obj)
+                inner_name, csv_stream = open_csv_from_zip(source)
                 filename = inner_name
 
                 def chunk_factory() -> Iterator[bytes]:
@@ -191,16 +261,26 @@ class UploadService:
 
             else:
                 filename = context.filename
+                if _is_seekable(file_obj):
+                    origin = file_obj.tell()
 
-                def chunk_factory() -> Iterator[bytes]:
-                    return self._iter_chunks(raw_bytes)
+                    def chunk_factory() -> Iterator[bytes]:
+                        file_obj.seek(origin)
+                        return self._iter_stream(file_obj)
+
+                else:
+                    # A consumed request stream cannot be replayed.
+                    attempts = 1
+
+                    def chunk_factory() -> Iterator[bytes]:
+                        return self._iter_stream(file_obj)
 
-            def do_write() -> Tuple[str, Path, int]:
+            def do_write() -> Tuple[str, Path, int, ValidationResult]:
                 return self._write_csv(chunk_factory())
 
-            sha_hex, path, size_bytes = retry(
+            sha_hex, _path, size_bytes, validation = retry(
                 do_write,
-                self.config.retry_attempts,
+                attempts,
                 base_delay=self.config.retry_base_delay,
                 max_delay=self.config.retry_max_delay,
                 seed=f"{context.namespace}:{context.rid}:{context.idempotency_key}",
@@ -214,7 +294,6 @@ class UploadService:
                 clock_now=self.clock.now(),
                 source_filename=filename,
             )
-            validation = self.validator.validate(path)
             manifest_path = self._create_manifest(
                 record,
                 sha_hex,
@@ -273,10 +352,9 @@ class UploadService:
             )
             self.redis.delete(redis_key)
             raise UploadError(envelope("UPLOAD_INTERNAL_ERROR")) from exc
-
-    def _iter_chunks(self, data: bytes) -> Iterator[bytes]:
-        for index in range(0, len(data), CHUNK_SIZE):
-            yield data[index : index + CHUNK_SIZE]
+        finally:
+            if spooled is not None:
+                spooled.close()
 
     def get_upload(self, upload_id: str) -> UploadRecord:
         try:
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import csv
+import io
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable, List
+from typing import Any, Iterable, Iterator, List, TextIO
 
 from .errors import UploadError, envelope
 from .normalizer import fold_digits, normalize_text_fields
@@ -21,6 +22,28 @@ TEXT_FIELDS = ("first_name", "last_name")
 PHONE_REGEX = re.compile(r"^09\d{9}$")
 
 
+class _ChunkReader(io.RawIOBase):
+    """Raw reader over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = memoryview(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
 @dataclass(slots=True)
 class ValidationResult:
     record_count: int
@@ -46,7 +69,24 @@ class CSVValidator:
             raise UploadError(
                 envelope("UPLOAD_VALIDATION_ERROR", details={"reason": "UTF8_REQUIRED"})
             ) from None
+        return self._validate_handle(fh)
+
+    def validate_stream(self, chunks: Iterable[bytes]) -> ValidationResult:
+        """Validate CSV bytes as they arrive, without a file on disk.
+
+        ``chunks`` is consumed to the end, so a tee that writes and hashes
+        each chunk before yielding it sees the whole upload in one pass.
+        Decoding and line splitting match :meth:`validate`.
+        """
+
+        fh = io.TextIOWrapper(
+            io.BufferedReader(_ChunkReader(iter(chunks))),
+            encoding="utf-8",
+            newline="",
+        )
+        return self._validate_handle(fh)
 
+    def _validate_handle(self, fh: TextIO) -> ValidationResult:
         try:
             with fh:
                 reader = csv.DictReader(fh)
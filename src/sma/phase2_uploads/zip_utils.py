@@ -4,7 +4,7 @@ import io
 import zipfile
 from dataclasses import dataclass
 from pathlib import Path, PurePosixPath, PureWindowsPath
-from typing import Iterator, Tuple
+from typing import BinaryIO, Iterator, Tuple
 
 from .errors import UploadError, envelope
 
@@ -12,17 +12,27 @@ MAX_MEMBERS = 10
 MAX_COMPRESSED_RATIO = 50
 
 
+MEMBER_CHUNK_SIZE = 64 * 1024
+
+
 @dataclass(slots=True)
 class ZipCSVStream:
+    """Iterate the decompressed CSV member of a seekable ZIP source.
+
+    The archive is read through ``_source`` on every iteration, so only one
+    member chunk is held in memory and the stream can be replayed on retry.
+    """
+
     filename: str
-    _data: bytes
+    _source: BinaryIO
 
     def __iter__(self) -> Iterator[bytes]:
-        with zipfile.ZipFile(io.BytesIO(self._data)) as zf:
+        self._source.seek(0)
+        with zipfile.ZipFile(self._source) as zf:
             info = _select_csv_info(zf, expected_filename=self.filename)
             with zf.open(info, "r") as member:
                 while True:
-                    chunk = member.read(64 * 1024)
+                    chunk = member.read(MEMBER_CHUNK_SIZE)
                     if not chunk:
                         break
                     yield chunk
@@ -69,10 +79,17 @@ def _select_csv_info(
     return info
 
 
-def iter_csv_from_zip(data: bytes) -> Tuple[str, ZipCSVStream]:
+def open_csv_from_zip(source: BinaryIO) -> Tuple[str, ZipCSVStream]:
+    """Select the CSV member of the seekable ZIP ``source`` without reading it."""
+
     try:
-        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        source.seek(0)
+        with zipfile.ZipFile(source) as zf:
             info = _select_csv_info(zf)
     except zipfile.BadZipFile as exc:  # pragma: no cover - defensive
         raise UploadError(envelope("UPLOAD_FORMAT_UNSUPPORTED")) from exc
-    return info.filename, ZipCSVStream(filename=info.filename, _data=data)
+    return info.filename, ZipCSVStream(filename=info.filename, _source=source)
+
+
+def iter_csv_from_zip(data: bytes) -> Tuple[str, ZipCSVStream]:
+    return open_csv_from_zip(io.BytesIO(data))
@@ -6,6 +6,8 @@ from .allocation_tx import (
     AllocationResult,
     AllocationSequenceProvider,
     AtomicAllocator,
+    BlockAllocationSequenceProvider,
+    CounterBlockSequenceProvider,
     PolicyEngine,
     PolicyVerdict,
     SimpleAllocationSequenceProvider,
@@ -35,6 +37,8 @@ __all__ = [
     "AllocationResult",
     "AllocationSequenceProvider",
     "AtomicAllocator",
+    "BlockAllocationSequenceProvider",
+    "CounterBlockSequenceProvider",
     "PolicyEngine",
     "PolicyVerdict",
     "SimpleAllocationSequenceProvider",
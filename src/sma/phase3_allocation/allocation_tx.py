@@ -3,16 +3,22 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
 import time
 from dataclasses import dataclass
-from typing import Any, Protocol
+from typing import Any, Callable, Iterable, Protocol, Sequence, TypeVar, cast
 
 from pydantic import AliasChoices, BaseModel, ConfigDict, Field, field_validator
 from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
 
-from sma.infrastructure.persistence.models import AllocationRecord, MentorModel, StudentModel
+from sma.infrastructure.persistence.models import (
+    AllocationRecord,
+    AllocationSequenceCounterModel,
+    MentorModel,
+    StudentModel,
+)
 
 from .idempotency import derive_event_id, derive_idempotency_key, normalize_identifier
 from .outbox import Clock, OutboxEvent, OutboxRepository
@@ -20,6 +26,7 @@ from .uow import UnitOfWorkFactory
 
 
 logger = logging.getLogger(__name__)
+_T = TypeVar("_T")
 
 
 class PolicyEngine(Protocol):
@@ -54,6 +61,16 @@ class AllocationSequenceProvider(Protocol):
         """Reserve a new allocation identifier."""
 
 
+class BlockAllocationSequenceProvider(AllocationSequenceProvider, Protocol):
+    """Sequence provider that can reserve several identifiers at once."""
+
+    def reserve(self, *, session: Session, count: int) -> list[AllocationIdentifiers]:
+        """Reserve ``count`` consecutive allocation identifiers."""
+
+    def current_year_code(self) -> str:
+        """Return the year code the next reserved identifiers will carry."""
+
+
 class AllocationRequest(BaseModel):
     """DTO carrying allocation inputs with backward compatible aliases."""
 
@@ -136,6 +153,15 @@ class StudentRepository:
         result = self._session.execute(stmt).scalar_one_or_none()
         return result
 
+    def get_many_for_update(self, student_ids: Iterable[str]) -> dict[str, StudentModel]:
+        stmt = (
+            select(StudentModel)
+            .where(StudentModel.national_id.in_(sorted(set(student_ids))))
+            .order_by(StudentModel.national_id)
+            .with_for_update()
+        )
+        return {row.national_id: row for row in self._session.execute(stmt).scalars()}
+
 
 class MentorRepository:
     def __init__(self, session: Session) -> None:
@@ -145,6 +171,17 @@ class MentorRepository:
         stmt = select(MentorModel).where(MentorModel.mentor_id == mentor_id).with_for_update()
         return self._session.execute(stmt).scalar_one_or_none()
 
+    def get_many_for_update(self, mentor_ids: Iterable[int]) -> dict[int, MentorModel]:
+        """Lock all mentors of a batch in one statement, in id order to avoid deadlocks."""
+
+        stmt = (
+            select(MentorModel)
+            .where(MentorModel.mentor_id.in_(sorted(set(mentor_ids))))
+            .order_by(MentorModel.mentor_id)
+            .with_for_update()
+        )
+        return {row.mentor_id: row for row in self._session.execute(stmt).scalars()}
+
 
 class AllocationRepository:
     def __init__(self, session: Session) -> None:
@@ -161,9 +198,25 @@ class AllocationRepository:
         )
         return self._session.execute(stmt).scalar_one_or_none()
 
+    def get_many_by_idempotency_keys(self, keys: Iterable[str]) -> dict[str, AllocationRecord]:
+        stmt = select(AllocationRecord).where(AllocationRecord.idempotency_key.in_(sorted(set(keys))))
+        return {row.idempotency_key: row for row in self._session.execute(stmt).scalars()}
+
+    def get_many_by_student_year(
+        self, student_ids: Iterable[str], year_code: str
+    ) -> dict[str, AllocationRecord]:
+        stmt = select(AllocationRecord).where(
+            AllocationRecord.student_id.in_(sorted(set(student_ids))),
+            AllocationRecord.year_code == year_code,
+        )
+        return {row.student_id: row for row in self._session.execute(stmt).scalars()}
+
     def add(self, record: AllocationRecord) -> None:
         self._session.add(record)
 
+    def add_all(self, records: Sequence[AllocationRecord]) -> None:
+        self._session.add_all(records)
+
 
 @dataclass(slots=True)
 class SimpleAllocationSequenceProvider(AllocationSequenceProvider):
@@ -184,6 +237,109 @@ class SimpleAllocationSequenceProvider(AllocationSequenceProvider):
             allocation_code=allocation_code,
         )
 
+    def current_year_code(self) -> str:
+        return f"{self.clock.now().year % 100:02d}"
+
+    def reserve(self, *, session: Session, count: int) -> list[AllocationIdentifiers]:
+        year_code = self.current_year_code()
+        max_id = session.execute(select(func.max(AllocationRecord.allocation_id))).scalar()
+        first_id = (max_id or 0) + 1
+        return [
+            AllocationIdentifiers(
+                allocation_id=allocation_id,
+                year_code=year_code,
+                allocation_code=f"{year_code}{allocation_id:0{self.legacy_width}d}",
+            )
+            for allocation_id in range(first_id, first_id + count)
+        ]
+
+
+class CounterBlockSequenceProvider(BlockAllocationSequenceProvider):
+    """Hi/lo sequence provider reserving id blocks from a counter row.
+
+    Each refill bumps ``allocation_sequences.last_value`` by ``block_size`` in
+    its own short transaction, so the row lock is never held for the duration
+    of an allocation and a rolled-back allocation cannot hand the same ids to
+    another worker.  Ids are then served from the local block; unused ids of a
+    discarded block simply leave gaps.  The counter row is seeded from
+    ``max(allocation_id)`` when missing, keeping codes in the legacy
+    ``year_code + zero-padded id`` format.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: Callable[[], Session],
+        clock: Clock,
+        block_size: int = 100,
+        legacy_width: int = 8,
+        counter_name: str = "allocations",
+    ) -> None:
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        self._session_factory = session_factory
+        self._clock = clock
+        self._block_size = block_size
+        self._legacy_width = legacy_width
+        self._counter_name = counter_name
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._end_id = 0
+
+    def next(self, *, session: Session, student: StudentModel, mentor: MentorModel) -> AllocationIdentifiers:
+        return self.reserve(session=session, count=1)[0]
+
+    def current_year_code(self) -> str:
+        return f"{self._clock.now().year % 100:02d}"
+
+    def reserve(self, *, session: Session, count: int) -> list[AllocationIdentifiers]:
+        year_code = self.current_year_code()
+        allocation_ids: list[int] = []
+        with self._lock:
+            while len(allocation_ids) < count:
+                if self._next_id >= self._end_id:
+                    self._refill(max(self._block_size, count - len(allocation_ids)))
+                take = min(count - len(allocation_ids), self._end_id - self._next_id)
+                allocation_ids.extend(range(self._next_id, self._next_id + take))
+                self._next_id += take
+        return [
+            AllocationIdentifiers(
+                allocation_id=allocation_id,
+                year_code=year_code,
+                allocation_code=f"{year_code}{allocation_id:0{self._legacy_width}d}",
+            )
+            for allocation_id in allocation_ids
+        ]
+
+    def _refill(self, size: int) -> None:
+        for attempt in range(2):
+            try:
+                with self._session_factory() as session:
+                    stmt = (
+                        select(AllocationSequenceCounterModel)
+                        .where(AllocationSequenceCounterModel.name == self._counter_name)
+                        .with_for_update()
+                    )
+                    counter = session.execute(stmt).scalar_one_or_none()
+                    if counter is None:
+                        seed = session.execute(select(func.max(AllocationRecord.allocation_id))).scalar()
+                        counter = AllocationSequenceCounterModel(name=self._counter_name, last_value=seed or 0)
+                        session.add(counter)
+                    first_id = int(counter.last_value) + 1
+                    counter.last_value = first_id + size - 1
+                    session.commit()
+            except IntegrityError:
+                if attempt:
+                    raise
+                continue
+            self._next_id = first_id
+            self._end_id = first_id + size
+            logger.debug(
+                "بلوک شناسه تخصیص رزرو شد",
+                extra={"کد": "SEQUENCE_BLOCK", "از": first_id, "تعداد": size},
+            )
+            return
+
 
 class AtomicAllocator:
     """Co-ordinates allocation workflow inside retries and transactions."""
@@ -204,10 +360,34 @@ class AtomicAllocator:
         self._max_retries = max_retries
 
     def allocate(self, request: AllocationRequest, *, dry_run: bool = False) -> AllocationResult:
+        return self._with_retries(lambda: self._execute_once(request=request, dry_run=dry_run))
+
+    def allocate_many(
+        self, requests: Sequence[AllocationRequest], *, dry_run: bool = False
+    ) -> list[AllocationResult]:
+        """Allocate a batch of requests inside a single transaction.
+
+        Mentors and students are locked with one ``SELECT ... FOR UPDATE``
+        each, identifiers are reserved as one block when the sequence provider
+        implements ``reserve`` and allocation plus outbox rows are flushed
+        together.  Results keep request order and the statuses of
+        :meth:`allocate`; idempotency keys remain per item.  When the flush
+        still hits a unique constraint (a concurrent writer won a race), the
+        batch is rolled back and replayed item by item.
+        """
+
+        if not requests:
+            return []
+        results = self._with_retries(lambda: self._execute_batch(requests=requests, dry_run=dry_run))
+        if results is None:
+            return [self.allocate(request, dry_run=dry_run) for request in requests]
+        return results
+
+    def _with_retries(self, operation: Callable[[], _T]) -> _T:
         attempt = 0
         while True:
             try:
-                return self._execute_once(request=request, dry_run=dry_run)
+                return operation()
             except OperationalError as exc:
                 attempt += 1
                 if attempt > self._max_retries:
@@ -223,6 +403,281 @@ class AtomicAllocator:
                 )
                 time.sleep(backoff)
 
+    def _execute_batch(
+        self, *, requests: Sequence[AllocationRequest], dry_run: bool
+    ) -> list[AllocationResult] | None:
+        keys = [
+            derive_idempotency_key(
+                student_id=request.student_id,
+                mentor_id=request.mentor_id,
+                request_id=request.request_id,
+                payload=request.payload,
+            )
+            for request in requests
+        ]
+        results: list[AllocationResult | None] = [None] * len(requests)
+        same_key: list[tuple[int, int]] = []
+        pending: list[tuple[int, StudentModel, MentorModel, PolicyVerdict]] = []
+
+        with self._uow_factory() as uow:
+            student_repo = StudentRepository(uow.session)
+            mentor_repo = MentorRepository(uow.session)
+            allocation_repo = AllocationRepository(uow.session)
+            outbox_repo = OutboxRepository(uow.session)
+
+            existing = allocation_repo.get_many_by_idempotency_keys(keys)
+            mentors = mentor_repo.get_many_for_update(request.mentor_id for request in requests)
+            students = student_repo.get_many_for_update(request.student_id for request in requests)
+
+            first_by_key: dict[str, int] = {}
+            for index, (request, key) in enumerate(zip(requests, keys)):
+                previous = existing.get(key)
+                if previous is not None:
+                    results[index] = self._already_assigned(
+                        previous, key, "درخواست قبلی با موفقیت ثبت شده است"
+                    )
+                    continue
+                if key in first_by_key:
+                    same_key.append((index, first_by_key[key]))
+                    continue
+                first_by_key[key] = index
+                mentor = mentors.get(request.mentor_id)
+                if mentor is None:
+                    results[index] = self._not_allocated(key, "MENTOR_NOT_FOUND", "منتور یافت نشد")
+                    continue
+                student = students.get(request.student_id)
+                if student is None:
+                    results[index] = self._not_allocated(key, "STUDENT_NOT_FOUND", "دانش‌آموز یافت نشد")
+                    continue
+                verdict = self._policy_engine.evaluate(student=student, mentor=mentor, request=request)
+                if not verdict.approved:
+                    results[index] = self._not_allocated(
+                        key,
+                        "POLICY_REJECT",
+                        "درخواست توسط سیاست رد شد",
+                        error_code=verdict.code or "POLICY_REJECT",
+                    )
+                    continue
+                if dry_run:
+                    results[index] = self._dry_run(request, key, student, mentor)
+                    continue
+                pending.append((index, student, mentor, verdict))
+
+            records: dict[int, AllocationRecord] = {}
+            if pending:
+                records = self._insert_batch(
+                    uow.session, requests, keys, pending, results, allocation_repo, outbox_repo
+                )
+                if records is None:
+                    uow.rollback()
+                    return None
+
+        for index, record in records.items():
+            results[index] = AllocationResult(
+                allocation_id=record.allocation_id,
+                allocation_code=record.allocation_code,
+                year_code=record.year_code,
+                mentor_id=record.mentor_id,
+                status="OK",
+                message="تخصیص با موفقیت انجام شد",
+                error_code=None,
+                idempotency_key=keys[index],
+                outbox_event_id=str(derive_event_id(keys[index])),
+            )
+        for index, first in same_key:
+            if first in records:
+                results[index] = self._already_assigned(
+                    records[first], keys[index], "درخواست قبلی با موفقیت ثبت شده است"
+                )
+            else:
+                results[index] = results[first]
+        if records:
+            logger.info(
+                "تخصیص دسته‌ای با موفقیت ثبت شد",
+                extra={"کد": "ALLOCATED_BATCH", "تعداد": len(records), "درخواست‌ها": len(requests)},
+            )
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            raise RuntimeError(f"BATCH_RESULT_MISSING|نتیجه‌ای برای درخواست‌های {missing} ساخته نشد")
+        return cast(list[AllocationResult], results)
+
+    def _insert_batch(
+        self,
+        session: Session,
+        requests: Sequence[AllocationRequest],
+        keys: Sequence[str],
+        pending: Sequence[tuple[int, StudentModel, MentorModel, PolicyVerdict]],
+        results: list[AllocationResult | None],
+        allocation_repo: AllocationRepository,
+        outbox_repo: OutboxRepository,
+    ) -> dict[int, AllocationRecord] | None:
+        reserve = getattr(self._sequence_provider, "reserve", None)
+        current_year_code = getattr(self._sequence_provider, "current_year_code", None)
+        reserving = callable(reserve) and callable(current_year_code)
+        issued: list[AllocationIdentifiers] = []
+        if reserving:
+            year_codes = [current_year_code()] * len(pending)
+        else:
+            issued = [
+                self._sequence_provider.next(session=session, student=student, mentor=mentor)
+                for _index, student, mentor, _verdict in pending
+            ]
+            year_codes = [identifiers.year_code for identifiers in issued]
+
+        students_by_year: dict[str, list[str]] = {}
+        for (_index, student, _mentor, _verdict), year_code in zip(pending, year_codes):
+            students_by_year.setdefault(year_code, []).append(student.national_id)
+        taken = {
+            year_code: allocation_repo.get_many_by_student_year(student_ids, year_code)
+            for year_code, student_ids in students_by_year.items()
+        }
+        claimed: dict[tuple[str, str], int] = {}
+        same_student: list[tuple[int, int]] = []
+        admitted: list[tuple[int, StudentModel, MentorModel, PolicyVerdict, int]] = []
+        for position, (item, year_code) in enumerate(zip(pending, year_codes)):
+            index, student, mentor, verdict = item
+            previous = taken[year_code].get(student.national_id)
+            if previous is not None:
+                results[index] = self._already_assigned(
+                    previous, keys[index], "درخواست تکراری تشخیص داده شد"
+                )
+                continue
+            slot = (student.national_id, year_code)
+            if slot in claimed:
+                same_student.append((index, claimed[slot]))
+                continue
+            claimed[slot] = index
+            admitted.append((index, student, mentor, verdict, position))
+
+        # Reserve only for rows that will be inserted so duplicates burn no ids.
+        if reserving and admitted:
+            issued = reserve(session=session, count=len(admitted))
+        accepted = [
+            (index, student, mentor, verdict, issued[offset if reserving else position])
+            for offset, (index, student, mentor, verdict, position) in enumerate(admitted)
+        ]
+
+        now = self._clock.now()
+        records: dict[int, AllocationRecord] = {}
+        events: list[OutboxEvent] = []
+        for index, student, mentor, verdict, identifiers in accepted:
+            request = requests[index]
+            if request.year_code and request.year_code != identifiers.year_code:
+                logger.warning(
+                    "کد سال در درخواست با شمارنده مغایرت دارد",
+                    extra={"کد": "YEAR_MISMATCH", "درخواست": request.year_code, "سیستم": identifiers.year_code},
+                )
+            record = self._build_record(request, keys[index], student, mentor, verdict, identifiers)
+            records[index] = record
+            events.append(self._build_event(record, keys[index], now))
+        try:
+            allocation_repo.add_all(list(records.values()))
+            outbox_repo.add_many(events)
+            session.flush()
+        except IntegrityError:
+            return None
+        for index, claimant in same_student:
+            results[index] = self._already_assigned(
+                records[claimant], keys[index], "درخواست تکراری تشخیص داده شد"
+            )
+        return records
+
+    @staticmethod
+    def _build_record(
+        request: AllocationRequest,
+        idempotency_key: str,
+        student: StudentModel,
+        mentor: MentorModel,
+        verdict: PolicyVerdict,
+        identifiers: AllocationIdentifiers,
+    ) -> AllocationRecord:
+        return AllocationRecord(
+            allocation_id=identifiers.allocation_id,
+            allocation_code=identifiers.allocation_code,
+            year_code=identifiers.year_code,
+            student_id=student.national_id,
+            mentor_id=mentor.mentor_id,
+            idempotency_key=idempotency_key,
+            request_id=request.request_id,
+            status="CONFIRMED",
+            metadata_json=json.dumps(request.metadata, ensure_ascii=False) if request.metadata else None,
+            policy_code=verdict.code,
+        )
+
+    @staticmethod
+    def _build_event(record: AllocationRecord, idempotency_key: str, now: Any) -> OutboxEvent:
+        event_id = str(derive_event_id(idempotency_key))
+        return OutboxEvent(
+            event_id=event_id,
+            aggregate_type="Allocation",
+            aggregate_id=str(record.allocation_id),
+            event_type="MentorAssigned",
+            payload={
+                "event_id": event_id,
+                "allocation_id": record.allocation_id,
+                "allocation_code": record.allocation_code,
+                "year_code": record.year_code,
+                "student_id": record.student_id,
+                "mentor_id": record.mentor_id,
+                "idempotency_key": idempotency_key,
+                "status": record.status,
+                "occurred_at": now.isoformat(),
+            },
+            occurred_at=now,
+            available_at=now,
+        )
+
+    @staticmethod
+    def _already_assigned(record: AllocationRecord, idempotency_key: str, message: str) -> AllocationResult:
+        return AllocationResult(
+            allocation_id=record.allocation_id,
+            allocation_code=record.allocation_code,
+            year_code=record.year_code,
+            mentor_id=record.mentor_id,
+            status="ALREADY_ASSIGNED",
+            message=message,
+            error_code="ALREADY_ASSIGNED",
+            idempotency_key=idempotency_key,
+            outbox_event_id=str(derive_event_id(idempotency_key)),
+        )
+
+    @staticmethod
+    def _not_allocated(
+        idempotency_key: str, status: str, message: str, *, error_code: str | None = None
+    ) -> AllocationResult:
+        return AllocationResult(
+            allocation_id=None,
+            allocation_code=None,
+            year_code=None,
+            mentor_id=None,
+            status=status,
+            message=message,
+            error_code=error_code or status,
+            idempotency_key=idempotency_key,
+            outbox_event_id=None,
+        )
+
+    @staticmethod
+    def _dry_run(
+        request: AllocationRequest, idempotency_key: str, student: StudentModel, mentor: MentorModel
+    ) -> AllocationResult:
+        logger.info(
+            "اجرای آزمایشی تخصیص بدون ثبت",
+            extra={"کد": "DRY_RUN", "student": student.national_id, "mentor": mentor.mentor_id},
+        )
+        return AllocationResult(
+            allocation_id=None,
+            allocation_code=None,
+            year_code=request.year_code,
+            mentor_id=mentor.mentor_id,
+            status="DRY_RUN",
+            message="اجرای آزمایشی بدون ثبت",
+            error_code=None,
+            idempotency_key=idempotency_key,
+            outbox_event_id=None,
+            dry_run=True,
+        )
+
     def _execute_once(self, *, request: AllocationRequest, dry_run: bool) -> AllocationResult:
         idempotency_key = derive_idempotency_key(
             student_id=request.student_id,
@@ -239,78 +694,29 @@ class AtomicAllocator:
 
             existing = allocation_repo.get_by_idempotency_key(idempotency_key)
             if existing:
-                event_id = str(derive_event_id(idempotency_key))
-                return AllocationResult(
-                    allocation_id=existing.allocation_id,
-                    allocation_code=existing.allocation_code,
-                    year_code=existing.year_code,
-                    mentor_id=existing.mentor_id,
-                    status="ALREADY_ASSIGNED",
-                    message="درخواست قبلی با موفقیت ثبت شده است",
-                    error_code="ALREADY_ASSIGNED",
-                    idempotency_key=idempotency_key,
-                    outbox_event_id=event_id,
+                return self._already_assigned(
+                    existing, idempotency_key, "درخواست قبلی با موفقیت ثبت شده است"
                 )
 
             mentor = mentor_repo.get_for_update(request.mentor_id)
             if mentor is None:
-                return AllocationResult(
-                    allocation_id=None,
-                    allocation_code=None,
-                    year_code=None,
-                    mentor_id=None,
-                    status="MENTOR_NOT_FOUND",
-                    message="منتور یافت نشد",
-                    error_code="MENTOR_NOT_FOUND",
-                    idempotency_key=idempotency_key,
-                    outbox_event_id=None,
-                )
+                return self._not_allocated(idempotency_key, "MENTOR_NOT_FOUND", "منتور یافت نشد")
 
             student = student_repo.get_for_update(request.student_id)
             if student is None:
-                return AllocationResult(
-                    allocation_id=None,
-                    allocation_code=None,
-                    year_code=None,
-                    mentor_id=None,
-                    status="STUDENT_NOT_FOUND",
-                    message="دانش‌آموز یافت نشد",
-                    error_code="STUDENT_NOT_FOUND",
-                    idempotency_key=idempotency_key,
-                    outbox_event_id=None,
-                )
+                return self._not_allocated(idempotency_key, "STUDENT_NOT_FOUND", "دانش‌آموز یافت نشد")
 
             verdict = self._policy_engine.evaluate(student=student, mentor=mentor, request=request)
             if not verdict.approved:
-                return AllocationResult(
-                    allocation_id=None,
-                    allocation_code=None,
-                    year_code=None,
-                    mentor_id=None,
-                    status="POLICY_REJECT",
-                    message="درخواست توسط سیاست رد شد",
+                return self._not_allocated(
+                    idempotency_key,
+                    "POLICY_REJECT",
+                    "درخواست توسط سیاست رد شد",
                     error_code=verdict.code or "POLICY_REJECT",
-                    idempotency_key=idempotency_key,
-                    outbox_event_id=None,
                 )
 
             if dry_run:
-                logger.info(
-                    "اجرای آزمایشی تخصیص بدون ثبت",
-                    extra={"کد": "DRY_RUN", "student": student.national_id, "mentor": mentor.mentor_id},
-                )
-                return AllocationResult(
-                    allocation_id=None,
-                    allocation_code=None,
-                    year_code=request.year_code,
-                    mentor_id=mentor.mentor_id,
-                    status="DRY_RUN",
-                    message="اجرای آزمایشی بدون ثبت",
-                    error_code=None,
-                    idempotency_key=idempotency_key,
-                    outbox_event_id=None,
-                    dry_run=True,
-                )
+                return self._dry_run(request, idempotency_key, student, mentor)
 
             identifiers = self._sequence_provider.next(session=uow.session, student=student, mentor=mentor)
 
@@ -320,43 +726,11 @@ class AtomicAllocator:
                     extra={"کد": "YEAR_MISMATCH", "درخواست": request.year_code, "سیستم": identifiers.year_code},
                 )
 
-            record = AllocationRecord(
-                allocation_id=identifiers.allocation_id,
-                allocation_code=identifiers.allocation_code,
-                year_code=identifiers.year_code,
-                student_id=student.national_id,
-                mentor_id=mentor.mentor_id,
-                idempotency_key=idempotency_key,
-                request_id=request.request_id,
-                status="CONFIRMED",
-                metadata_json=json.dumps(request.metadata, ensure_ascii=False) if request.metadata else None,
-                policy_code=verdict.code,
-            )
+            record = self._build_record(request, idempotency_key, student, mentor, verdict, identifiers)
 
             try:
                 allocation_repo.add(record)
-                now = self._clock.now()
-                event_id = str(derive_event_id(idempotency_key))
-                event = OutboxEvent(
-                    event_id=event_id,
-                    aggregate_type="Allocation",
-                    aggregate_id=str(record.allocation_id),
-                    event_type="MentorAssigned",
-                    payload={
-                        "event_id": event_id,
-                        "allocation_id": record.allocation_id,
-                        "allocation_code": record.allocation_code,
-                        "year_code": record.year_code,
-                        "student_id": record.student_id,
-                        "mentor_id": record.mentor_id,
-                        "idempotency_key": idempotency_key,
-                        "status": record.status,
-                        "occurred_at": now.isoformat(),
-                    },
-                    occurred_at=now,
-                    available_at=now,
-                )
-                outbox_repo.add(event)
+                outbox_repo.add(self._build_event(record, idempotency_key, self._clock.now()))
                 uow.session.flush()
             except IntegrityError:
                 uow.rollback()
@@ -364,17 +738,8 @@ class AtomicAllocator:
                 if existing is None and identifiers.year_code:
                     existing = allocation_repo.get_by_student_year(student.national_id, identifiers.year_code)
                 if existing:
-                    event_id = str(derive_event_id(idempotency_key))
-                    return AllocationResult(
-                        allocation_id=existing.allocation_id,
-                        allocation_code=existing.allocation_code,
-                        year_code=existing.year_code,
-                        mentor_id=existing.mentor_id,
-                        status="ALREADY_ASSIGNED",
-                        message="درخواست تکراری تشخیص داده شد",
-                        error_code="ALREADY_ASSIGNED",
-                        idempotency_key=idempotency_key,
-                        outbox_event_id=event_id,
+                    return self._already_assigned(
+                        existing, idempotency_key, "درخواست تکراری تشخیص داده شد"
                     )
                 raise
 
@@ -67,6 +67,7 @@ class AllocationConfig:
 
     fast_fail: bool = False
     trace_limit_rejected: int | None = None
+    rule_reorder_interval: int = 1024
 
 
 @dataclass(frozen=True)
@@ -3,9 +3,10 @@ from __future__ import annotations
 
 from contextlib import nullcontext
 from dataclasses import dataclass
-from typing import Iterable, List, Sequence
+from typing import Iterable, List, Sequence, cast
 
 from .contracts import AllocationConfig, MentorLike, NormalizedMentor, NormalizedStudent, StudentLike
+from .mentor_index import MentorEligibilityIndex
 from .policy import EligibilityPolicy, NormalizationError, prepare_mentor, prepare_student
 from sma.observe.perf import PerformanceObserver
 
@@ -36,33 +37,19 @@ class AllocationEngine:
         self.observer = observer
 
     def evaluate(
-        self, student: StudentLike, mentors: Iterable[MentorLike]
+        self, student: StudentLike, mentors: Iterable[MentorLike], *, trace: bool = True
     ) -> tuple[MentorLike | None, List[AllocationTraceEntry]]:
+        """Select the best mentor; ``trace=False`` leaves rule traces empty."""
+
         observer = self.observer
         context = observer.measure("allocation_engine.evaluate") if observer else nullcontext()
         with context:
             try:
                 normalized_student = prepare_student(self.policy, student)
             except NormalizationError as error:
-                trace_entry = AllocationTraceEntry(
-                    mentor=None,
-                    normalized=None,
-                    passed=False,
-                    trace=[
-                        {
-                            "code": error.rule_code,
-                            "passed": False,
-                            "details": {"message": str(error), **error.details},
-                        }
-                    ],
-                    ranking_key=None,
-                )
-                if observer:
-                    observer.increment_counter("allocation_no_candidate_total")
-                return None, [trace_entry]
+                return None, [self._student_failure_entry(error)]
 
             evaluations: List[AllocationTraceEntry] = []
-            passed_candidates: List[tuple[tuple[float, int, int], AllocationTraceEntry]] = []
             for mentor in mentors:
                 mentor_context = (
                     observer.measure("allocation_engine.evaluate_mentor")
@@ -73,62 +60,156 @@ class AllocationEngine:
                     try:
                         normalized_mentor = prepare_mentor(self.policy, mentor)
                     except NormalizationError as error:
-                        trace = [
-                            {
-                                "code": error.rule_code,
-                                "passed": False,
-                                "details": {"message": str(error), **error.details},
-                            }
-                        ]
-                        entry = AllocationTraceEntry(
-                            mentor=mentor,
-                            normalized=None,
-                            passed=False,
-                            trace=trace,
-                            ranking_key=None,
-                        )
-                        evaluations.append(entry)
-                        if observer:
-                            observer.increment_counter("allocation_policy_failure_total{stage=\"normalization\"}")
+                        evaluations.append(self._mentor_failure_entry(mentor, error))
                         continue
-                    passed, trace = self.policy.evaluate(normalized_student, normalized_mentor)
-                    ranking_key = None
-                    if observer:
-                        for item in trace:
-                            metric_name = f'allocation_policy_pass_total{{rule="{item["code"]}"}}'
-                            if item["passed"]:
-                                observer.increment_counter(metric_name)
-                    if passed:
-                        occupancy_ratio = self._compute_occupancy_ratio(normalized_mentor)
-                        ranking_key = (
-                            occupancy_ratio,
-                            normalized_mentor.current_load,
-                            normalized_mentor.mentor_id,
-                        )
-                        entry = AllocationTraceEntry(
-                            mentor=mentor,
-                            normalized=normalized_mentor,
-                            passed=passed,
-                            trace=trace,
-                            ranking_key=ranking_key,
+                    evaluations.append(
+                        self._evaluate_candidate(normalized_student, mentor, normalized_mentor, trace)
+                    )
+            return self._select_best(evaluations), evaluations
+
+    def evaluate_batch(
+        self,
+        students: Iterable[StudentLike],
+        mentors: Iterable[MentorLike],
+        *,
+        trace_rejected: bool = True,
+        trace: bool = True,
+    ) -> List[tuple[MentorLike | None, List[AllocationTraceEntry]]]:
+        """Evaluate a cohort against a roster normalized and indexed once.
+
+        Results and traces match :meth:`evaluate` for every student: one entry
+        per roster mentor, in roster order, including normalization failures.
+        Rules only run for mentors from the matching
+        :class:`MentorEligibilityIndex` bucket when their traces would be
+        empty anyway, i.e. with ``trace=False``; mentors the index excludes
+        then get a rejected entry without evaluation.  ``trace_rejected=False``
+        opts into the same shortcut with ``trace=True``, leaving the rule
+        trace of index-excluded mentors empty.
+        """
+
+        observer = self.observer
+        context = observer.measure("allocation_engine.evaluate_batch") if observer else nullcontext()
+        with context:
+            index = MentorEligibilityIndex.build(self.policy, mentors)
+            shortcut = not (trace and trace_rejected)
+            results: List[tuple[MentorLike | None, List[AllocationTraceEntry]]] = []
+            for student in students:
+                try:
+                    normalized_student = prepare_student(self.policy, student)
+                except NormalizationError as error:
+                    results.append((None, [self._student_failure_entry(error)]))
+                    continue
+                candidates = (
+                    {item.position for item in index.candidates(normalized_student)}
+                    if shortcut
+                    else None
+                )
+                evaluations: List[AllocationTraceEntry] = []
+                for item in index.entries:
+                    if item.normalized is None:
+                        failure = item.error
+                        if failure is None:
+                            raise RuntimeError(f"MENTOR_INDEX_INCONSISTENT|position={item.position}")
+                        evaluations.append(self._mentor_failure_entry(item.mentor, failure))
+                    elif candidates is None or item.position in candidates:
+                        evaluations.append(
+                            self._evaluate_candidate(
+                                normalized_student, item.mentor, item.normalized, trace
+                            )
                         )
-                        passed_candidates.append((ranking_key, entry))
                     else:
-                        entry = AllocationTraceEntry(
-                            mentor=mentor,
-                            normalized=normalized_mentor,
-                            passed=passed,
-                            trace=trace,
-                            ranking_key=None,
+                        evaluations.append(
+                            AllocationTraceEntry(
+                                mentor=item.mentor,
+                                normalized=item.normalized,
+                                passed=False,
+                                trace=[],
+                                ranking_key=None,
+                            )
                         )
-                    evaluations.append(entry)
-            best_entry = None
-            if passed_candidates:
-                passed_candidates.sort(key=lambda item: item[0])
-                best_entry = passed_candidates[0][1]
-            if best_entry is None and observer:
-                observer.increment_counter("allocation_no_candidate_total")
-            return (best_entry.mentor if best_entry else None, evaluations)
+                results.append((self._select_best(evaluations), evaluations))
+            return results
+
+    def _evaluate_candidate(
+        self,
+        student: NormalizedStudent,
+        mentor: MentorLike,
+        normalized_mentor: NormalizedMentor,
+        with_trace: bool = True,
+    ) -> AllocationTraceEntry:
+        observer = self.observer
+        passed, trace = self.policy.evaluate(student, normalized_mentor, trace=with_trace)
+        if observer:
+            for item in trace:
+                metric_name = f'allocation_policy_pass_total{{rule="{item["code"]}"}}'
+                if item["passed"]:
+                    observer.increment_counter(metric_name)
+        ranking_key = None
+        if passed:
+            ranking_key = (
+                self._compute_occupancy_ratio(normalized_mentor),
+                normalized_mentor.current_load,
+                normalized_mentor.mentor_id,
+            )
+        return AllocationTraceEntry(
+            mentor=mentor,
+            normalized=normalized_mentor,
+            passed=passed,
+            trace=cast(Sequence[dict[str, object]], trace),
+            ranking_key=ranking_key,
+        )
+
+    def _student_failure_entry(self, error: NormalizationError) -> AllocationTraceEntry:
+        if self.observer:
+            self.observer.increment_counter("allocation_no_candidate_total")
+        return AllocationTraceEntry(
+            mentor=None,
+            normalized=None,
+            passed=False,
+            trace=[
+                {
+                    "code": error.rule_code,
+                    "passed": False,
+                    "details": {"message": str(error), **error.details},
+                }
+            ],
+            ranking_key=None,
+        )
+
+    def _mentor_failure_entry(
+        self, mentor: MentorLike, error: NormalizationError
+    ) -> AllocationTraceEntry:
+        if self.observer:
+            self.observer.increment_counter("allocation_policy_failure_total{stage=\"normalization\"}")
+        return AllocationTraceEntry(
+            mentor=mentor,
+            normalized=None,
+            passed=False,
+            trace=[
+                {
+                    "code": error.rule_code,
+                    "passed": False,
+                    "details": {"message": str(error), **error.details},
+                }
+            ],
+            ranking_key=None,
+        )
+
+    def _select_best(self, evaluations: Sequence[AllocationTraceEntry]) -> MentorLike | None:
+        best_entry: AllocationTraceEntry | None = None
+        best_key: tuple[float, int, int] | None = None
+        for entry in evaluations:
+            key = entry.ranking_key
+            if key is None:
+                continue
+            if best_key is None or key < best_key:
+                best_entry = entry
+                best_key = key
+        if best_entry is None:
+            if self.observer:
+                self.observer.increment_counter("allocation_no_candidate_total")
+            return None
+        return best_entry.mentor
 
     @staticmethod
     def _compute_occupancy_ratio(mentor: NormalizedMentor) -> float:
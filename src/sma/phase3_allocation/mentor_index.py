@@ -0,0 +1,75 @@
+"""Precomputed mentor eligibility index for cohort allocation."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .contracts import MentorLike, MentorType, NormalizedMentor, NormalizedStudent
+from .policy import EligibilityPolicy, NormalizationError, prepare_mentor
+
+IndexKey = Tuple[int, str, int, str]
+
+
+@dataclass(frozen=True)
+class IndexedMentor:
+    """Mentor prepared once for a cohort run."""
+
+    position: int
+    mentor: MentorLike
+    normalized: NormalizedMentor | None
+    error: NormalizationError | None = None
+
+
+def _required_mentor_type(student: NormalizedStudent) -> MentorType:
+    return "SCHOOL" if student.student_type == 1 else "NORMAL"
+
+
+@dataclass
+class MentorEligibilityIndex:
+    """Index normalized mentors by their hard-partition attributes.
+
+    A mentor can only pass ``GENDER_MATCH``, ``GROUP_ALLOWED``,
+    ``CENTER_ALLOWED`` and ``SCHOOL_TYPE_COMPATIBLE`` for a student whose
+    ``(gender, group_code, reg_center, required mentor_type)`` appears among
+    the keys derived from the mentor, so only those buckets are evaluated.
+    """
+
+    entries: Sequence[IndexedMentor]
+    _buckets: Dict[IndexKey, List[IndexedMentor]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def build(
+        cls, policy: EligibilityPolicy, mentors: Iterable[MentorLike]
+    ) -> "MentorEligibilityIndex":
+        entries: List[IndexedMentor] = []
+        buckets: Dict[IndexKey, List[IndexedMentor]] = {}
+        for position, mentor in enumerate(mentors):
+            try:
+                normalized = prepare_mentor(policy, mentor)
+            except NormalizationError as error:
+                entries.append(IndexedMentor(position, mentor, None, error))
+                continue
+            entry = IndexedMentor(position, mentor, normalized)
+            entries.append(entry)
+            for group_code in normalized.allowed_groups:
+                for center in normalized.allowed_centers:
+                    key = (normalized.gender, group_code, center, normalized.mentor_type)
+                    buckets.setdefault(key, []).append(entry)
+        return cls(entries=tuple(entries), _buckets=buckets)
+
+    def candidates(self, student: NormalizedStudent) -> Sequence[IndexedMentor]:
+        """Return mentors that may pass the partition rules, in roster order."""
+
+        key = (
+            student.gender,
+            student.group_code,
+            student.reg_center,
+            _required_mentor_type(student),
+        )
+        return self._buckets.get(key, ())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+__all__ = ["IndexedMentor", "MentorEligibilityIndex"]
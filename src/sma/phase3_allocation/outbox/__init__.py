@@ -3,16 +3,21 @@ from .backoff import BackoffPolicy
 from .clock import Clock, SystemClock
 from .dispatcher import OutboxDispatcher, Publisher
 from .models import OutboxEvent, OutboxMessage, OutboxStatus
-from .repository import OutboxRepository
+from .repository import OutboxRepository, PendingStats
+from .worker import AdaptivePolling, OutboxDrainWorker, OutboxWorkerMetrics
 
 __all__ = [
+    "AdaptivePolling",
     "BackoffPolicy",
     "Clock",
     "OutboxDispatcher",
+    "OutboxDrainWorker",
     "OutboxEvent",
     "OutboxMessage",
     "OutboxRepository",
     "OutboxStatus",
+    "OutboxWorkerMetrics",
+    "PendingStats",
     "Publisher",
     "SystemClock",
 ]
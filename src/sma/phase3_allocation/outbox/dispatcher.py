@@ -3,8 +3,10 @@ from __future__ import annotations
 
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Callable, Protocol
+from datetime import datetime
+from typing import Any, Callable, Protocol, Sequence
 
 from sqlalchemy.orm import Session
 
@@ -17,6 +19,13 @@ from .repository import OutboxRepository
 logger = logging.getLogger(__name__)
 
 
+def _is_later(left: datetime, right: datetime) -> bool:
+    # SQLite drops tzinfo on round-trips while identity-mapped rows keep it.
+    if (left.tzinfo is None) != (right.tzinfo is None):
+        left, right = left.replace(tzinfo=None), right.replace(tzinfo=None)
+    return left > right
+
+
 class Publisher(Protocol):
     """Transport-agnostic publisher contract."""
 
@@ -34,25 +43,23 @@ class OutboxDispatcher:
     backoff: BackoffPolicy = field(default_factory=BackoffPolicy)
     batch_size: int = 50
     status_hook: Callable[[str, str, dict[str, Any]], None] | None = None
+    max_in_flight: int = 1
 
     def dispatch_once(self) -> int:
+        if self.max_in_flight > 1:
+            return self._dispatch_pipelined()
         repo = OutboxRepository(self.session)
         messages = repo.list_due_for_update(clock=self.clock, limit=self.batch_size)
         dispatched = 0
         for message in messages:
             model = message.model
             current_wall = self.clock.now()
-            headers = {
-                "x-event-id": model.event_id,
-                "x-aggregate-id": model.aggregate_id,
-                "x-idempotency-key": self._extract_idempotency_key(model.payload_json),
-            }
             try:
                 payload = json.loads(model.payload_json)
                 self.publisher.publish(
                     event_type=model.event_type,
                     payload=payload,
-                    headers=headers,
+                    headers=self._headers(model, payload),
                 )
             except Exception as exc:  # pylint: disable=broad-except
                 self.schedule_next(message=message, exc=exc)
@@ -61,20 +68,93 @@ class OutboxDispatcher:
             message.status = "SENT"
             model.published_at = current_wall
             model.last_error = None
-            logger.info(
-                "رویداد با موفقیت ارسال شد",
-                extra={
-                    "event_id": model.event_id,
-                    "aggregate_id": model.aggregate_id,
-                    "کد": "SENT",
-                },
-            )
-            self._notify(event_id=model.event_id, status="SENT", extra={"aggregate_id": model.aggregate_id})
+            self._log_sent(model)
             dispatched += 1
 
         self.session.commit()
         return dispatched
 
+    def _dispatch_pipelined(self) -> int:
+        """Publish one batch concurrently while keeping per-aggregate order.
+
+        Due messages are grouped by ``aggregate_id`` and each group is
+        published sequentially by one of at most ``max_in_flight`` workers;
+        a failure stops the rest of its group.  Groups whose oldest pending
+        event is not yet due (e.g. waiting on a retry) are skipped entirely.
+        Successes are flagged with one bulk ``UPDATE``; only the session owner
+        thread touches the database, so the publisher must be thread-safe.
+        """
+
+        repo = OutboxRepository(self.session)
+        messages = repo.list_due_for_update(clock=self.clock, limit=self.batch_size)
+        groups: dict[str, list[OutboxMessage]] = {}
+        for message in messages:
+            groups.setdefault(message.model.aggregate_id, []).append(message)
+        earliest = repo.earliest_pending_by_aggregate(groups) if groups else {}
+        ready: list[list[OutboxMessage]] = []
+        for aggregate_id, group in groups.items():
+            group.sort(key=lambda item: item.model.occurred_at)
+            oldest = earliest.get(aggregate_id)
+            if oldest is not None and _is_later(group[0].model.occurred_at, oldest):
+                continue
+            ready.append(group)
+
+        outcomes: list[tuple[OutboxMessage, Exception | None]] = []
+        if ready:
+            workers = min(self.max_in_flight, len(ready))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="outbox-publish") as pool:
+                for group_outcomes in pool.map(self._publish_group, ready):
+                    outcomes.extend(group_outcomes)
+
+        sent = [message for message, error in outcomes if error is None]
+        repo.mark_sent([message.model.id for message in sent], published_at=self.clock.now())
+        for message, error in outcomes:
+            if error is None:
+                self._log_sent(message.model)
+            else:
+                self.schedule_next(message=message, exc=error)
+        self.session.commit()
+        return len(sent)
+
+    def _publish_group(
+        self, group: Sequence[OutboxMessage]
+    ) -> list[tuple[OutboxMessage, Exception | None]]:
+        outcomes: list[tuple[OutboxMessage, Exception | None]] = []
+        for message in group:
+            model = message.model
+            try:
+                payload = json.loads(model.payload_json)
+                self.publisher.publish(
+                    event_type=model.event_type,
+                    payload=payload,
+                    headers=self._headers(model, payload),
+                )
+            except Exception as exc:  # pylint: disable=broad-except
+                outcomes.append((message, exc))
+                break
+            outcomes.append((message, None))
+        return outcomes
+
+    @staticmethod
+    def _headers(model: Any, payload: Any) -> dict[str, str]:
+        idempotency_key = payload.get("idempotency_key", "") if isinstance(payload, dict) else ""
+        return {
+            "x-event-id": model.event_id,
+            "x-aggregate-id": model.aggregate_id,
+            "x-idempotency-key": str(idempotency_key),
+        }
+
+    def _log_sent(self, model: Any) -> None:
+        logger.info(
+            "رویداد با موفقیت ارسال شد",
+            extra={
+                "event_id": model.event_id,
+                "aggregate_id": model.aggregate_id,
+                "کد": "SENT",
+            },
+        )
+        self._notify(event_id=model.event_id, status="SENT", extra={"aggregate_id": model.aggregate_id})
+
     def schedule_next(self, *, message: OutboxMessage, exc: Exception) -> None:
         """Update the message for a retry using monotonic timing."""
 
@@ -150,14 +230,6 @@ class OutboxDispatcher:
             if sent == 0:
                 time.sleep(sleep)
 
-    @staticmethod
-    def _extract_idempotency_key(payload_json: str) -> str:
-        try:
-            payload = json.loads(payload_json)
-        except json.JSONDecodeError:  # pragma: no cover - defensive guard
-            return ""
-        return str(payload.get("idempotency_key", ""))
-
     def _notify(self, *, event_id: str, status: str, extra: dict[str, Any]) -> None:
         if self.status_hook is None:
             return
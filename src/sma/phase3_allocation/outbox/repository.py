@@ -1,9 +1,11 @@
 """Persistence helpers for outbox events."""
 from __future__ import annotations
 
-from typing import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import case, func, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
@@ -13,6 +15,15 @@ from .clock import Clock
 from .models import OutboxEvent, OutboxMessage
 
 
+@dataclass(frozen=True, slots=True)
+class PendingStats:
+    """Snapshot of the pending outbox backlog."""
+
+    pending: int
+    due: int
+    oldest_available_at: datetime | None
+
+
 class OutboxRepository:
     """Repository for accessing outbox rows inside a transaction."""
 
@@ -30,6 +41,9 @@ class OutboxRepository:
         except IntegrityError as exc:  # pragma: no cover - defensive guard
             raise ValueError("DUPLICATE_EVENT|رویداد تکراری است") from exc
 
+    def add_many(self, events: Sequence[OutboxEvent]) -> None:
+        self._session.add_all([event.to_model() for event in events])
+
     def list_due_for_update(
         self,
         *,
@@ -50,5 +64,42 @@ class OutboxRepository:
         result = self._session.execute(stmt)
         return [OutboxMessage(model=row[0]) for row in result]
 
+    def earliest_pending_by_aggregate(self, aggregate_ids: Iterable[str]) -> dict[str, datetime]:
+        """Return ``occurred_at`` of the oldest pending event per aggregate."""
+
+        stmt = (
+            select(OutboxMessageModel.aggregate_id, func.min(OutboxMessageModel.occurred_at))
+            .where(
+                OutboxMessageModel.status == "PENDING",
+                OutboxMessageModel.aggregate_id.in_(sorted(set(aggregate_ids))),
+            )
+            .group_by(OutboxMessageModel.aggregate_id)
+        )
+        return {aggregate_id: occurred_at for aggregate_id, occurred_at in self._session.execute(stmt)}
+
+    def mark_sent(self, ids: Sequence[str], *, published_at: datetime) -> None:
+        """Flag a set of rows as sent with a single ``UPDATE``."""
+
+        if not ids:
+            return
+        stmt = (
+            update(OutboxMessageModel)
+            .where(OutboxMessageModel.id.in_(list(ids)))
+            .values(status="SENT", published_at=published_at, last_error=None)
+        )
+        self._session.execute(stmt, execution_options={"synchronize_session": "evaluate"})
+
+    def pending_stats(self, *, clock: Clock) -> PendingStats:
+        """Count pending and due rows with one aggregate over ``ix_outbox_dispatch``."""
+
+        now = clock.now()
+        stmt = select(
+            func.count(),
+            func.coalesce(func.sum(case((OutboxMessageModel.available_at <= now, 1), else_=0)), 0),
+            func.min(OutboxMessageModel.available_at),
+        ).where(OutboxMessageModel.status == "PENDING")
+        pending, due, oldest = self._session.execute(stmt).one()
+        return PendingStats(pending=int(pending), due=int(due), oldest_available_at=oldest)
+
     def flush(self) -> None:
         self._session.flush()
@@ -0,0 +1,233 @@
+"""Long-running outbox drain worker with adaptive polling."""
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge
+from sqlalchemy.orm import Session
+
+from .backoff import BackoffPolicy
+from .clock import Clock, SystemClock
+from .dispatcher import OutboxDispatcher, Publisher
+from .repository import OutboxRepository, PendingStats
+
+logger = logging.getLogger(__name__)
+
+
+def _seconds_between(later: datetime, earlier: datetime) -> float:
+    if (later.tzinfo is None) != (earlier.tzinfo is None):
+        later, earlier = later.replace(tzinfo=None), earlier.replace(tzinfo=None)
+    return (later - earlier).total_seconds()
+
+
+@dataclass(slots=True)
+class AdaptivePolling:
+    """Poll interval that shrinks under load and grows while idle.
+
+    A full batch means the backlog is deeper than one poll, so the next poll
+    runs immediately.  A partial batch resets the interval to
+    ``min_seconds``; an empty poll multiplies it by ``growth`` up to
+    ``max_seconds``.  When the oldest pending row only becomes due later
+    (e.g. scheduled by :class:`BackoffPolicy`), the sleep never overshoots it.
+    """
+
+    min_seconds: float = 0.05
+    max_seconds: float = 5.0
+    growth: float = 2.0
+    _current: float = field(default=0.0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.min_seconds <= 0 or self.max_seconds < self.min_seconds:
+            raise ValueError("POLL_INTERVAL_INVALID|بازه بررسی اوتباکس نامعتبر است")
+        if self.growth < 1:
+            raise ValueError("POLL_GROWTH_INVALID|ضریب رشد بازه بررسی باید حداقل ۱ باشد")
+
+    @property
+    def current(self) -> float:
+        return self._current
+
+    def next_delay(self, *, sent: int, batch_size: int, seconds_until_due: float | None = None) -> float:
+        if sent >= batch_size:
+            self._current = self.min_seconds
+            return 0.0
+        if sent > 0:
+            self._current = self.min_seconds
+        else:
+            self._current = min(max(self._current * self.growth, self.min_seconds), self.max_seconds)
+        delay = self._current
+        if seconds_until_due is not None:
+            delay = min(delay, max(seconds_until_due, self.min_seconds))
+        return delay
+
+
+class OutboxWorkerMetrics:
+    """Prometheus meters describing outbox backlog and drain throughput."""
+
+    def __init__(self, registry: CollectorRegistry | None = None) -> None:
+        self._registry = registry or REGISTRY
+        self._depth = Gauge(
+            "outbox_queue_depth",
+            "Pending outbox rows by state",
+            ("state",),
+            registry=self._registry,
+        )
+        self._lag = Gauge(
+            "outbox_dispatch_lag_seconds",
+            "Age of the oldest due outbox row",
+            registry=self._registry,
+        )
+        self._dispatched = Counter(
+            "outbox_dispatched_total",
+            "Outbox events published by drain workers",
+            registry=self._registry,
+        )
+        self._polls = Counter(
+            "outbox_polls_total",
+            "Outbox drain polls by outcome",
+            ("result",),
+            registry=self._registry,
+        )
+        self._interval = Gauge(
+            "outbox_poll_interval_seconds",
+            "Sleep chosen after the last outbox poll",
+            registry=self._registry,
+        )
+        self._throughput = Gauge(
+            "outbox_throughput_events_per_second",
+            "Events published per second during the last busy poll",
+            registry=self._registry,
+        )
+
+    @property
+    def registry(self) -> CollectorRegistry:
+        return self._registry
+
+    def record_poll(self, *, sent: int, elapsed: float, delay: float, stats: PendingStats, lag: float) -> None:
+        self._polls.labels(result="busy" if sent else "idle").inc()
+        self._dispatched.inc(sent)
+        self._depth.labels(state="pending").set(stats.pending)
+        self._depth.labels(state="due").set(stats.due)
+        self._lag.set(lag)
+        self._interval.set(delay)
+        if sent and elapsed > 0:
+            self._throughput.set(sent / elapsed)
+
+    def record_error(self, *, delay: float) -> None:
+        self._polls.labels(result="error").inc()
+        self._interval.set(delay)
+
+
+class OutboxDrainWorker:
+    """Repeatedly drain due outbox rows until stopped.
+
+    Every poll opens a fresh session from ``session_factory``, dispatches one
+    batch through :class:`OutboxDispatcher` and then reads the backlog size
+    to pick the next sleep via :class:`AdaptivePolling`.  Several workers may
+    run against the same database: ``list_due_for_update`` locks rows with
+    ``FOR UPDATE SKIP LOCKED`` over ``ix_outbox_dispatch`` so each row is
+    claimed by one worker.  Poll failures are logged and retried after the
+    idle interval instead of terminating the worker.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        publisher: Publisher,
+        *,
+        clock: Clock | None = None,
+        backoff: BackoffPolicy | None = None,
+        batch_size: int = 50,
+        max_in_flight: int = 1,
+        polling: AdaptivePolling | None = None,
+        metrics: OutboxWorkerMetrics | None = None,
+        status_hook: Callable[[str, str, dict[str, Any]], None] | None = None,
+    ) -> None:
+        if batch_size <= 0:
+            raise ValueError("BATCH_SIZE_INVALID|اندازه دسته باید مثبت باشد")
+        self._session_factory = session_factory
+        self._publisher = publisher
+        self._clock = clock or SystemClock()
+        self._backoff = backoff or BackoffPolicy()
+        self._batch_size = batch_size
+        self._max_in_flight = max_in_flight
+        self._polling = polling or AdaptivePolling()
+        self._metrics = metrics
+        self._status_hook = status_hook
+
+    def run_once(self) -> tuple[int, float]:
+        """Dispatch one batch and return ``(sent, seconds_to_sleep)``."""
+
+        started = self._clock.monotonic()
+        session = self._session_factory()
+        try:
+            dispatcher = OutboxDispatcher(
+                session=session,
+                publisher=self._publisher,
+                clock=self._clock,
+                backoff=self._backoff,
+                batch_size=self._batch_size,
+                status_hook=self._status_hook,
+                max_in_flight=self._max_in_flight,
+            )
+            sent = dispatcher.dispatch_once()
+            stats = OutboxRepository(session).pending_stats(clock=self._clock)
+            session.commit()
+        except Exception as exc:  # pylint: disable=broad-except
+            session.rollback()
+            delay = self._polling.next_delay(sent=0, batch_size=self._batch_size)
+            logger.error(
+                "بررسی اوتباکس با خطا مواجه شد",
+                extra={"کد": "OUTBOX_WORKER_ERROR", "جزئیات": str(exc), "تاخیر": delay},
+            )
+            if self._metrics is not None:
+                self._metrics.record_error(delay=delay)
+            return 0, delay
+        finally:
+            session.close()
+
+        now = self._clock.now()
+        lag = 0.0
+        seconds_until_due: float | None = None
+        if stats.oldest_available_at is not None:
+            offset = _seconds_between(stats.oldest_available_at, now)
+            if offset > 0:
+                seconds_until_due = offset
+            else:
+                lag = -offset
+        delay = self._polling.next_delay(
+            sent=sent,
+            batch_size=self._batch_size,
+            seconds_until_due=seconds_until_due,
+        )
+        if self._metrics is not None:
+            self._metrics.record_poll(
+                sent=sent,
+                elapsed=self._clock.monotonic() - started,
+                delay=delay,
+                stats=stats,
+                lag=lag,
+            )
+        return sent, delay
+
+    def run(self, stop_event: threading.Event | None = None, *, max_polls: int | None = None) -> int:
+        """Drain until ``stop_event`` is set or ``max_polls`` polls ran; return events sent."""
+
+        stop = stop_event or threading.Event()
+        total = 0
+        polls = 0
+        while not stop.is_set():
+            sent, delay = self.run_once()
+            total += sent
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                break
+            if delay > 0:
+                stop.wait(delay)
+        return total
+
+
+__all__ = ["AdaptivePolling", "OutboxDrainWorker", "OutboxWorkerMetrics"]
@@ -0,0 +1,119 @@
+"""Compiled rule pipeline used when no evaluation trace is requested."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Dict, List, Sequence
+
+from .contracts import NormalizedMentor, NormalizedStudent, RuleCode
+from .rules import Rule
+
+Predicate = Callable[[NormalizedStudent, NormalizedMentor], bool]
+
+
+@dataclass
+class RuleCounters:
+    """Per-rule evaluation statistics."""
+
+    evaluated: int = 0
+    rejected: int = 0
+
+    @property
+    def rejection_rate(self) -> float:
+        if self.evaluated == 0:
+            return 0.0
+        return self.rejected / self.evaluated
+
+
+@dataclass
+class _CompiledRule:
+    code: RuleCode
+    position: int
+    predicate: Predicate
+    counters: RuleCounters
+
+
+def _compile(rule: Rule) -> Predicate:
+    passes = getattr(rule, "passes", None)
+    if callable(passes):
+        return passes
+
+    def predicate(student: NormalizedStudent, mentor: NormalizedMentor) -> bool:
+        return rule.check(student, mentor).passed
+
+    return predicate
+
+
+class CompiledRulePipeline:
+    """Boolean AND over policy rules ordered by observed selectivity.
+
+    Rules are evaluated through their ``passes`` predicate (falling back to
+    ``check``) so no ``RuleResult`` or details dict is built.  Every
+    ``reorder_interval`` evaluations the rules are re-sorted by rejection rate,
+    most selective first; ties keep the declared order.  Reordering never
+    changes the verdict because all rules must pass.  Predicates run outside
+    the lock; counters and the rule order are only updated while holding it,
+    so one pipeline can be shared by several threads.
+    """
+
+    def __init__(self, rules: Sequence[Rule], *, reorder_interval: int = 1024) -> None:
+        if reorder_interval <= 0:
+            raise ValueError("reorder_interval must be positive")
+        self._reorder_interval = reorder_interval
+        self._rules: List[_CompiledRule] = [
+            _CompiledRule(rule.code, position, _compile(rule), RuleCounters())
+            for position, rule in enumerate(rules)
+        ]
+        self._since_reorder = 0
+        self._lock = Lock()
+
+    @property
+    def order(self) -> tuple[RuleCode, ...]:
+        return tuple(item.code for item in self._rules)
+
+    def passes(self, student: NormalizedStudent, mentor: NormalizedMentor) -> bool:
+        rules = self._rules
+        evaluated = len(rules)
+        verdict = True
+        for position, item in enumerate(rules):
+            if not item.predicate(student, mentor):
+                evaluated = position + 1
+                verdict = False
+                break
+        with self._lock:
+            for item in rules[:evaluated]:
+                item.counters.evaluated += 1
+            if not verdict:
+                rules[evaluated - 1].counters.rejected += 1
+            self._since_reorder += 1
+            if self._since_reorder >= self._reorder_interval:
+                self._reorder_locked()
+        return verdict
+
+    def reorder(self) -> None:
+        """Sort rules by descending rejection rate."""
+
+        with self._lock:
+            self._reorder_locked()
+
+    def _reorder_locked(self) -> None:
+        self._since_reorder = 0
+        self._rules = sorted(
+            self._rules,
+            key=lambda item: (-item.counters.rejection_rate, item.position),
+        )
+
+    def counters_snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Return ``{rule_code: {"evaluated": n, "rejected": n}}`` in declared order."""
+
+        with self._lock:
+            return {
+                item.code: {
+                    "evaluated": item.counters.evaluated,
+                    "rejected": item.counters.rejected,
+                }
+                for item in sorted(self._rules, key=lambda item: item.position)
+            }
+
+
+__all__ = ["CompiledRulePipeline", "RuleCounters"]
@@ -1,8 +1,10 @@
 """Eligibility policy applying rule engine logic."""
 from __future__ import annotations
 
+from collections.abc import Collection
 from dataclasses import dataclass, field
-from typing import List, Sequence
+from threading import RLock
+from typing import Callable, Hashable, List, Sequence
 
 from .contracts import (
     AllocationConfig,
@@ -12,6 +14,7 @@ from .contracts import (
     StudentLike,
     TraceEntry,
 )
+from .pipeline import CompiledRulePipeline
 from .providers import ManagerCentersProvider, SpecialSchoolsProvider
 from .rules import (
     ALL_RULES,
@@ -158,6 +161,129 @@ def _normalize_optional_enum(
     return numeric
 
 
+def _typed(value: object) -> tuple[object, ...]:
+    # ``1 == 1.0 == True`` but only ``1`` normalizes; keep the type apart.
+    return (type(value), value)
+
+
+def _iter_fingerprint(values: object) -> tuple[object, ...] | None:
+    if values is None or isinstance(values, (str, bytes)):
+        return (_typed(values),)
+    if not isinstance(values, Collection):
+        # One-shot iterables would be consumed here before normalization.
+        return None
+    return tuple(_typed(value) for value in values)
+
+
+def mentor_fingerprint(mentor: MentorLike) -> tuple[Hashable, ...] | None:
+    """Return the raw field values that determine a mentor's normalization.
+
+    Every value is paired with its type, so rows whose values only compare
+    equal (``1``, ``1.0``, ``True``) do not share a cache entry.
+    ``None`` is returned when a multi-valued field is not a ``Collection``
+    (e.g. a generator); such rows cannot be fingerprinted without consuming
+    the values normalization still has to read.
+    """
+
+    allowed_groups = _iter_fingerprint(mentor.allowed_groups)
+    allowed_centers = _iter_fingerprint(mentor.allowed_centers)
+    special_schools = _iter_fingerprint(mentor.special_schools)
+    if allowed_groups is None or allowed_centers is None or special_schools is None:
+        return None
+    return (
+        mentor.mentor_id,
+        _typed(mentor.mentor_id),
+        _typed(mentor.gender),
+        allowed_groups,
+        allowed_centers,
+        _typed(mentor.capacity),
+        _typed(mentor.current_load),
+        _typed(mentor.is_active),
+        _typed(mentor.mentor_type),
+        special_schools,
+        _typed(mentor.manager_id),
+    )
+
+
+@dataclass(slots=True)
+class _MentorCacheEntry:
+    fingerprint: tuple[Hashable, ...]
+    value: NormalizedMentor | NormalizationError
+
+
+class MentorNormalizationCache:
+    """Memoize ``NormalizedMentor`` objects keyed by mentor id and content.
+
+    An entry is reused only while the raw mentor row still has the same
+    fingerprint, so roster edits (load, capacity, groups, ...) are picked up
+    automatically.  Normalization failures are cached as well and re-raised.
+    Rows whose list fields are one-shot iterables bypass the cache.
+    """
+
+    def __init__(self, *, max_entries: int = 50_000) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self._max_entries = max_entries
+        self._entries: dict[Hashable, _MentorCacheEntry] = {}
+        self._lock = RLock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self) -> int:
+        """Incremented whenever the cache is explicitly invalidated."""
+
+        return self._generation
+
+    def get_or_normalize(
+        self, mentor: MentorLike, normalize: Callable[[MentorLike], NormalizedMentor]
+    ) -> NormalizedMentor:
+        fingerprint = mentor_fingerprint(mentor)
+        if fingerprint is None:
+            return normalize(mentor)
+        key = fingerprint[0]
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached.fingerprint == fingerprint:
+                self.hits += 1
+                value = cached.value
+            else:
+                value = None
+        if value is None:
+            generation = self._generation
+            try:
+                value = normalize(mentor)
+            except NormalizationError as error:
+                value = error
+            with self._lock:
+                self.misses += 1
+                if generation == self._generation:
+                    self._store(key, _MentorCacheEntry(fingerprint, value))
+        if isinstance(value, NormalizationError):
+            raise NormalizationError(value.rule_code, str(value), dict(value.details))
+        return value
+
+    def invalidate(self, mentor_id: Hashable | None = None) -> None:
+        """Drop one mentor (by raw id) or, without an id, the whole cache."""
+
+        with self._lock:
+            if mentor_id is None:
+                self._entries.clear()
+                self._generation += 1
+            else:
+                self._entries.pop(mentor_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: Hashable, entry: _MentorCacheEntry) -> None:
+        self._entries.pop(key, None)
+        if len(self._entries) >= self._max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = entry
+
+
 @dataclass
 class EligibilityPolicy:
     """Evaluate mentors against allocation policy rules."""
@@ -165,12 +291,24 @@ class EligibilityPolicy:
     special_schools_provider: SpecialSchoolsProvider
     manager_centers_provider: ManagerCentersProvider
     config: AllocationConfig = field(default_factory=AllocationConfig)
+    mentor_cache: MentorNormalizationCache | None = field(
+        default_factory=MentorNormalizationCache, repr=False
+    )
     _rules: Sequence[Rule] = field(init=False, repr=False)
+    _pipeline: CompiledRulePipeline = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
         rules: list[Rule] = list(ALL_RULES)
         rules.append(ManagerCenterGateRule(self.manager_centers_provider))
         self._rules = tuple(rules)
+        self._pipeline = CompiledRulePipeline(
+            self._rules, reorder_interval=self.config.rule_reorder_interval
+        )
+
+    def rule_counters(self) -> dict[str, dict[str, int]]:
+        """Hit/reject counters collected by trace-free evaluations."""
+
+        return self._pipeline.counters_snapshot()
 
     def normalize_student(self, student: StudentLike) -> NormalizedStudent:
         warnings: set[str] = set()
@@ -255,6 +393,11 @@ class EligibilityPolicy:
         return 1 if school_code in schools else 0
 
     def normalize_mentor(self, mentor: MentorLike) -> NormalizedMentor:
+        if self.mentor_cache is not None:
+            return self.mentor_cache.get_or_normalize(mentor, self._normalize_mentor)
+        return self._normalize_mentor(mentor)
+
+    def _normalize_mentor(self, mentor: MentorLike) -> NormalizedMentor:
         mentor_id = _normalize_int(
             mentor.mentor_id,
             rule_code="CAPACITY_AVAILABLE",
@@ -325,8 +468,18 @@ class EligibilityPolicy:
         )
 
     def evaluate(
-        self, student: StudentLike | NormalizedStudent, mentor: MentorLike | NormalizedMentor
+        self,
+        student: StudentLike | NormalizedStudent,
+        mentor: MentorLike | NormalizedMentor,
+        *,
+        trace: bool = True,
     ) -> tuple[bool, List[TraceEntry]]:
+        """Evaluate all rules; with ``trace=False`` use the compiled pipeline.
+
+        The trace-free path returns an empty trace and skips building
+        ``RuleResult`` objects, running the most selective rules first.
+        """
+
         try:
             normalized_student = (
                 student
@@ -339,16 +492,18 @@ class EligibilityPolicy:
                 else self.normalize_mentor(mentor)
             )
         except NormalizationError as error:
-            details = {"message": str(error)}
+            details: dict[str, object] = {"message": str(error)}
             details.update(error.details)
-            trace = [
+            failure: List[TraceEntry] = [
                 {
                     "code": error.rule_code,
                     "passed": False,
                     "details": details,
                 }
             ]
-            return False, trace
+            return False, failure
+        if not trace:
+            return self._pipeline.passes(normalized_student, normalized_mentor), []
         return self._run_rules(normalized_student, normalized_mentor)
 
     def _run_rules(
@@ -31,6 +31,9 @@ class GenderMatchRule:
 
     code: RuleCode = "GENDER_MATCH"
 
+    def passes(self, student: NormalizedStudent, mentor: NormalizedMentor) -> bool:
+        return student.gender == mentor.gender
+
     def check(self, student: NormalizedStudent, mentor: NormalizedMentor) -> RuleResult:
         passed = student.gender == mentor.gender
         details: Dict[str, object] = {}
@@ -49,6 +52,9 @@ class GroupAllowedRule:
 
     code: RuleCode = "GROUP_ALLOWED"
 
+    def passes(self, student: NormalizedStudent, mentor: NormalizedMentor) -> bool:
+        return student.group_code in mentor.allowed_groups
+
     def check(self, student: NormalizedStudent, mentor: NormalizedMentor) -> RuleResult:
         group_allowed = student.group_code in mentor.allowed_groups
         details: Dict[str, object] = {}
@@ -66,6 +72,9 @@ class CenterAllowedRule:
 
     code: RuleCode = "CENTER_ALLOWED"
 
+    def passes(self, student: NormalizedStudent, mentor: NormalizedMentor) -> bool:
+        return student.reg_center in mentor.allowed_centers
+
     def check(self, student: NormalizedStudent, mentor: NormalizedMentor) -> RuleResult:
         center_allowed = student.reg_center in mentor.allowed_centers
         details: Dict[str, object] = {}
@@ -83,6 +92,9 @@ class RegistrationStatusAllowedRule:
 
     code: RuleCode = "REG_STATUS_ALLOWED"
 
+    def passes(self, student: NormalizedStudent, mentor: NormalizedMentor) -> bool:
+        return student.reg_status in (0, 1, 3)
+
     def check(self, student: NormalizedStudent, mentor: NormalizedMentor) -> RuleResult:
         allowed = student.reg_status in (0, 1, 3)
         details: Dict[str, object] = {}
@@ -100,6 +112,11 @@ class CapacityAvailableRule:
 
     code: RuleCode = "CAPACITY_AVAILABLE"
 
+    def passes(self, student: NormalizedStudent, mentor: NormalizedMentor) -> bool:
+        if mentor.capacity < 0 or mentor.current_load < 0:
+            return False
+        return mentor.is_active and mentor.current_load < mentor.capacity
+
     def check(self, student: NormalizedStudent, mentor: NormalizedMentor) -> RuleResult:
         details: Dict[str, object] = {}
         if mentor.capacity < 0 or mentor.current_load < 0:
@@ -128,6 +145,15 @@ class SchoolTypeCompatibleRule:
 
     code: RuleCode = "SCHOOL_TYPE_COMPATIBLE"
 
+    def passes(self, student: NormalizedStudent, mentor: NormalizedMentor) -> bool:
+        if student.student_type == 1:
+            return (
+                mentor.mentor_type == "SCHOOL"
+                and student.school_code is not None
+                and student.school_code in mentor.special_schools
+            )
+        return mentor.mentor_type != "SCHOOL"
+
     def check(self, student: NormalizedStudent, mentor: NormalizedMentor) -> RuleResult:
         details: Dict[str, object] = {}
         if student.warnings:
@@ -165,6 +191,9 @@ class GraduateNotToSchoolRule:
 
     code: RuleCode = "GRADUATE_NOT_TO_SCHOOL"
 
+    def passes(self, student: NormalizedStudent, mentor: NormalizedMentor) -> bool:
+        return not (student.edu_status == 0 and mentor.mentor_type == "SCHOOL")
+
     def check(self, student: NormalizedStudent, mentor: NormalizedMentor) -> RuleResult:
         if student.edu_status == 0 and mentor.mentor_type == "SCHOOL":
             return RuleResult(
@@ -183,6 +212,13 @@ class ManagerCenterGateRule:
     manager_provider: ManagerCentersProvider
     code: RuleCode = "MANAGER_CENTER_GATE"
 
+    def passes(self, student: NormalizedStudent, mentor: NormalizedMentor) -> bool:
+        manager_id = mentor.manager_id
+        if manager_id is None:
+            return True
+        centers = self.manager_provider.get_allowed_centers(manager_id)
+        return centers is not None and student.reg_center in centers
+
     def check(self, student: NormalizedStudent, mentor: NormalizedMentor) -> RuleResult:
         manager_id = mentor.manager_id
         if manager_id is None:
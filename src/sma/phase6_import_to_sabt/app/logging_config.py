@@ -31,7 +31,9 @@ def configure_logging(service_name: str, enable_debug: bool) -> None:
     handler.setFormatter(JSONLogFormatter(service_name=service_name))
 
     root = logging.getLogger()
-    root.handlers.clear()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+        existing.close()
     root.setLevel(level)
     root.addHandler(handler)
 
@@ -2,11 +2,11 @@ from __future__ import annotations
 
 import logging
 import uuid
-from collections.abc import Awaitable, Callable
+from collections.abc import Callable
+from typing import Any
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from sma.phase6_import_to_sabt.app.clock import Clock
 from sma.phase6_import_to_sabt.app.timing import Timer
@@ -15,80 +15,112 @@ from sma.phase6_import_to_sabt.obs.metrics import ServiceMetrics
 logger = logging.getLogger(__name__)
 
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
+def scope_state(scope: Scope) -> dict[str, Any]:
+    """Return the dict backing ``request.state`` for *scope*."""
+
+    return scope.setdefault("state", {})
+
+
+def on_response_start(send: Send, hook: Callable[[Message], None]) -> Send:
+    """Wrap *send* so *hook* sees (and may edit) the ``http.response.start`` message.
+
+    The hook runs at the point ``call_next`` used to return under
+    ``BaseHTTPMiddleware``: once headers are known, before the body streams.
+    """
+
+    async def _send(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            hook(message)
+        await send(message)
+
+    return _send
+
+
+class CorrelationIdMiddleware:
     """Attach a correlation-id header to every request."""
 
-    def __init__(self, app: ASGIApp, clock: Clock) -> None:  # type: ignore[override]
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, clock: Clock) -> None:
+        self.app = app
         self._clock = clock
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        header_value = request.headers.get("X-Request-ID")
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        header_value = Headers(scope=scope).get("X-Request-ID")
         correlation_id = header_value or str(uuid.uuid4())
-        request.state.correlation_id = correlation_id
-        request.state.request_ts = self._clock.now()
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = correlation_id
-        return response
+        state = scope_state(scope)
+        state["correlation_id"] = correlation_id
+        state["request_ts"] = self._clock.now()
+
+        def _stamp(message: Message) -> None:
+            MutableHeaders(scope=message)["X-Request-ID"] = correlation_id
 
+        await self.app(scope, receive, on_response_start(send, _stamp))
 
-class MetricsMiddleware(BaseHTTPMiddleware):
+
+class MetricsMiddleware:
     """Collect simple request metrics without any auth enforcement."""
 
-    def __init__(self, app: ASGIApp, metrics: ServiceMetrics, timer: Timer) -> None:  # type: ignore[override]
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, metrics: ServiceMetrics, timer: Timer) -> None:
+        self.app = app
         self._metrics = metrics
         self._timer = timer
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         handle = self._timer.start()
-        response = await call_next(request)
-        duration = handle.elapsed()
-        self._metrics.request_latency.observe(duration)
-        self._metrics.request_total.labels(
-            method=request.method,
-            path=request.url.path,
-            status=str(response.status_code),
-        ).inc()
-        return response
-
-
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+
+        def _observe(message: Message) -> None:
+            duration = handle.elapsed()
+            self._metrics.request_latency.observe(duration)
+            self._metrics.request_total.labels(
+                method=scope["method"],
+                path=scope["path"],
+                status=str(message["status"]),
+            ).inc()
+
+        await self.app(scope, receive, on_response_start(send, _observe))
+
+
+class RequestLoggingMiddleware:
     """Log high-level request outcomes for observability."""
 
     def __init__(
         self,
         app: ASGIApp,
         diagnostics: Callable[[], dict[str, object] | None],
-    ) -> None:  # type: ignore[override]
-        super().__init__(app)
+    ) -> None:
+        self.app = app
         self._diagnostics_factory = diagnostics
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        response = await call_next(request)
-        chain = list(getattr(request.state, "middleware_chain", []))
-        response.headers.setdefault("X-Middleware-Chain", ",".join(chain))
-        logger.info(
-            "request.completed",
-            extra={
-                "correlation_id": getattr(request.state, "correlation_id", None),
-                "component": "http",
-                "outcome": response.status_code,
-            },
-        )
-        diagnostics = self._diagnostics_factory()
-        if diagnostics and diagnostics.get("enabled"):
-            diagnostics["last_chain"] = chain
-            diagnostics["last_rate_limit"] = getattr(request.state, "rate_limit_state", None)
-            diagnostics["last_idempotency"] = getattr(request.state, "idempotency_state", None)
-            diagnostics["last_auth"] = getattr(request.state, "auth_state", None)
-        return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = scope_state(scope)
+
+        def _log(message: Message) -> None:
+            chain = list(state.get("middleware_chain", []))
+            MutableHeaders(scope=message).setdefault("X-Middleware-Chain", ",".join(chain))
+            logger.info(
+                "request.completed",
+                extra={
+                    "correlation_id": state.get("correlation_id"),
+                    "component": "http",
+                    "outcome": message["status"],
+                },
+            )
+            diagnostics = self._diagnostics_factory()
+            if diagnostics and diagnostics.get("enabled"):
+                diagnostics["last_chain"] = chain
+                diagnostics["last_rate_limit"] = state.get("rate_limit_state")
+                diagnostics["last_idempotency"] = state.get("idempotency_state")
+                diagnostics["last_auth"] = state.get("auth_state")
+
+        await self.app(scope, receive, on_response_start(send, _log))
 
 
 __all__ = [
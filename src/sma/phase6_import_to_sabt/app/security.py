@@ -2,28 +2,33 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import Awaitable, Callable
+from typing import Any
 
-from fastapi import HTTPException, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from sma.phase6_import_to_sabt.app.clock import Clock
 from sma.phase6_import_to_sabt.app.config import AuthConfig, RateLimitConfig
+from sma.phase6_import_to_sabt.app.middleware import on_response_start, scope_state
 from sma.phase6_import_to_sabt.app.utils import normalize_token
 from sma.phase6_import_to_sabt.app.stores import KeyValueStore
 
 logger = logging.getLogger(__name__)
 
 
-def _ensure_chain(request: Request) -> list[str]:
-    chain = getattr(request.state, "middleware_chain", None)
+def _ensure_chain(state: dict[str, Any]) -> list[str]:
+    chain = state.get("middleware_chain")
     if chain is None:
         chain = []
-        request.state.middleware_chain = chain
+        state["middleware_chain"] = chain
     return chain
 
 
+def _app_diagnostics(scope: Scope) -> dict[str, Any] | None:
+    return getattr(scope["app"].state, "diagnostics", None)
+
+
 @dataclass(slots=True)
 class _RateLimitSnapshot:
     remaining: int
@@ -31,7 +36,7 @@ class _RateLimitSnapshot:
     window_seconds: int
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitMiddleware:
     """Simple deterministic rate limiter suitable for CI test environments."""
 
     def __init__(
@@ -41,30 +46,34 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         store: KeyValueStore,
         config: RateLimitConfig,
         clock: Clock,
-    ) -> None:  # type: ignore[override]
-        super().__init__(app)
+    ) -> None:
+        self.app = app
         self._store = store
         self._config = config
         self._clock = clock
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        chain = _ensure_chain(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = scope_state(scope)
+        chain = _ensure_chain(state)
         chain.append("RateLimit")
-        diagnostics = getattr(request.app.state, "diagnostics", None)
+        diagnostics = _app_diagnostics(scope)
+        headers = Headers(scope=scope)
+        client = scope.get("client")
         identifier = (
-            normalize_token(request.headers.get("X-RateLimit-Key"))
-            or normalize_token(request.headers.get("X-Client-ID"))
-            or (request.client.host if request.client else "anonymous")
+            normalize_token(headers.get("X-RateLimit-Key"))
+            or normalize_token(headers.get("X-Client-ID"))
+            or (client[0] if client else "anonymous")
         )
-        bucket_key = f"{self._config.namespace}:{identifier}:{request.method.upper()}"
+        bucket_key = f"{self._config.namespace}:{identifier}:{scope['method'].upper()}"
         penalty_key = f"penalty:{bucket_key}"
         penalty_active = await self._store.get(penalty_key)
         if penalty_active is not None:
             logger.warning(
                 "ratelimit.blocked",
-                extra={"correlation_id": getattr(request.state, "correlation_id", None), "key": identifier},
+                extra={"correlation_id": state.get("correlation_id"), "key": identifier},
             )
             raise HTTPException(
                 status_code=429,
@@ -82,7 +91,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             key=bucket_key,
             window_seconds=self._config.window_seconds,
         )
-        request.state.rate_limit_state = snapshot
+        state["rate_limit_state"] = snapshot
         if attempts > self._config.requests:
             await self._store.set(penalty_key, "1", self._config.penalty_seconds)
             raise HTTPException(
@@ -95,17 +104,19 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 },
                 headers={"Retry-After": str(self._config.penalty_seconds)},
             )
-        response = await call_next(request)
-        response.headers["X-RateLimit-Remaining"] = str(snapshot.remaining)
-        if diagnostics and diagnostics.get("enabled"):
-            diagnostics["last_rate_limit"] = {
-                "remaining": snapshot.remaining,
-                "bucket": snapshot.key,
-            }
-        return response
+
+        def _annotate(message: Message) -> None:
+            MutableHeaders(scope=message)["X-RateLimit-Remaining"] = str(snapshot.remaining)
+            if diagnostics and diagnostics.get("enabled"):
+                diagnostics["last_rate_limit"] = {
+                    "remaining": snapshot.remaining,
+                    "bucket": snapshot.key,
+                }
+
+        await self.app(scope, receive, on_response_start(send, _annotate))
 
 
-class IdempotencyMiddleware(BaseHTTPMiddleware):
+class IdempotencyMiddleware:
     """Reject duplicate POST requests based on the Idempotency-Key header."""
 
     IDEMPOTENCY_TTL_SECONDS = 86_400
@@ -115,19 +126,22 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
         app: ASGIApp,
         *,
         store: KeyValueStore,
-    ) -> None:  # type: ignore[override]
-        super().__init__(app)
+    ) -> None:
+        self.app = app
         self._store = store
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        chain = _ensure_chain(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = scope_state(scope)
+        chain = _ensure_chain(state)
         chain.append("Idempotency")
-        diagnostics = getattr(request.app.state, "diagnostics", None)
-        if request.method.upper() != "POST":
-            return await call_next(request)
-        key = normalize_token(request.headers.get("Idempotency-Key"))
+        diagnostics = _app_diagnostics(scope)
+        if scope["method"].upper() != "POST":
+            await self.app(scope, receive, send)
+            return
+        key = normalize_token(Headers(scope=scope).get("Idempotency-Key"))
         if not key:
             raise HTTPException(
                 status_code=400,
@@ -143,7 +157,7 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
             value=str(self.IDEMPOTENCY_TTL_SECONDS),
             ttl_seconds=self.IDEMPOTENCY_TTL_SECONDS,
         )
-        request.state.idempotency_state = {"key": key, "created": stored}
+        state["idempotency_state"] = {"key": key, "created": stored}
         if diagnostics and diagnostics.get("enabled"):
             diagnostics.setdefault("last_idempotency", {})[key] = "created" if stored else "duplicate"
         if not stored:
@@ -156,10 +170,10 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
                     }
                 },
             )
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
+class AuthMiddleware:
     """Bearer-token authentication middleware for service routes."""
 
     def __init__(
@@ -167,29 +181,32 @@ class AuthMiddleware(BaseHTTPMiddleware):
         app: ASGIApp,
         *,
         config: AuthConfig,
-    ) -> None:  # type: ignore[override]
-        super().__init__(app)
+    ) -> None:
+        self.app = app
         self._config = config
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        chain = _ensure_chain(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = scope_state(scope)
+        chain = _ensure_chain(state)
         chain.append("Auth")
-        diagnostics = getattr(request.app.state, "diagnostics", None)
-        header = request.headers.get("Authorization", "")
+        diagnostics = _app_diagnostics(scope)
+        header = Headers(scope=scope).get("Authorization", "")
         token = header.removeprefix("Bearer ").strip()
         expected = self._config.service_token
         allow_all = getattr(self._config, "allow_all", False)
         if diagnostics and diagnostics.get("enabled"):
             diagnostics["last_auth"] = {"present": bool(token), "allow_all": allow_all}
-        if allow_all or request.url.path == "/metrics":
-            request.state.auth_state = {
+        if allow_all or scope["path"] == "/metrics":
+            state["auth_state"] = {
                 "token": token,
                 "skipped": True,
                 "allow_all": allow_all,
             }
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
         if expected and token != expected:
             raise HTTPException(
                 status_code=401,
@@ -200,8 +217,8 @@ class AuthMiddleware(BaseHTTPMiddleware):
                     }
                 },
             )
-        request.state.auth_state = {"token": token}
-        return await call_next(request)
+        state["auth_state"] = {"token": token}
+        await self.app(scope, receive, send)
 
 
 __all__ = ["RateLimitMiddleware", "IdempotencyMiddleware", "AuthMiddleware"]
@@ -298,6 +298,8 @@ class ImportToSabtExporter:
             include_bom=options.include_bom,
             chunk_size=options.chunk_size,
             formula_guard=bool(options.excel_mode),
+            write_workers=options.csv_write_workers,
+            prenormalized=True,
         )
 
     def _write_exports(
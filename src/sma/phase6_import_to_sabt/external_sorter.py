@@ -1,13 +1,19 @@
 from __future__ import annotations
 
-import json
+import heapq
 import logging
+import multiprocessing
 import os
 import shutil
+import struct
 import tempfile
-from dataclasses import dataclass, field
+import zlib
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
 from pathlib import Path
-from typing import Iterable, Iterator, Sequence, Tuple
+from typing import BinaryIO, Iterable, Iterator, List, Sequence, Tuple
 
 from sma.phase6_import_to_sabt.exceptions import ExportIOError, ExportValidationError
 from sma.phase6_import_to_sabt.metrics import ExporterMetrics
@@ -16,27 +22,193 @@ from sma.phase6_import_to_sabt.sanitization import sanitize_text
 INVALID_SORT_KEY_MESSAGE = "کلید مرتب‌سازی نامعتبر است."
 SPILL_WRITE_ERROR_MESSAGE = "نوشتن فایل موقت ناموفق بود؛ لطفاً دوباره تلاش کنید."
 
+# Spill chunk layout (little endian):
+#   magic | u16 column_count | (u16 len + utf-8 name) * column_count
+#   then blocks of: u8 codec | u32 row_count | u32 payload_len | payload
+# Each row in a payload is u32 lengths for the sort key and every column
+# followed by the raw key bytes and the utf-8 values; ``_ABSENT`` marks a
+# column the row lacks.
+_SPILL_MAGIC = b"SMASORT2"
+_SPILL_HEADER = struct.Struct("<H")
+_SPILL_NAME = struct.Struct("<H")
+_SPILL_BLOCK = struct.Struct("<BII")
+_SPILL_BLOCK_ROWS = 1024
+_CODEC_RAW = 0
+_CODEC_ZLIB = 1
+_ABSENT = 0xFFFFFFFF
+
 
 @dataclass(slots=True)
 class SortPlan:
     chunk_paths: list[Path]
-    in_memory: list[tuple[Tuple[str, ...], dict[str, str]]]
+    in_memory: list[tuple[bytes, dict[str, str]]]
     total_rows: int
     chunk_count: int
     spill_bytes: int
     format_label: str
 
 
-@dataclass(order=True)
-class _HeapItem:
-    key: Tuple[str, ...]
-    index: int
-    row: dict[str, str] = field(compare=False)
-    iterator: Iterator[tuple[Tuple[str, ...], dict[str, str]]] = field(compare=False)
+SpillEntry = Tuple[bytes, dict[str, str]]
+
+# Numeric sort columns and the value used when a row leaves them empty.
+_NUMERIC_SORT_DEFAULTS = {"reg_center": 0, "group_code": 0, "school_code": 999_999}
+_INT_KEY_BIAS = 1 << 63
+_TEXT_KEY_END = b"\x00"
+
+
+def _encode_int_key(value: int) -> bytes:
+    """Fixed-width, order preserving encoding of a signed integer."""
+
+    try:
+        return (value + _INT_KEY_BIAS).to_bytes(8, "big")
+    except OverflowError as exc:
+        raise ExportValidationError(INVALID_SORT_KEY_MESSAGE) from exc
+
+
+def _write_spill(
+    handle: BinaryIO,
+    buffer: Sequence[SpillEntry],
+    *,
+    compress: bool,
+) -> None:
+    columns = list(dict.fromkeys(chain.from_iterable(row for _, row in buffer)))
+    header = [_SPILL_MAGIC, _SPILL_HEADER.pack(len(columns))]
+    for name in columns:
+        encoded = name.encode("utf-8")
+        header.append(_SPILL_NAME.pack(len(encoded)))
+        header.append(encoded)
+    handle.write(b"".join(header))
+    lengths = struct.Struct(f"<{1 + len(columns)}I")
+    codec = _CODEC_ZLIB if compress else _CODEC_RAW
+    for start in range(0, len(buffer), _SPILL_BLOCK_ROWS):
+        block = buffer[start : start + _SPILL_BLOCK_ROWS]
+        parts: list[bytes] = []
+        for key, row in block:
+            values = [key]
+            sizes = [len(key)]
+            for name in columns:
+                value = row.get(name)
+                if value is None:
+                    sizes.append(_ABSENT)
+                    continue
+                encoded = value.encode("utf-8")
+                values.append(encoded)
+                sizes.append(len(encoded))
+            parts.append(lengths.pack(*sizes))
+            parts.extend(values)
+        payload = b"".join(parts)
+        if codec == _CODEC_ZLIB:
+            payload = zlib.compress(payload, 1)
+        handle.write(_SPILL_BLOCK.pack(codec, len(block), len(payload)))
+        handle.write(payload)
+
+
+def _sort_and_spill(
+    buffer: List[SpillEntry],
+    chunk_path: Path,
+    *,
+    compress: bool,
+    fsync: bool,
+) -> int:
+    """Sort ``buffer`` by key and write it atomically; return the chunk size.
+
+    Module level so that it can run in a process pool.
+    """
+
+    buffer.sort(key=lambda item: item[0])
+    temp_path = chunk_path.with_suffix(".part")
+    try:
+        with open(temp_path, "wb") as handle:
+            _write_spill(handle, buffer, compress=compress)
+            handle.flush()
+            if fsync:
+                os.fsync(handle.fileno())
+        os.replace(temp_path, chunk_path)
+    except OSError as exc:  # pragma: no cover - defensive path
+        if temp_path.exists():
+            temp_path.unlink(missing_ok=True)
+        raise ExportIOError(SPILL_WRITE_ERROR_MESSAGE) from exc
+    return chunk_path.stat().st_size
+
+
+def _decode_block(
+    payload: bytes,
+    row_count: int,
+    lengths: struct.Struct,
+    columns: Sequence[str],
+) -> List[SpillEntry]:
+    entries: List[SpillEntry] = []
+    offset = 0
+    for _ in range(row_count):
+        sizes = lengths.unpack_from(payload, offset)
+        offset += lengths.size
+        key = payload[offset : offset + sizes[0]]
+        offset += sizes[0]
+        row: dict[str, str] = {}
+        for name, size in zip(columns, sizes[1:]):
+            if size == _ABSENT:
+                continue
+            row[name] = payload[offset : offset + size].decode("utf-8")
+            offset += size
+        entries.append((key, row))
+    return entries
+
+
+def _read_spill(path: Path) -> Iterator[SpillEntry]:
+    """Stream ``(key, row)`` pairs back from a spill chunk, one block at a time.
+
+    Rows were sanitized before spilling, so values are returned as stored.
+    """
+
+    try:
+        with open(path, "rb") as handle:
+            if handle.read(len(_SPILL_MAGIC)) != _SPILL_MAGIC:
+                raise ExportIOError(SPILL_WRITE_ERROR_MESSAGE)
+            (column_count,) = _SPILL_HEADER.unpack(handle.read(_SPILL_HEADER.size))
+            columns: list[str] = []
+            for _ in range(column_count):
+                (size,) = _SPILL_NAME.unpack(handle.read(_SPILL_NAME.size))
+                columns.append(handle.read(size).decode("utf-8"))
+            lengths = struct.Struct(f"<{1 + column_count}I")
+            while True:
+                block_header = handle.read(_SPILL_BLOCK.size)
+                if not block_header:
+                    break
+                codec, row_count, payload_size = _SPILL_BLOCK.unpack(block_header)
+                payload = handle.read(payload_size)
+                if codec == _CODEC_ZLIB:
+                    payload = zlib.decompress(payload)
+                yield from _decode_block(payload, row_count, lengths, columns)
+    except (OSError, struct.error, zlib.error) as exc:  # pragma: no cover - defensive path
+        raise ExportIOError(SPILL_WRITE_ERROR_MESSAGE) from exc
+
+
+def _merge(iterators: Sequence[Iterator[SpillEntry]]) -> Iterator[dict[str, str]]:
+    # Entries are plain tuples; the source index is unique, so rows and
+    # iterators are never compared and equal keys keep source order.
+    heap: list[tuple[bytes, int, dict[str, str], Iterator[SpillEntry]]] = []
+    for index, iterator in enumerate(iterators):
+        for key, row in iterator:
+            heap.append((key, index, row, iterator))
+            break
+    heapq.heapify(heap)
+    while heap:
+        _key, index, row, iterator = heap[0]
+        yield row
+        for next_key, next_row in iterator:
+            heapq.heapreplace(heap, (next_key, index, next_row, iterator))
+            break
+        else:
+            heapq.heappop(heap)
 
 
 class ExternalSorter:
-    """External sorter that spills sorted chunks to disk and merges lazily."""
+    """External sorter that spills sorted chunks to disk and merges lazily.
+
+    With ``spill_workers > 0`` full buffers are sorted and written by a pool
+    (threads, or processes when ``spill_processes`` is set) while the caller
+    keeps producing rows; at most ``spill_workers`` buffers are in flight.
+    """
 
     def __init__(
         self,
@@ -47,12 +219,19 @@ class ExternalSorter:
         correlation_id: str,
         metrics: ExporterMetrics | None = None,
         logger: logging.Logger | None = None,
+        compress_spill: bool = False,
+        fsync_spill: bool = False,
+        spill_workers: int = 0,
+        spill_processes: bool = False,
     ) -> None:
         if buffer_rows <= 0:
             raise ValueError("buffer_rows must be positive")
+        if spill_workers < 0:
+            raise ValueError("spill_workers must not be negative")
         if len(sort_keys) == 0:
             raise ValueError("sort_keys must not be empty")
         self._sort_keys = tuple(sort_keys)
+        self._key_plan = tuple((name, _NUMERIC_SORT_DEFAULTS.get(name)) for name in self._sort_keys)
         self._buffer_rows = buffer_rows
         self._metrics = metrics
         self._logger = logger or logging.getLogger(__name__)
@@ -63,6 +242,10 @@ class ExternalSorter:
             tempfile.mkdtemp(prefix=f"{correlation_id}_", dir=str(self._workspace_root))
         )
         self._current_format: str | None = None
+        self._compress_spill = compress_spill
+        self._fsync_spill = fsync_spill
+        self._spill_workers = spill_workers
+        self._spill_processes = spill_processes
 
     def prepare(
         self,
@@ -72,29 +255,39 @@ class ExternalSorter:
     ) -> SortPlan:
         self._current_format = format_label
         chunk_paths: list[Path] = []
-        buffer: list[tuple[Tuple[str, ...], dict[str, str]]] = []
+        buffer: list[SpillEntry] = []
         total_rows = 0
         spill_bytes = 0
-        for row in rows:
-            normalized = self._normalize_row(row)
-            key = self._build_key(normalized)
-            buffer.append((key, normalized))
-            total_rows += 1
-            if len(buffer) >= self._buffer_rows:
-                path, written = self._spill_chunk(buffer, index=len(chunk_paths))
-                chunk_paths.append(path)
-                spill_bytes += written
-                buffer.clear()
-        in_memory: list[tuple[Tuple[str, ...], dict[str, str]]] = []
-        if chunk_paths:
-            buffer.sort(key=lambda item: item[0])
-            in_memory.extend(buffer)
-        else:
-            buffer.sort(key=lambda item: item[0])
-            in_memory = buffer
+        pool = self._create_pool()
+        pending: deque[tuple[Path, int, Future[int]]] = deque()
+        try:
+            for row in rows:
+                normalized = self._normalize_row(row)
+                key = self._build_key(normalized)
+                buffer.append((key, normalized))
+                total_rows += 1
+                if len(buffer) < self._buffer_rows:
+                    continue
+                index = len(chunk_paths)
+                chunk_paths.append(self._chunk_path(index))
+                if pool is None:
+                    spill_bytes += self._spill_chunk(buffer, index=index)
+                    buffer.clear()
+                    continue
+                future = pool.submit(_sort_and_spill, buffer, chunk_paths[-1], **self._spill_options())
+                pending.append((chunk_paths[-1], len(buffer), future))
+                buffer = []
+                if len(pending) >= self._spill_workers:
+                    spill_bytes += self._finish_spill(*pending.popleft())
+            while pending:
+                spill_bytes += self._finish_spill(*pending.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+        buffer.sort(key=lambda item: item[0])
         plan = SortPlan(
             chunk_paths=chunk_paths,
-            in_memory=in_memory,
+            in_memory=buffer,
             total_rows=total_rows,
             chunk_count=len(chunk_paths),
             spill_bytes=spill_bytes,
@@ -106,41 +299,13 @@ class ExternalSorter:
 
     def iter_sorted(self, plan: SortPlan) -> Iterator[dict[str, str]]:
         if plan.chunk_count == 0:
-            for _, row in plan.in_memory:
-                yield row
-            return
-
-        def _generator() -> Iterator[dict[str, str]]:
-            iterators: list[Iterator[tuple[Tuple[str, ...], dict[str, str]]]] = [
-                self._chunk_iterator(path) for path in plan.chunk_paths
-            ]
-            if plan.in_memory:
-                iterators.append(self._memory_iterator(plan.in_memory))
-            if self._metrics:
-                self._metrics.observe_sort_merge(format_label=plan.format_label)
-            heap: list[_HeapItem] = []
-            for index, iterator in enumerate(iterators):
-                try:
-                    key, row = next(iterator)
-                except StopIteration:
-                    continue
-                heap.append(_HeapItem(key=key, index=index, row=row, iterator=iterator))
-            import heapq
-
-            heapq.heapify(heap)
-            while heap:
-                item = heapq.heappop(heap)
-                yield item.row
-                try:
-                    next_key, next_row = next(item.iterator)
-                except StopIteration:
-                    continue
-                heapq.heappush(
-                    heap,
-                    _HeapItem(key=next_key, index=item.index, row=next_row, iterator=item.iterator),
-                )
-
-        return _generator()
+            return (row for _, row in plan.in_memory)
+        iterators: list[Iterator[SpillEntry]] = [_read_spill(path) for path in plan.chunk_paths]
+        if plan.in_memory:
+            iterators.append(iter(plan.in_memory))
+        if self._metrics:
+            self._metrics.observe_sort_merge(format_label=plan.format_label)
+        return _merge(iterators)
 
     def cleanup(self, plan: SortPlan | None) -> None:
         if plan is not None:
@@ -165,23 +330,26 @@ class ExternalSorter:
                 normalized[key] = sanitize_text(str(value))
         return normalized
 
-    def _build_key(self, row: dict[str, str]) -> Tuple[str, ...]:
-        components: list[str] = []
+    def _build_key(self, row: dict[str, str]) -> bytes:
+        """Encode the sort columns into one bytes key compared with ``memcmp``.
+
+        Text columns are UTF-8 followed by a NUL terminator (sanitized text
+        never contains NUL) so shorter values sort first, exactly like
+        comparing the strings.  Numeric columns use a fixed-width biased
+        integer, which orders like the zero-padded codes they replace.
+        """
+
+        parts: list[bytes] = []
         try:
-            for name in self._sort_keys:
-                if name == "year_code":
-                    components.append(str(row[name]))
-                elif name == "reg_center":
-                    components.append(f"{self._to_int(row.get(name)):03d}")
-                elif name == "group_code":
-                    components.append(f"{self._to_int(row.get(name)):06d}")
-                elif name == "school_code":
-                    components.append(f"{self._to_int(row.get(name), default=999_999):06d}")
+            for name, default in self._key_plan:
+                if default is None:
+                    parts.append(str(row[name]).encode("utf-8"))
+                    parts.append(_TEXT_KEY_END)
                 else:
-                    components.append(str(row[name]))
+                    parts.append(_encode_int_key(self._to_int(row.get(name), default=default)))
         except KeyError as exc:  # pragma: no cover - defensive branch
             raise ExportValidationError(INVALID_SORT_KEY_MESSAGE) from exc
-        return tuple(components)
+        return b"".join(parts)
 
     def _to_int(self, value: str | None, *, default: int = 0) -> int:
         if value is None or value == "":
@@ -191,30 +359,34 @@ class ExternalSorter:
         except (TypeError, ValueError) as exc:
             raise ExportValidationError(INVALID_SORT_KEY_MESSAGE) from exc
 
-    def _spill_chunk(
-        self,
-        buffer: list[tuple[Tuple[str, ...], dict[str, str]]],
-        *,
-        index: int,
-    ) -> tuple[Path, int]:
-        buffer.sort(key=lambda item: item[0])
-        chunk_name = f"{self._correlation_id}_{index:05d}.chunk"
-        chunk_path = self._workspace / chunk_name
-        temp_path = chunk_path.with_suffix(".part")
-        try:
-            with open(temp_path, "w", encoding="utf-8") as handle:
-                for key, row in buffer:
-                    payload = {"key": list(key), "row": row}
-                    handle.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
-                    handle.write("\n")
-                handle.flush()
-                os.fsync(handle.fileno())
-            os.replace(temp_path, chunk_path)
-        except OSError as exc:  # pragma: no cover - defensive path
-            if temp_path.exists():
-                temp_path.unlink(missing_ok=True)
-            raise ExportIOError(SPILL_WRITE_ERROR_MESSAGE) from exc
-        bytes_written = chunk_path.stat().st_size
+    def _create_pool(self) -> Executor | None:
+        if self._spill_workers == 0:
+            return None
+        if self._spill_processes:
+            return ProcessPoolExecutor(
+                max_workers=self._spill_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return ThreadPoolExecutor(max_workers=self._spill_workers, thread_name_prefix="external-sort")
+
+    def _chunk_path(self, index: int) -> Path:
+        return self._workspace / f"{self._correlation_id}_{index:05d}.chunk"
+
+    def _spill_options(self) -> dict[str, object]:
+        return {
+            "compress": self._compress_spill,
+            "fsync": self._fsync_spill,
+        }
+
+    def _spill_chunk(self, buffer: List[SpillEntry], *, index: int) -> int:
+        chunk_path = self._chunk_path(index)
+        bytes_written = _sort_and_spill(buffer, chunk_path, **self._spill_options())
+        return self._record_spill(chunk_path, len(buffer), bytes_written)
+
+    def _finish_spill(self, chunk_path: Path, rows: int, future: Future[int]) -> int:
+        return self._record_spill(chunk_path, rows, future.result())
+
+    def _record_spill(self, chunk_path: Path, rows: int, bytes_written: int) -> int:
         if self._metrics:
             self._metrics.observe_sort_spill(
                 format_label=self._current_format or "unknown",
@@ -224,30 +396,10 @@ class ExternalSorter:
             "external_sort_spill correlation_id=%s chunk=%s rows=%d bytes=%d",
             self._correlation_id,
             chunk_path.name,
-            len(buffer),
+            rows,
             bytes_written,
         )
-        return chunk_path, bytes_written
-
-    def _chunk_iterator(self, path: Path) -> Iterator[tuple[Tuple[str, ...], dict[str, str]]]:
-        try:
-            with open(path, "r", encoding="utf-8") as handle:
-                for line in handle:
-                    if not line.strip():
-                        continue
-                    payload = json.loads(line)
-                    key = tuple(payload["key"])
-                    row = {k: sanitize_text(v) for k, v in payload["row"].items()}
-                    yield key, row
-        except OSError as exc:  # pragma: no cover - defensive path
-            raise ExportIOError(SPILL_WRITE_ERROR_MESSAGE) from exc
-
-    def _memory_iterator(
-        self,
-        entries: list[tuple[Tuple[str, ...], dict[str, str]]],
-    ) -> Iterator[tuple[Tuple[str, ...], dict[str, str]]]:
-        for key, row in entries:
-            yield key, row
+        return bytes_written
 
     def _remove_workspace(self) -> None:
         try:
@@ -76,11 +76,14 @@ class ExportOptions:
     newline: str = "\r\n"
     excel_mode: bool = True
     output_format: str = "xlsx"
+    csv_write_workers: int = 1
 
     def __post_init__(self) -> None:
         normalized = (self.output_format or "xlsx").lower()
         if normalized not in {"csv", "xlsx"}:
             raise ValueError(f"unsupported_format:{self.output_format}")
+        if self.csv_write_workers <= 0:
+            raise ValueError(f"invalid_write_workers:{self.csv_write_workers}")
         object.__setattr__(self, "output_format", normalized)
 
 
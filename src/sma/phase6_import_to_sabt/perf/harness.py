@@ -26,12 +26,21 @@ class PerformanceHarness:
         self.samples.append(duration)
         self.metrics.request_latency.observe(duration)
 
-    def p95(self) -> float:
+    def percentile(self, quantile: float) -> float:
         if not self.samples:
             return 0.0
         ordered = sorted(self.samples)
-        index = max(int(round(0.95 * len(ordered) + 0.5)) - 1, 0)
-        return ordered[index]
+        index = max(int(round(quantile * len(ordered) + 0.5)) - 1, 0)
+        return ordered[min(index, len(ordered) - 1)]
+
+    def p50(self) -> float:
+        return self.percentile(0.50)
+
+    def p95(self) -> float:
+        return self.percentile(0.95)
+
+    def p99(self) -> float:
+        return self.percentile(0.99)
 
     def mean(self) -> float:
         return statistics.mean(self.samples) if self.samples else 0.0
@@ -0,0 +1,230 @@
+"""In-process latency/throughput benchmark for the ImportToSabt middleware chain.
+
+Requests are driven straight through the ASGI interface (no sockets, no HTTP
+client) against two routes shaped like the hot client paths: a small JSON
+status poll and a chunked streaming download.  Each scenario is run against
+three applications serving the same routes:
+
+* ``bare`` - no user middleware (the floor);
+* ``basehttp`` - :func:`create_application` with every middleware swapped for
+  its ``BaseHTTPMiddleware`` reference from :mod:`.basehttp_reference`, i.e.
+  the chain before the pure ASGI rewrite;
+* ``chain`` - :func:`create_application` as shipped.
+
+``basehttp`` versus ``chain`` is the before/after comparison::
+
+    python -m sma.phase6_import_to_sabt.perf.middleware_bench --requests 5000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Sequence
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from prometheus_client import CollectorRegistry
+from starlette.types import ASGIApp, Message
+
+from sma.phase6_import_to_sabt.app.config import AppConfig, RateLimitConfig
+from sma.phase6_import_to_sabt.app.timing import MonotonicTimer
+from sma.phase6_import_to_sabt.obs.metrics import build_metrics
+from sma.phase6_import_to_sabt.perf.harness import PerformanceHarness
+
+STATUS_PATH = "/__bench/status"
+DOWNLOAD_PATH = "/__bench/download"
+_KEYS_PER_BUCKET = 1_000
+
+
+@dataclass(slots=True)
+class BenchmarkResult:
+    label: str
+    path: str
+    requests: int
+    seconds: float
+    p50: float
+    p99: float
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "label": self.label,
+            "path": self.path,
+            "requests": self.requests,
+            "p50_ms": round(self.p50 * 1000, 3),
+            "p99_ms": round(self.p99 * 1000, 3),
+            "requests_per_second": round(self.requests_per_second, 1),
+        }
+
+
+def _install_routes(app: FastAPI, *, chunk_bytes: int, chunks: int) -> None:
+    payload = b"x" * chunk_bytes
+
+    @app.get(STATUS_PATH)
+    async def _status() -> dict[str, object]:
+        return {"status": "SUCCESS", "progress": 100}
+
+    @app.get(DOWNLOAD_PATH)
+    async def _download() -> StreamingResponse:
+        async def _body():
+            for _ in range(chunks):
+                yield payload
+
+        return StreamingResponse(_body(), media_type="application/octet-stream")
+
+
+def build_chain_app(*, chunk_bytes: int = 16 * 1024, chunks: int = 16) -> FastAPI:
+    """Full application (all middleware) plus the benchmark routes."""
+
+    from sma.phase6_import_to_sabt.app.app_factory import create_application
+
+    config = AppConfig(ratelimit=RateLimitConfig(requests=_KEYS_PER_BUCKET))
+    app = create_application(
+        config=config,
+        metrics=build_metrics("middleware_bench", registry=CollectorRegistry()),
+        readiness_probes={},
+    )
+    _install_routes(app, chunk_bytes=chunk_bytes, chunks=chunks)
+    return app
+
+
+def build_reference_app(*, chunk_bytes: int = 16 * 1024, chunks: int = 16) -> FastAPI:
+    """Full application with the ``BaseHTTPMiddleware`` reference chain."""
+
+    from sma.phase6_import_to_sabt.perf import basehttp_reference
+
+    app = build_chain_app(chunk_bytes=chunk_bytes, chunks=chunks)
+    for middleware in app.user_middleware:
+        middleware.cls = getattr(basehttp_reference, middleware.cls.__name__)
+    app.middleware_stack = None
+    return app
+
+
+def build_bare_app(*, chunk_bytes: int = 16 * 1024, chunks: int = 16) -> FastAPI:
+    """The benchmark routes without any user middleware."""
+
+    app = FastAPI()
+    _install_routes(app, chunk_bytes=chunk_bytes, chunks=chunks)
+    return app
+
+
+async def _call(app: ASGIApp, path: str, index: int) -> int:
+    # Rotate the rate-limit key so the limiter stays on its fast path.
+    bucket = f"bench{path}-{index // _KEYS_PER_BUCKET}".encode("ascii")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"x-ratelimit-key", bucket)],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+        "app": app,
+    }
+    status = 0
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive() -> Message:
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Streaming responses listen for a disconnect; only send it once done.
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif not message.get("more_body", False):
+            finished.set()
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run_scenario(
+    app: ASGIApp,
+    *,
+    label: str,
+    path: str,
+    requests: int,
+    concurrency: int,
+) -> BenchmarkResult:
+    harness = PerformanceHarness(metrics=build_metrics("middleware_bench_run", registry=CollectorRegistry()))
+    timer = MonotonicTimer()
+    counter = iter(range(requests))
+
+    async def _worker() -> None:
+        for index in counter:
+            handle = timer.start()
+            status = await _call(app, path, index)
+            harness.record(handle.elapsed())
+            if status != 200:
+                raise RuntimeError(f"{label} {path} returned HTTP {status}")
+
+    for index in range(min(requests, 50)):  # warm up routing and metric label caches
+        await _call(app, path, requests + index)
+    started = timer.start()
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    return BenchmarkResult(
+        label=label,
+        path=path,
+        requests=requests,
+        seconds=started.elapsed(),
+        p50=harness.p50(),
+        p99=harness.p99(),
+    )
+
+
+async def run_benchmark(*, requests: int = 2_000, concurrency: int = 16) -> list[BenchmarkResult]:
+    results: list[BenchmarkResult] = []
+    apps = (
+        ("bare", build_bare_app()),
+        ("basehttp", build_reference_app()),
+        ("chain", build_chain_app()),
+    )
+    for label, app in apps:
+        for path in (STATUS_PATH, DOWNLOAD_PATH):
+            results.append(
+                await run_scenario(app, label=label, path=path, requests=requests, concurrency=concurrency)
+            )
+    return results
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ImportToSabt middleware chain benchmark")
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args(argv)
+    results = asyncio.run(run_benchmark(requests=args.requests, concurrency=args.concurrency))
+    for result in results:
+        print(json.dumps(result.as_dict(), ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual benchmark entry point
+    raise SystemExit(main())
+
+
+__all__ = [
+    "BenchmarkResult",
+    "build_bare_app",
+    "build_chain_app",
+    "build_reference_app",
+    "main",
+    "run_benchmark",
+    "run_scenario",
+]
@@ -144,7 +144,7 @@ class ImportToSabtWorkflow:
             if not rows:
                 raise ValueError("درخواست نامعتبر است؛ فرمت فایل/محدوده را بررسی کنید.")
             prepare_start = perf_counter()
-            normalized_rows = [self._xlsx_writer.prepare_row(row) for row in rows]
+            normalized_rows = self._xlsx_writer.prepare_rows(rows)
             prepare_duration = perf_counter() - prepare_start
             self.metrics.export_duration_seconds.labels(phase="prepare", format=normalized_format).observe(prepare_duration)
             row_counts_cache: dict[str, dict[str, int]] = {}
@@ -8,6 +8,7 @@ from openpyxl import Workbook
 from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import numbers
 
+from sma.export.xlsx_stream import NativeXLSXWriter, validate_backend
 from sma.phase6_import_to_sabt.sanitization import sanitize_phone
 from sma.phase6_import_to_sabt.xlsx.constants import DEFAULT_CHUNK_SIZE, SENSITIVE_COLUMNS, SHEET_TEMPLATE
 from sma.phase6_import_to_sabt.xlsx.metrics import ImportExportMetrics
@@ -17,7 +18,8 @@ from sma.phase6_import_to_sabt.xlsx.sanitize import (
     normalize_text,
     safe_cell,
 )
-from sma.phase6_import_to_sabt.xlsx.utils import cleanup_partials, iter_chunks, sha256_file
+from sma.phase6_import_to_sabt.xlsx.utils import cleanup_partials, iter_chunks
+from sma.utils.hashing_io import HashingWriter
 from sma.utils.atomic_io import atomic_output_path
 
 EXPORT_COLUMNS: Sequence[str] = (
@@ -39,6 +41,55 @@ EXPORT_COLUMNS: Sequence[str] = (
     "year_code",
 )
 
+_PREPARE_BATCH_SIZE = 1024
+
+_SENSITIVE_INDEXES = frozenset(
+    index for index, column in enumerate(EXPORT_COLUMNS) if column in SENSITIVE_COLUMNS
+)
+
+
+def _normalized_text(value: Any) -> str:
+    text = "" if value is None else str(value)
+    # ASCII letters/digits are already NFC with nothing to strip or collapse.
+    if text.isascii() and text.isalnum():
+        return text
+    return normalize_text(text)
+
+
+def _pad_school_code(normalized: str) -> str:
+    if not normalized:
+        return normalized
+    try:
+        return f"{int(normalized):06d}"
+    except (TypeError, ValueError):
+        return normalize_digits_ascii(normalized)
+
+
+def _compile_column(column: str) -> Callable[[Any], str]:
+    """Return the normalisation pipeline for ``column`` as a single callable."""
+
+    school_code = column == "school_code"
+    if column in SENSITIVE_COLUMNS:
+        phone = column == "mobile"
+
+        def sensitive(value: Any) -> str:
+            text = _normalized_text(value)
+            if school_code:
+                text = _pad_school_code(text)
+            if not text.isascii():
+                text = normalize_digits_ascii(text)
+            return sanitize_phone(text) if phone else text
+
+        return sensitive
+
+    def visible(value: Any) -> str:
+        text = _normalized_text(value)
+        if school_code:
+            text = _pad_school_code(text)
+        return safe_cell(normalize_digits_fa(text))
+
+    return visible
+
 
 @dataclass(slots=True)
 class ExportArtifact:
@@ -51,10 +102,20 @@ class ExportArtifact:
 
 
 class XLSXStreamWriter:
-    def __init__(self, *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Stream export rows into ``Sheet_###`` chunks of a single workbook.
+
+    ``backend="native"`` writes the sheet XML directly through
+    :class:`NativeXLSXWriter`; ``backend="openpyxl"`` is the fallback.
+    Rows are prepared in batches by a per-column plan compiled once per
+    writer (see :func:`_compile_column`).
+    """
+
+    def __init__(self, *, chunk_size: int = DEFAULT_CHUNK_SIZE, backend: str = "native") -> None:
         if chunk_size <= 0:
             raise ValueError("chunk_size must be positive")
         self._chunk_size = chunk_size
+        self._backend = validate_backend(backend)
+        self._plan = tuple((column, _compile_column(column)) for column in EXPORT_COLUMNS)
 
     def write(
         self,
@@ -67,28 +128,62 @@ class XLSXStreamWriter:
         sleeper: Callable[[float], None] | None = None,
     ) -> ExportArtifact:
         cleanup_partials(output_path.parent)
-        workbook = Workbook(write_only=True)
-        default_sheet = workbook.active
-        if default_sheet is not None:
-            workbook.remove(default_sheet)
-        row_counts: dict[str, int] = {}
         excel_safety = {
             "normalized": True,
             "digit_folded": True,
             "formula_guard": True,
             "sensitive_text": list(SENSITIVE_COLUMNS),
+            "backend": self._backend,
         }
         iterator: Iterator[Mapping[str, Any]] = iter(rows)
+        with atomic_output_path(output_path) as temp_path:
+            with open(temp_path, "wb") as handle:
+                sink = HashingWriter(handle)
+                if self._backend == "native":
+                    row_counts = self._write_native(iterator, sink)
+                else:
+                    row_counts = self._write_openpyxl(iterator, sink)
+        sha256 = sink.hexdigest()
+        byte_size = sink.bytes_written
+        return ExportArtifact(
+            path=output_path,
+            sha256=sha256,
+            byte_size=byte_size,
+            row_counts=row_counts,
+            format="xlsx",
+            excel_safety=excel_safety,
+        )
+
+    def _write_native(self, rows: Iterator[Mapping[str, Any]], sink: HashingWriter) -> dict[str, int]:
+        row_counts: dict[str, int] = {}
+        with NativeXLSXWriter(sink, rtl=False) as workbook:
+            for index, chunk in enumerate(iter_chunks(rows, self._chunk_size), start=1):
+                title = SHEET_TEMPLATE.format(index)
+                row_counts[title] = workbook.write_sheet(
+                    title,
+                    EXPORT_COLUMNS,
+                    self._iter_values(chunk),
+                    text_columns=_SENSITIVE_INDEXES,
+                )
+            if not row_counts:
+                title = SHEET_TEMPLATE.format(1)
+                row_counts[title] = workbook.write_sheet(title, EXPORT_COLUMNS, ())
+        return row_counts
+
+    def _write_openpyxl(self, rows: Iterator[Mapping[str, Any]], sink: HashingWriter) -> dict[str, int]:
+        workbook = Workbook(write_only=True)
+        default_sheet = workbook.active
+        if default_sheet is not None:
+            workbook.remove(default_sheet)
+        row_counts: dict[str, int] = {}
         wrote_any = False
-        for index, chunk in enumerate(iter_chunks(iterator, self._chunk_size), start=1):
+        for index, chunk in enumerate(iter_chunks(rows, self._chunk_size), start=1):
             sheet = workbook.create_sheet(title=SHEET_TEMPLATE.format(index))
             sheet.append(list(EXPORT_COLUMNS))
             count = 0
-            for raw in chunk:
-                prepared = self.prepare_row(raw)
+            for values in self._iter_values(chunk):
                 cells: list[WriteOnlyCell] = []
-                for column in EXPORT_COLUMNS:
-                    value = prepared.get(column, "")
+                for column, value in zip(EXPORT_COLUMNS, values):
                     cell = WriteOnlyCell(sheet, value=value)
                     if column in SENSITIVE_COLUMNS:
                         cell.number_format = numbers.FORMAT_TEXT
@@ -104,40 +199,27 @@ class XLSXStreamWriter:
             sheet = workbook.create_sheet(title=SHEET_TEMPLATE.format(1))
             sheet.append(list(EXPORT_COLUMNS))
             row_counts[sheet.title] = 0
-        with atomic_output_path(output_path) as temp_path:
-            workbook.save(temp_path)
-        sha256 = sha256_file(output_path)
-        byte_size = output_path.stat().st_size
-        return ExportArtifact(
-            path=output_path,
-            sha256=sha256,
-            byte_size=byte_size,
-            row_counts=row_counts,
-            format="xlsx",
-            excel_safety=excel_safety,
-        )
+        workbook.save(sink)
+        return row_counts
 
     def prepare_row(self, raw: Mapping[str, Any]) -> dict[str, str]:
-        prepared: dict[str, str] = {}
-        for column in EXPORT_COLUMNS:
-            raw_value = raw.get(column, "")
-            raw_text = "" if raw_value is None else str(raw_value)
-            normalized = normalize_text(raw_text)
-            if column == "school_code" and normalized:
-                try:
-                    normalized = f"{int(normalized):06d}"
-                except (TypeError, ValueError):
-                    normalized = normalize_digits_ascii(normalized)
-            if column in SENSITIVE_COLUMNS:
-                ascii_value = normalize_digits_ascii(normalized)
-                if column == "mobile":
-                    ascii_value = sanitize_phone(ascii_value)
-                prepared[column] = ascii_value
-            else:
-                visible = normalize_digits_fa(normalized)
-                guarded = safe_cell(visible)
-                prepared[column] = guarded
-        return prepared
+        return {column: transform(raw.get(column, "")) for column, transform in self._plan}
+
+    def prepare_rows(self, rows: Sequence[Mapping[str, Any]]) -> list[dict[str, str]]:
+        """Prepare a batch of rows column by column with the compiled plan."""
+
+        return [dict(zip(EXPORT_COLUMNS, values)) for values in self._prepare_values(rows)]
+
+    def _prepare_values(self, rows: Sequence[Mapping[str, Any]]) -> list[tuple[str, ...]]:
+        columns = [
+            list(map(transform, [raw.get(column, "") for raw in rows]))
+            for column, transform in self._plan
+        ]
+        return list(zip(*columns))
+
+    def _iter_values(self, rows: Iterable[Mapping[str, Any]]) -> Iterator[tuple[str, ...]]:
+        for batch in iter_chunks(rows, _PREPARE_BATCH_SIZE):
+            yield from self._prepare_values(batch)
 
     def _sort_key(self, row: Mapping[str, Any]) -> tuple[str, str, str, str, str]:
         raise NotImplementedError("Sorting is delegated to the database layer.")
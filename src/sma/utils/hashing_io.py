@@ -0,0 +1,68 @@
+"""Write-through SHA-256 hashing for streamed artifacts."""
+from __future__ import annotations
+
+import hashlib
+import io
+from typing import BinaryIO, TextIO
+
+_BUFFER_SIZE = 1024 * 1024
+
+
+class HashingWriter(io.RawIOBase):
+    """Binary sink that forwards writes to ``raw`` while hashing them.
+
+    The writer is append-only: ``tell`` reports the bytes written so far and
+    seeking is unsupported, which makes ``zipfile`` stream entries with data
+    descriptors instead of rewinding (a rewind would invalidate the digest).
+    Closing the writer leaves ``raw`` open for the caller to fsync/close.
+    """
+
+    def __init__(self, raw: BinaryIO) -> None:
+        super().__init__()
+        self._raw = raw
+        self._digest = hashlib.sha256()
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        view = memoryview(data).cast("B")
+        self._digest.update(view)
+        self._raw.write(view)
+        self._size += len(view)
+        return len(view)
+
+    def tell(self) -> int:
+        return self._size
+
+    def flush(self) -> None:
+        if not self.closed and not self._raw.closed:
+            self._raw.flush()
+
+    def fileno(self) -> int:
+        return self._raw.fileno()
+
+    @property
+    def bytes_written(self) -> int:
+        return self._size
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+def hashing_text_writer(
+    raw: BinaryIO,
+    *,
+    encoding: str = "utf-8",
+    newline: str | None = None,
+    buffer_size: int = _BUFFER_SIZE,
+) -> tuple[TextIO, HashingWriter]:
+    """Wrap ``raw`` in a buffered text stream whose bytes are hashed on write."""
+
+    sink = HashingWriter(raw)
+    handle = io.TextIOWrapper(io.BufferedWriter(sink, buffer_size), encoding=encoding, newline=newline)
+    return handle, sink
+
+
+__all__ = ["HashingWriter", "hashing_text_writer"]
@@ -0,0 +1,83 @@
+import copy
+
+import pytest
+
+from sma.domain.allocation.engine import AllocationEngine
+from sma.domain.allocation.fairness import FairnessConfig, FairnessStrategy
+from sma.domain.allocation.reasons import ReasonCode
+from sma.domain.mentor.entities import Mentor
+from sma.domain.shared.types import EduStatus, Gender, RegCenter, RegStatus, StudentType
+from sma.domain.student.entities import Student
+
+
+def _student(index: int, *, group_code: int, gender: Gender = Gender.male) -> Student:
+    return Student(
+        national_id=f"{index:010d}",
+        gender=gender,
+        edu_status=EduStatus.student,
+        reg_center=RegCenter.center0,
+        reg_status=RegStatus.status1,
+        group_code=group_code,
+        student_type=StudentType.normal,
+        counter="250000000",
+    )
+
+
+def _roster() -> list[Mentor]:
+    mentors = []
+    for mid in range(1, 13):
+        mentors.append(
+            Mentor(
+                mentor_id=mid,
+                name=None,
+                gender=Gender.male if mid % 4 else Gender.female,
+                type="عادی",
+                capacity=2 + mid % 5,
+                current_load=mid % 3,
+                allowed_groups={5, 7} if mid % 2 else {5},
+                allowed_centers={0},
+            )
+        )
+    return mentors
+
+
+def _cohort() -> list[Student]:
+    students = []
+    for index in range(40):
+        group_code = 7 if index % 3 == 0 else 5
+        gender = Gender.female if index % 7 == 0 else Gender.male
+        students.append(_student(index, group_code=group_code, gender=gender))
+    return students
+
+
+def _sequential(engine: AllocationEngine, mentors: list[Mentor]) -> list:
+    results = []
+    by_id = {mentor.mentor_id: mentor for mentor in mentors}
+    for student in _cohort():
+        result = engine.select_best(student, mentors)
+        if result.mentor_id is not None:
+            by_id[result.mentor_id].current_load += 1
+        results.append(result)
+    return results
+
+
+@pytest.mark.parametrize("strategy", list(FairnessStrategy))
+def test_cohort_matches_sequential_selection(strategy: FairnessStrategy) -> None:
+    expected_mentors = _roster()
+    cohort_mentors = copy.deepcopy(expected_mentors)
+    fairness = FairnessConfig(strategy=strategy, bucket_size=0.25)
+    expected = _sequential(AllocationEngine(fairness=fairness), expected_mentors)
+    actual = AllocationEngine(fairness=fairness).allocate_cohort(_cohort(), cohort_mentors)
+    assert actual == expected
+    assert [m.current_load for m in cohort_mentors] == [m.current_load for m in expected_mentors]
+
+
+def test_cohort_exhausts_capacity_with_reason() -> None:
+    mentors = [
+        Mentor(mentor_id=1, name=None, gender=Gender.male, type="عادی", capacity=2, allowed_groups={5}, allowed_centers={0})
+    ]
+    results = AllocationEngine().allocate_cohort([_student(i, group_code=5) for i in range(4)], mentors)
+    assert [r.mentor_id for r in results] == [1, 1, None, None]
+    assert results[-1].reason is not None
+    assert results[-1].reason.code == ReasonCode.NO_ELIGIBLE_MENTOR
+    assert mentors[0].current_load == 2
@@ -0,0 +1,66 @@
+import copy
+
+import pytest
+
+from sma.domain.allocation.engine import AllocationEngine
+from sma.domain.allocation.fairness import FairnessConfig, FairnessStrategy
+from sma.domain.allocation.sharding import ShardedCohortAllocator, plan_shards
+from sma.domain.mentor.entities import Mentor
+from sma.domain.shared.types import EduStatus, Gender, RegCenter, RegStatus, StudentType
+from sma.domain.student.entities import Student
+
+
+def _student(index: int) -> Student:
+    return Student(
+        national_id=f"{index:010d}",
+        gender=Gender(index % 2),
+        edu_status=EduStatus.student,
+        reg_center=RegCenter(index % 3),
+        reg_status=RegStatus.status1,
+        group_code=5,
+        student_type=StudentType.normal,
+        counter="250000000",
+    )
+
+
+def _mentor(mid: int, gender: Gender, centers: set[int], capacity: int) -> Mentor:
+    return Mentor(
+        mentor_id=mid,
+        name=None,
+        gender=gender,
+        type="عادی",
+        capacity=capacity,
+        allowed_groups={5},
+        allowed_centers=centers,
+    )
+
+
+def _roster() -> list[Mentor]:
+    return [
+        _mentor(1, Gender.male, {0}, 3),
+        _mentor(2, Gender.male, {0, 1}, 4),
+        _mentor(3, Gender.male, {2}, 2),
+        _mentor(4, Gender.female, {0}, 5),
+        _mentor(5, Gender.female, {1}, 2),
+        _mentor(6, Gender.female, {1}, 3),
+    ]
+
+
+def test_plan_shards_joins_centers_shared_by_a_mentor() -> None:
+    shards = plan_shards([_student(i) for i in range(6)], _roster())
+    assert [shard.keys for shard in shards] == [((0, 0), (0, 1)), ((0, 2),), ((1, 0),), ((1, 1),), ((1, 2),)]
+    assert [m.mentor_id for m in shards[0].mentors] == [1, 2]
+    assert shards[-1].mentors == []
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("strategy", list(FairnessStrategy))
+def test_sharded_matches_single_process(workers: int, strategy: FairnessStrategy) -> None:
+    cohort = [_student(i) for i in range(30)]
+    expected_roster = _roster()
+    roster = copy.deepcopy(expected_roster)
+    fairness = FairnessConfig(strategy=strategy)
+    expected = AllocationEngine(fairness=fairness).allocate_cohort(cohort, expected_roster)
+    actual = ShardedCohortAllocator(fairness=fairness, max_workers=workers).allocate(cohort, roster)
+    assert actual == expected
+    assert [m.current_load for m in roster] == [m.current_load for m in expected_roster]
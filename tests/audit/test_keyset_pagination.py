@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import httpx
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from sma.audit.api import Principal, create_audit_api, get_principal
+from sma.audit.enums import AuditAction, AuditActorRole, AuditOutcome
+from sma.audit.partitioning import ensure_monthly_partition_indexes
+from sma.audit.repository import AuditCursor, AuditEventCreate, AuditQuery, AuditRepository
+from sma.audit.service import AuditService, build_metrics
+from sma.reliability.clock import Clock
+
+_TZ = ZoneInfo("Asia/Tehran")
+_BASE = datetime(2024, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def _payload(index: int) -> AuditEventCreate:
+    return AuditEventCreate(
+        # Pairs of events share a timestamp so the id tie-breaker matters.
+        ts=_BASE + timedelta(minutes=index // 2),
+        actor_role=AuditActorRole.ADMIN,
+        center_scope="10" if index % 3 else "20",
+        action=AuditAction.AUTHN_OK,
+        resource_type="auth",
+        resource_id=f"/audit/{index}",
+        job_id=None,
+        request_id=f"{index:032x}",
+        outcome=AuditOutcome.OK,
+        error_code=None,
+        artifact_sha256=None,
+    )
+
+
+def _setup():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    repository = AuditRepository(engine)
+
+    async def _seed() -> None:
+        await repository.init()
+        await repository.insert_many([_payload(index) for index in range(11)], rid="seed")
+
+    asyncio.run(_seed())
+    clock = Clock(timezone=_TZ, _now_factory=lambda: _BASE)
+    service = AuditService(repository=repository, clock=clock, metrics=build_metrics())
+    return engine, repository, service
+
+
+def test_cursor_pages_match_offset_pages() -> None:
+    engine, repository, _ = _setup()
+
+    async def _run() -> tuple[list[int], list[int]]:
+        by_offset = [event.id for event in await repository.fetch_many(AuditQuery(limit=None))]
+        by_cursor: list[int] = []
+        after = None
+        while True:
+            page = await repository.fetch_many(AuditQuery(limit=4, after=after))
+            by_cursor.extend(event.id for event in page)
+            if len(page) < 4:
+                return by_offset, by_cursor
+            after = AuditCursor.decode(AuditCursor(ts=page[-1].ts, id=page[-1].id).encode())
+
+    by_offset, by_cursor = asyncio.run(_run())
+    assert by_cursor == by_offset
+    assert len(by_cursor) == 11
+    engine.dispose()
+
+
+def test_audit_api_returns_next_cursor() -> None:
+    engine, _, service = _setup()
+    app = create_audit_api(service=service, exporter=object(), secret_key="secret")
+    app.dependency_overrides[get_principal] = lambda: Principal(role=AuditActorRole.ADMIN, center_scope=None)
+
+    async def _run() -> tuple[list[str], int]:
+        transport = httpx.ASGITransport(app=app)
+        resources: list[str] = []
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            params = {"center": "10", "page_size": "3"}
+            while True:
+                body = (await client.get("/audit", params=params)).json()
+                resources.extend(item["resource_id"] for item in body["items"])
+                if body["next_cursor"] is None:
+                    break
+                params["cursor"] = body["next_cursor"]
+            invalid = await client.get("/audit", params={"cursor": "not-a-cursor"})
+        return resources, invalid.status_code
+
+    resources, invalid_status = asyncio.run(_run())
+    expected = [f"/audit/{index}" for index in reversed(range(11)) if index % 3]
+    assert resources == expected
+    assert invalid_status == 400
+    engine.dispose()
+
+
+def test_monthly_indexes_cover_filter_columns() -> None:
+    engine, _, _ = _setup()
+    created = ensure_monthly_partition_indexes(
+        engine,
+        start=datetime(2024, 3, 1, tzinfo=_TZ),
+        end=datetime(2024, 4, 1, tzinfo=_TZ),
+    )
+    assert created == [
+        "ix_audit_events_month_2024_03",
+        "ix_audit_events_month_2024_03_center_scope",
+        "ix_audit_events_month_2024_03_action",
+        "ix_audit_events_month_2024_03_outcome",
+    ]
+    with engine.connect() as conn:
+        columns = [
+            row[2]
+            for row in conn.execute(text("PRAGMA index_info('ix_audit_events_month_2024_03_outcome')"))
+        ]
+    assert columns == ["outcome", "ts", "id"]
+    engine.dispose()
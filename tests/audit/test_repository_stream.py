@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine.result import ScalarResult
+from sqlalchemy.pool import StaticPool
+
+from sma.audit.enums import AuditAction, AuditActorRole, AuditOutcome
+from sma.audit.repository import AuditEventCreate, AuditQuery, AuditRepository
+
+
+def _repository(**kwargs) -> tuple[AuditRepository, object]:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    repository = AuditRepository(engine, **kwargs)
+    base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    payloads = [
+        AuditEventCreate(
+            ts=base + timedelta(minutes=index),
+            actor_role=AuditActorRole.ADMIN,
+            center_scope="10" if index % 2 else "20",
+            action=AuditAction.EXPORT_STARTED,
+            resource_type="report",
+            resource_id=f"item-{index}",
+            job_id=None,
+            request_id=f"{index:032x}",
+            outcome=AuditOutcome.OK,
+            error_code=None,
+            artifact_sha256=None,
+        )
+        for index in range(20)
+    ]
+
+    async def _seed() -> None:
+        await repository.init()
+        await repository.insert_many(list(reversed(payloads)), rid="seed")
+
+    asyncio.run(_seed())
+    return repository, engine
+
+
+async def _collect(repository: AuditRepository, query: AuditQuery) -> list[str]:
+    return [event.resource_id async for event in repository.stream(query)]
+
+
+def test_stream_yields_filtered_rows_in_ts_order() -> None:
+    repository, engine = _repository(stream_batch_size=3, stream_queue_size=1)
+    everything = asyncio.run(_collect(repository, AuditQuery()))
+    assert everything == [f"item-{index}" for index in range(20)]
+    scoped = asyncio.run(_collect(repository, AuditQuery(center_scope="10")))
+    assert scoped == [f"item-{index}" for index in range(1, 20, 2)]
+    engine.dispose()
+
+
+def test_stream_reads_ahead_only_up_to_the_queue_bound(monkeypatch) -> None:
+    repository, engine = _repository(stream_batch_size=2, stream_queue_size=1)
+    fetched: list[int] = []
+    original = ScalarResult.partitions
+
+    def counting_partitions(self, size=None):
+        for partition in original(self, size):
+            fetched.append(len(partition))
+            yield partition
+
+    monkeypatch.setattr(ScalarResult, "partitions", counting_partitions)
+
+    async def _run() -> list[str]:
+        seen: list[str] = []
+        async for event in repository.stream(AuditQuery()):
+            seen.append(event.resource_id)
+            if len(seen) == 1:
+                await asyncio.sleep(0.3)
+                # one batch being consumed, one queued, one waiting to be handed over
+                assert len(fetched) <= 3
+            if len(seen) == 5:
+                break
+        return seen
+
+    threads_before = threading.active_count()
+    assert asyncio.run(_run()) == [f"item-{index}" for index in range(5)]
+    assert len(fetched) < 10
+    assert threading.active_count() <= threads_before
+    engine.dispose()
+
+
+def test_stream_propagates_reader_errors(monkeypatch) -> None:
+    repository, engine = _repository()
+
+    def broken_partitions(self, size=None):
+        raise RuntimeError("replica unavailable")
+        yield  # pragma: no cover
+
+    monkeypatch.setattr(ScalarResult, "partitions", broken_partitions)
+    with pytest.raises(RuntimeError, match="replica unavailable"):
+        asyncio.run(_collect(repository, AuditQuery()))
+    engine.dispose()
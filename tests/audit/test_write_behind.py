@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.pool import StaticPool
+
+from sma.audit.api import create_audit_api
+from sma.audit.enums import AuditAction, AuditActorRole, AuditOutcome
+from sma.audit.models import AuditEvent
+from sma.audit.repository import AuditRepository
+from sma.audit.service import AuditService, build_metrics
+from sma.audit.writer import AuditWriteBehindConfig
+from sma.reliability.clock import Clock
+
+
+def _service(config: AuditWriteBehindConfig):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    repository = AuditRepository(engine)
+    asyncio.run(repository.init())
+    clock = Clock(timezone=ZoneInfo("Asia/Tehran"), _now_factory=lambda: datetime(2024, 1, 1, tzinfo=timezone.utc))
+    metrics = build_metrics()
+    service = AuditService(repository=repository, clock=clock, metrics=metrics, write_behind=config)
+    return service, repository, engine, metrics
+
+
+async def _submit(service: AuditService, index: int) -> None:
+    await service.submit_event(
+        actor_role=AuditActorRole.ADMIN,
+        center_scope="10",
+        action=AuditAction.AUTHN_OK,
+        resource_type="auth",
+        resource_id=f"/audit/{index}",
+        request_id=f"{index:032x}",
+        outcome=AuditOutcome.OK,
+    )
+
+
+def _row_count(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(AuditEvent)).scalar_one()
+
+
+def _events_total(metrics) -> float:
+    return metrics.events_total.labels(action="AUTHN_OK", outcome="OK")._value.get()
+
+
+def test_events_are_flushed_in_batches_and_drained_on_close(monkeypatch) -> None:
+    service, repository, engine, metrics = _service(AuditWriteBehindConfig(batch_size=3, flush_interval=0.01))
+    batches: list[int] = []
+    original = repository.insert_many
+
+    async def recording_insert_many(payloads, *, rid):
+        batches.append(len(payloads))
+        return await original(payloads, rid=rid)
+
+    monkeypatch.setattr(repository, "insert_many", recording_insert_many)
+
+    async def _run() -> None:
+        for index in range(7):
+            await _submit(service, index)
+        assert _row_count(engine) == 0
+        await service.aclose()
+
+    asyncio.run(_run())
+    assert batches == [3, 3, 1]
+    assert _row_count(engine) == 7
+    assert _events_total(metrics) == 7
+    engine.dispose()
+
+
+def test_full_buffer_applies_backpressure(monkeypatch) -> None:
+    service, repository, engine, _ = _service(AuditWriteBehindConfig(batch_size=1, flush_interval=0, max_pending=1))
+    original = repository.insert_many
+
+    async def _run() -> None:
+        gate = asyncio.Event()
+
+        async def gated_insert_many(payloads, *, rid):
+            await gate.wait()
+            return await original(payloads, rid=rid)
+
+        monkeypatch.setattr(repository, "insert_many", gated_insert_many)
+        await _submit(service, 1)
+        await asyncio.sleep(0.01)  # the writer picks up the first event and blocks
+        await _submit(service, 2)
+        blocked = asyncio.create_task(_submit(service, 3))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        gate.set()
+        await blocked
+        await service.aclose()
+
+    asyncio.run(_run())
+    assert _row_count(engine) == 3
+    engine.dispose()
+
+
+def test_exhausted_batch_is_reported(monkeypatch) -> None:
+    service, repository, engine, metrics = _service(AuditWriteBehindConfig(batch_size=10))
+
+    async def failing_insert_many(payloads, *, rid):
+        raise OperationalError("INSERT", {}, RuntimeError("db down"))
+
+    async def failing_insert(payload, *, rid):
+        raise OperationalError("INSERT", {}, RuntimeError("db down"))
+
+    monkeypatch.setattr(repository, "insert_many", failing_insert_many)
+    monkeypatch.setattr(repository, "insert", failing_insert)
+
+    async def _run() -> None:
+        await _submit(service, 1)
+        await _submit(service, 2)
+        await service.aclose()
+
+    asyncio.run(_run())
+    assert metrics.retry_exhausted_total.labels(stage="write")._value.get() == 2
+    assert _events_total(metrics) == 0
+    engine.dispose()
+
+
+def test_poisoned_row_only_drops_itself(monkeypatch) -> None:
+    service, repository, engine, metrics = _service(AuditWriteBehindConfig(batch_size=10))
+    insert_many, insert = repository.insert_many, repository.insert
+
+    def _poisoned(payload) -> bool:
+        return payload.resource_id == "/audit/2"
+
+    async def poisoned_insert_many(payloads, *, rid):
+        if any(_poisoned(payload) for payload in payloads):
+            raise IntegrityError("INSERT", {}, RuntimeError("constraint failed"))
+        return await insert_many(payloads, rid=rid)
+
+    async def poisoned_insert(payload, *, rid):
+        if _poisoned(payload):
+            raise IntegrityError("INSERT", {}, RuntimeError("constraint failed"))
+        return await insert(payload, rid=rid)
+
+    monkeypatch.setattr(repository, "insert_many", poisoned_insert_many)
+    monkeypatch.setattr(repository, "insert", poisoned_insert)
+
+    async def _run() -> None:
+        for index in range(5):
+            await _submit(service, index)
+        await service.aclose()
+
+    asyncio.run(_run())
+    assert _row_count(engine) == 4
+    assert _events_total(metrics) == 4
+    assert metrics.retry_exhausted_total.labels(stage="write")._value.get() == 1
+    engine.dispose()
+
+
+def test_writer_resumes_on_the_same_queue_after_its_task_dies(monkeypatch) -> None:
+    service, repository, engine, _ = _service(AuditWriteBehindConfig(batch_size=1, flush_interval=0))
+    original = repository.insert_many
+
+    async def _run() -> None:
+        gate = asyncio.Event()
+
+        async def gated_insert_many(payloads, *, rid):
+            await gate.wait()
+            return await original(payloads, rid=rid)
+
+        monkeypatch.setattr(repository, "insert_many", gated_insert_many)
+        for index in range(3):
+            await _submit(service, index)
+        await asyncio.sleep(0.01)  # the writer blocks on the first event
+        service._writer._task.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        await _submit(service, 3)
+        await service.aclose()
+
+    asyncio.run(_run())
+    # Only the batch in flight when the task died is lost.
+    assert _row_count(engine) == 3
+    engine.dispose()
+
+
+def test_create_audit_api_enables_write_behind_for_auth_events(monkeypatch) -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    repository = AuditRepository(engine)
+    asyncio.run(repository.init())
+    clock = Clock(timezone=ZoneInfo("Asia/Tehran"), _now_factory=lambda: datetime(2024, 1, 1, tzinfo=timezone.utc))
+    service = AuditService(repository=repository, clock=clock, metrics=build_metrics())
+    app = create_audit_api(
+        service=service,
+        exporter=object(),
+        write_behind=AuditWriteBehindConfig(batch_size=10, flush_interval=60),
+    )
+    inserts: list[int] = []
+    original = repository.insert
+
+    async def recording_insert(payload, *, rid):
+        inserts.append(1)
+        return await original(payload, rid=rid)
+
+    monkeypatch.setattr(repository, "insert", recording_insert)
+
+    async def _run() -> None:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            for index in range(3):
+                response = await client.get("/audit", headers={"X-Role": "ADMIN", "X-RateLimit-Key": f"k{index}"})
+                assert response.status_code == 200
+        assert _row_count(engine) == 0
+        await service.aclose()
+
+    asyncio.run(_run())
+    assert inserts == []
+    assert _row_count(engine) == 3
+    engine.dispose()
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 from collections.abc import Iterator
+from dataclasses import replace
 from pathlib import Path
 from uuid import uuid4
 
 import pytest
+from openpyxl import load_workbook
 
+from sma.export.xlsx_stream import NativeXLSXWriter
 from sma.phase6_import_to_sabt.export_writer import ExportWriter
+from sma.phase6_import_to_sabt.models import ExportFilters
+from tests.export.helpers import build_exporter, make_row
 
 
 @pytest.fixture
@@ -49,3 +54,102 @@ def test_excel_safety_false_when_no_sensitive_columns(clean_export_state: Path)
     safety = result.excel_safety
     assert safety["always_quote"] is False, safety
     assert safety["always_quote_columns"] == [], safety
+
+
+def test_streamed_digest_matches_written_files(clean_export_state: Path) -> None:
+    import hashlib
+
+    from openpyxl import load_workbook
+
+    tmp_path = clean_export_state
+    writer = ExportWriter(sensitive_columns=("national_id",), include_bom=True, chunk_size=2)
+    rows = [{"national_id": f"00{index}", "first_name": "نام"} for index in range(5)]
+    csv_result = writer.write_csv(rows, path_factory=_path_factory(tmp_path))
+    xlsx_result = writer.write_xlsx(rows, path_factory=lambda index: tmp_path / f"export-{index}.xlsx")
+    for exported in [*csv_result.files, *xlsx_result.files]:
+        data = exported.path.read_bytes()
+        assert exported.sha256 == hashlib.sha256(data).hexdigest()
+        assert exported.byte_size == len(data)
+    assert [item.row_count for item in csv_result.files] == [2, 2, 1]
+    workbook = load_workbook(xlsx_result.files[0].path)
+    assert sum(sheet.max_row - 1 for sheet in workbook.worksheets) == 5
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_pooled_csv_chunks_match_sequential(clean_export_state: Path) -> None:
+    tmp_path = clean_export_state
+    rows = [{"national_id": f"{index:010d}", "first_name": f"نام{index}"} for index in range(23)]
+    outputs = []
+    for workers in (1, 3):
+        writer = ExportWriter(sensitive_columns=("national_id",), chunk_size=5, write_workers=workers)
+        result = writer.write_csv(
+            iter(rows), path_factory=lambda index, w=workers: tmp_path / f"w{w}-{index:03d}.csv"
+        )
+        assert result.total_rows == len(rows)
+        outputs.append(result)
+    sequential, pooled = outputs
+    assert [item.name[3:] for item in pooled.files] == [item.name[3:] for item in sequential.files]
+    assert [(item.sha256, item.row_count, item.byte_size) for item in pooled.files] == [
+        (item.sha256, item.row_count, item.byte_size) for item in sequential.files
+    ]
+
+
+def test_pooled_csv_propagates_chunk_failures(clean_export_state: Path) -> None:
+    tmp_path = clean_export_state
+    writer = ExportWriter(chunk_size=2, write_workers=2)
+    missing = tmp_path / "missing-dir-file"
+    missing.write_text("not a directory", encoding="utf-8")
+
+    def _factory(index: int) -> Path:
+        return (missing / "nested.csv") if index == 2 else tmp_path / f"ok-{index}.csv"
+
+    with pytest.raises(OSError):
+        writer.write_csv([{"national_id": str(index)} for index in range(6)], path_factory=_factory)
+
+
+def test_native_xlsx_keeps_rtl_text_formats_and_sheets(clean_export_state: Path) -> None:
+    tmp_path = clean_export_state
+    writer = ExportWriter(sensitive_columns=("national_id",), chunk_size=2)
+    rows = [{"national_id": f"00{index}", "first_name": "=cmd"} for index in range(3)]
+    result = writer.write_xlsx(rows, path_factory=lambda index: tmp_path / f"native-{index}.xlsx")
+    assert result.excel_safety["backend"] == "native"
+    assert result.files[0].sheets == (("Sheet_001", 2), ("Sheet_002", 1))
+    workbook = load_workbook(result.files[0].path)
+    try:
+        sheet = workbook["Sheet_001"]
+        assert sheet.sheet_view.rightToLeft is True
+        assert sheet["A2"].value == "000"
+        assert sheet["A2"].number_format == "@"
+        assert sheet["C2"].value == "'=cmd"
+        assert sheet["C2"].number_format == "General"
+    finally:
+        workbook.close()
+    with pytest.raises(ValueError):
+        ExportWriter(xlsx_backend="xlsxwriter")
+
+
+def test_native_writer_inlines_strings_beyond_shared_limit(clean_export_state: Path) -> None:
+    path = clean_export_state / "inline.xlsx"
+    with path.open("wb") as handle, NativeXLSXWriter(handle, rtl=False, shared_strings_limit=2) as book:
+        count = book.write_sheet("Data", ("a", "b"), [(" x ", "<&>"), ("tab\x01", "a")])
+    assert count == 2
+    workbook = load_workbook(path)
+    try:
+        rows = [[cell.value for cell in row] for row in workbook["Data"].iter_rows()]
+    finally:
+        workbook.close()
+    assert rows == [["a", "b"], [" x ", "<&>"], ["tab", "a"]]
+
+
+def test_prenormalized_plan_matches_generic_preparation(clean_export_state: Path) -> None:
+    source = [make_row(idx=index, school_code=123456 if index % 2 else None) for index in range(1, 2_100)]
+    source[0] = replace(source[0], first_name="=HYPERLINK()", mentor_name="-۱۲ علي")
+    exporter = build_exporter(clean_export_state, source)
+    filters = ExportFilters(year=1402)
+    rows = [exporter._normalize_row(row, filters) for row in source]
+
+    generic = ExportWriter(sensitive_columns=("national_id", "mobile"))
+    fast = ExportWriter(sensitive_columns=("national_id", "mobile"), prenormalized=True)
+    expected = [generic._prepare_row(row) for row in rows]
+    assert [list(values) for values in fast._iter_prepared(rows)] == expected
+    assert expected[0][2].startswith("'=")
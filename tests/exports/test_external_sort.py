@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import pytest
 from prometheus_client import CollectorRegistry
 
 from sma.phase6_import_to_sabt.external_sorter import ExternalSorter, SortPlan
@@ -40,6 +41,7 @@ def test_spill_and_merge_stable_order(tmp_path) -> None:
         assert plan.total_rows == len(rows)
         assert plan.chunk_count >= 2
         materialized = list(sorter.iter_sorted(plan))
+        assert len(materialized) == len(rows)
         keys = [
             _sort_key(snapshot)
             for snapshot in materialized
@@ -68,3 +70,78 @@ def _sort_key(row: dict[str, str]) -> tuple[str, int, int, int, str]:
         to_int(row.get("school_code"), default=999_999),
         sanitize_text(str(row.get("national_id", ""))),
     )
+
+
+def test_binary_spill_roundtrip_without_resanitizing(tmp_path, monkeypatch) -> None:
+    from sma.phase6_import_to_sabt import external_sorter as module
+
+    sorter = ExternalSorter(
+        sort_keys=SORT_KEYS,
+        buffer_rows=4,
+        workspace_root=tmp_path / "sort",
+        correlation_id="corr-bin",
+        compress_spill=True,
+    )
+    rows: list[dict[str, str | None]] = [_build_row(idx) for idx in range(1, 12)]
+    rows[3]["note"] = "یادداشت"
+    rows[7]["first_name"] = ""
+    expected = sorted((sorter._normalize_row(row) for row in rows), key=_sort_key)  # noqa: SLF001
+    plan: SortPlan | None = None
+    try:
+        plan = sorter.prepare(rows, format_label="csv")
+        assert plan.chunk_count == 2
+        header = plan.chunk_paths[0].read_bytes()[:8]
+        assert header == b"SMASORT2"
+
+        def _fail(value: str) -> str:  # pragma: no cover - must not be called
+            raise AssertionError("merge must not sanitize again")
+
+        monkeypatch.setattr(module, "sanitize_text", _fail)
+        materialized = list(sorter.iter_sorted(plan))
+    finally:
+        sorter.cleanup(plan)
+    assert materialized == expected
+    assert sum("note" in row for row in materialized) == 1
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_pooled_spill_matches_inline_sort(tmp_path, processes: bool) -> None:
+    rows = [_build_row(idx) for idx in range(1, 40)] + [_build_row(idx, year=1401) for idx in range(1, 20)]
+    outputs = []
+    for workers in (0, 2):
+        sorter = ExternalSorter(
+            sort_keys=SORT_KEYS,
+            buffer_rows=7,
+            workspace_root=tmp_path / f"sort-{workers}",
+            correlation_id="corr-pool",
+            spill_workers=workers,
+            spill_processes=processes,
+        )
+        plan: SortPlan | None = None
+        try:
+            plan = sorter.prepare(iter(rows), format_label="csv")
+            assert plan.chunk_count == len(rows) // 7
+            assert all(path.exists() for path in plan.chunk_paths)
+            outputs.append(list(sorter.iter_sorted(plan)))
+        finally:
+            sorter.cleanup(plan)
+    assert len(outputs[0]) == len(rows)
+    assert outputs[1] == outputs[0]
+
+
+def test_binary_key_orders_like_component_tuple(tmp_path) -> None:
+    sorter = ExternalSorter(sort_keys=SORT_KEYS, workspace_root=tmp_path / "sort", correlation_id="corr-key")
+    rows = [
+        {"year_code": year, "reg_center": center, "group_code": group, "school_code": school, "national_id": nid}
+        for year in ("1402", "140", "14021")
+        for center in ("0", "2", "10")
+        for group in ("9", "10", "999999")
+        for school in ("", "5", "123456")
+        for nid in ("1", "01", "10", "")
+    ]
+    try:
+        by_key = sorted(rows, key=sorter._build_key)  # noqa: SLF001
+        assert by_key == sorted(rows, key=_sort_key)
+        assert isinstance(sorter._build_key(rows[0]), bytes)  # noqa: SLF001
+    finally:
+        sorter.cleanup(None)
@@ -14,7 +14,6 @@ from zoneinfo import ZoneInfo
 from sma.phase6_import_to_sabt.clock import FixedClock
 from sma.phase6_import_to_sabt.exporter_service import ImportToSabtExporter
 from sma.phase6_import_to_sabt.job_runner import ExportJobRunner, ExportJobStatus
-from sma.phase6_import_to_sabt.external_sorter import ExternalSorter, _HeapItem
 from sma.phase6_import_to_sabt.metrics import ExporterMetrics, reset_registry
 from sma.phase6_import_to_sabt.models import ExportFilters, ExportOptions, ExportSnapshot, ExporterDataSource, NormalizedStudentRow
 from sma.phase6_import_to_sabt.roster import InMemoryRoster
@@ -103,37 +102,6 @@ def _build_special_rows() -> dict[int, NormalizedStudentRow]:
     return {1: risky_one, 2: sparse_two, 3: fa_three}
 
 
-@pytest.mark.performance
-@pytest.mark.memory
-def _patch_iter_sorted(monkeypatch: pytest.MonkeyPatch) -> None:
-    def _merge(self: ExternalSorter, plan) -> Iterable[dict[str, str]]:  # type: ignore[override]
-        iterators = [self._chunk_iterator(path) for path in plan.chunk_paths]
-        if plan.in_memory:
-            iterators.append(self._memory_iterator(plan.in_memory))
-        if self._metrics:
-            self._metrics.observe_sort_merge(format_label=plan.format_label)
-        import heapq
-
-        heap: list[_HeapItem] = []
-        for index, iterator in enumerate(iterators):
-            try:
-                key, row = next(iterator)
-            except StopIteration:
-                continue
-            heap.append(_HeapItem(key=key, index=index, row=row, iterator=iterator))
-        heapq.heapify(heap)
-        while heap:
-            item = heapq.heappop(heap)
-            yield item.row
-            try:
-                next_key, next_row = next(item.iterator)
-            except StopIteration:
-                continue
-            heapq.heappush(heap, _HeapItem(key=next_key, index=item.index, row=next_row, iterator=item.iterator))
-
-    monkeypatch.setattr(ExternalSorter, "iter_sorted", _merge)
-
-
 @pytest.mark.performance
 @pytest.mark.memory
 def test_big_xlsx_streaming_memory_bounded(
@@ -141,7 +109,6 @@ def test_big_xlsx_streaming_memory_bounded(
 ) -> None:
     """AGENTS.md::Performance budgets & Excel/Atomic I/O: prove 100k+ XLSX stream stays under spill guard."""
 
-    _patch_iter_sorted(monkeypatch)
     cleanup_fixtures.flush_state()
     total_rows = 120_000
     chunk_size = 40_000
@@ -228,7 +195,6 @@ def test_big_csv_crlf_bom_streaming_memory_bounded(
 ) -> None:
     """AGENTS.md::Performance budgets & Excel/Atomic I/O: prove 100k+ CSV stream stays safe with CRLF+BOM."""
 
-    _patch_iter_sorted(monkeypatch)
     cleanup_fixtures.flush_state()
     total_rows = 120_000
     chunk_size = 40_000
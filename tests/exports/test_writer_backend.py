@@ -21,7 +21,7 @@ def test_default_xlsxwriter_write_only(tmp_path: Path) -> None:
     result = writer.write_xlsx(payload, path_factory=lambda index: tmp_path / f"export_{index}.xlsx")
     artifact = result.files[0]
     assert artifact.sheets == (("Sheet_001", len(rows)),)
-    assert result.excel_safety["backend"] == "xlsxwriter"
+    assert result.excel_safety["backend"] == "native"
 
     path = tmp_path / "export_1.xlsx"
     with ZipFile(path, "r") as archive:
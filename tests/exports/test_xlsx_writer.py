@@ -66,3 +66,22 @@ def test_sensitive_as_text_and_formula_guard(tmp_path: Path) -> None:
     finally:
         wb.close()
     assert artifact.excel_safety["sensitive_text"]
+
+
+def test_native_backend_matches_openpyxl(tmp_path: Path) -> None:
+    rows = [_row(national_id=f"{index:03d}", first_name=" علی ", last_name="") for index in range(5)]
+    cells: dict[str, list] = {}
+    for backend in ("native", "openpyxl"):
+        output = tmp_path / f"{backend}.xlsx"
+        artifact = XLSXStreamWriter(chunk_size=2, backend=backend).write(rows, output)
+        assert artifact.excel_safety["backend"] == backend
+        assert artifact.row_counts == {"Sheet_001": 2, "Sheet_002": 2, "Sheet_003": 1}
+        wb = load_workbook(output)
+        try:
+            cells[backend] = [
+                (sheet.title, [[(cell.value, cell.number_format) for cell in row] for row in sheet.iter_rows()])
+                for sheet in wb.worksheets
+            ]
+        finally:
+            wb.close()
+    assert cells["native"] == cells["openpyxl"]
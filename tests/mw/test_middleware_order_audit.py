@@ -53,6 +53,12 @@ class _DummyService:
     ) -> int:  # pragma: no cover - deterministic stub
         return 1
 
+    async def submit_event(self, **kwargs: Any) -> None:
+        await self.record_event(**kwargs)
+
+    async def aclose(self) -> None:  # pragma: no cover - lifespan not exercised
+        return None
+
 
 class _DummyExporter:
     async def export(self, *args, **kwargs):  # pragma: no cover - not exercised
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from prometheus_client import CollectorRegistry
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from sma.phase6_import_to_sabt.app.clock import FixedClock
+from sma.phase6_import_to_sabt.app.config import AppConfig, AuthConfig
+from sma.phase6_import_to_sabt.app.errors import install_error_handlers
+from sma.phase6_import_to_sabt.app.middleware import (
+    CorrelationIdMiddleware,
+    MetricsMiddleware,
+    RequestLoggingMiddleware,
+)
+from sma.phase6_import_to_sabt.app.security import (
+    AuthMiddleware,
+    IdempotencyMiddleware,
+    RateLimitMiddleware,
+)
+from sma.phase6_import_to_sabt.app.stores import InMemoryKeyValueStore
+from sma.phase6_import_to_sabt.app.timing import DeterministicTimer
+from sma.phase6_import_to_sabt.obs.metrics import build_metrics
+
+MIDDLEWARE = (
+    CorrelationIdMiddleware,
+    MetricsMiddleware,
+    RequestLoggingMiddleware,
+    RateLimitMiddleware,
+    IdempotencyMiddleware,
+    AuthMiddleware,
+)
+
+
+def _build_app(registry: CollectorRegistry) -> FastAPI:
+    clock = FixedClock(instant=dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc))
+    config = AppConfig(auth=AuthConfig(allow_all=True))
+    app = FastAPI()
+    app.state.diagnostics = {"enabled": False}
+
+    @app.get("/download")
+    async def download() -> StreamingResponse:
+        async def _body():
+            for index in range(3):
+                yield f"chunk-{index};".encode("ascii")
+
+        return StreamingResponse(_body(), media_type="text/plain")
+
+    @app.post("/echo")
+    async def echo(request: Request) -> dict[str, object]:
+        return {
+            "chain": request.state.middleware_chain,
+            "correlation_id": request.state.correlation_id,
+            "idempotency": request.state.idempotency_state,
+        }
+
+    install_error_handlers(app)
+    app.add_middleware(CorrelationIdMiddleware, clock=clock)
+    app.add_middleware(
+        MetricsMiddleware,
+        metrics=build_metrics("pure_asgi_chain", registry=registry),
+        timer=DeterministicTimer([0.01]),
+    )
+    app.add_middleware(RequestLoggingMiddleware, diagnostics=lambda: app.state.diagnostics)
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=InMemoryKeyValueStore("rl", clock),
+        config=config.ratelimit,
+        clock=clock,
+    )
+    app.add_middleware(IdempotencyMiddleware, store=InMemoryKeyValueStore("idem", clock))
+    app.add_middleware(AuthMiddleware, config=config.auth)
+    return app
+
+
+def _request(app: FastAPI, method: str, path: str, headers: dict[str, str]) -> list[dict]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    messages: list[dict] = []
+
+    async def _run() -> None:
+        finished = asyncio.Event()
+        requested = False
+
+        async def receive() -> dict:
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            messages.append(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished.set()
+
+        await app(scope, receive, send)
+
+    asyncio.run(_run())
+    return messages
+
+
+def test_chain_has_no_base_http_middleware() -> None:
+    assert not any(issubclass(cls, BaseHTTPMiddleware) for cls in MIDDLEWARE)
+
+
+def test_streaming_download_is_forwarded_chunk_by_chunk() -> None:
+    registry = CollectorRegistry()
+    app = _build_app(registry)
+    messages = _request(app, "GET", "/download", {"X-Request-ID": "rid-1"})
+
+    start, *body = messages
+    headers = {key.decode(): value.decode() for key, value in start["headers"]}
+    assert start["status"] == 200
+    assert headers["x-request-id"] == "rid-1"
+    assert headers["x-ratelimit-remaining"] == "4"
+    assert sorted(headers["x-middleware-chain"].split(",")) == ["Auth", "Idempotency", "RateLimit"]
+    chunks = [message["body"] for message in body if message["body"]]
+    assert chunks == [b"chunk-0;", b"chunk-1;", b"chunk-2;"]
+    assert registry.get_sample_value(
+        "pure_asgi_chain_request_total",
+        {"method": "GET", "path": "/download", "status": "200"},
+    ) == 1.0
+
+
+def test_request_state_is_shared_with_the_endpoint() -> None:
+    app = _build_app(CollectorRegistry())
+    messages = _request(app, "POST", "/echo", {"Idempotency-Key": "idem-1", "X-Request-ID": "rid-2"})
+
+    assert messages[0]["status"] == 200
+    payload = messages[1]["body"].decode("utf-8")
+    assert '"correlation_id":"rid-2"' in payload
+    assert '"idempotency":{"key":"idem-1","created":true}' in payload
+    for name in ("RateLimit", "Idempotency", "Auth"):
+        assert f'"{name}"' in payload
+
+
+def test_bench_reference_app_runs_the_base_http_chain() -> None:
+    from sma.phase6_import_to_sabt.perf.middleware_bench import (
+        DOWNLOAD_PATH,
+        STATUS_PATH,
+        _call,
+        build_chain_app,
+        build_reference_app,
+    )
+
+    reference = build_reference_app(chunk_bytes=8, chunks=2)
+    chain = build_chain_app(chunk_bytes=8, chunks=2)
+
+    assert [m.cls.__name__ for m in reference.user_middleware] == [
+        m.cls.__name__ for m in chain.user_middleware
+    ]
+    assert all(issubclass(m.cls, BaseHTTPMiddleware) for m in reference.user_middleware)
+    for path in (STATUS_PATH, DOWNLOAD_PATH):
+        assert asyncio.run(_call(reference, path, 0)) == 200
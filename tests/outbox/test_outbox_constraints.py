@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from datetime import datetime, timedelta, timezone
 
 import pytest
@@ -88,3 +89,79 @@ def test_dispatcher_marks_failed_after_max_retries(tmp_path, caplog) -> None:
     assert model.last_error and "MAX_RETRIES_REACHED" in model.last_error
     assert ("evt-1", "FAILED") in statuses
     assert any("MAX_RETRIES_REACHED" in record.message for record in caplog.records)
+    session.close()
+    engine.dispose()
+
+
+def _pending(row_id: str, aggregate_id: str, occurred_at: datetime, available_at: datetime) -> OutboxMessageModel:
+    return OutboxMessageModel(
+        id=row_id,
+        event_id=f"evt-{row_id}",
+        aggregate_type="Allocation",
+        aggregate_id=aggregate_id,
+        event_type="MentorAssigned",
+        payload_json=f'{{"idempotency_key": "key-{row_id}"}}',
+        occurred_at=occurred_at,
+        available_at=available_at,
+        retry_count=0,
+        status="PENDING",
+    )
+
+
+def test_pipelined_dispatch_keeps_aggregate_order(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.sqlite'}", future=True)
+    Base.metadata.create_all(engine, tables=[OutboxMessageModel.__table__])
+    Session = sessionmaker(bind=engine, expire_on_commit=False, future=True)
+    session = Session()
+    past = FIXED_NOW - timedelta(minutes=10)
+    session.add_all(
+        [
+            _pending("a1", "A", past, past),
+            _pending("a2", "A", past + timedelta(seconds=1), past),
+            _pending("a3", "A", past + timedelta(seconds=2), past),
+            _pending("b1", "B", past, past),
+            _pending("b2", "B", past + timedelta(seconds=1), past),
+            _pending("c1", "C", past, FIXED_NOW + timedelta(hours=1)),
+            _pending("c2", "C", past + timedelta(seconds=1), past),
+        ]
+    )
+    session.commit()
+
+    published: list[tuple[str, str]] = []
+    lock = threading.Lock()
+
+    class FlakyPublisher:
+        def publish(self, *, event_type: str, payload: dict, headers: dict[str, str]) -> None:
+            if headers["x-event-id"] == "evt-a2":
+                raise RuntimeError("transient")
+            with lock:
+                published.append((headers["x-aggregate-id"], headers["x-event-id"]))
+            assert headers["x-idempotency-key"] == "key-" + headers["x-event-id"][4:]
+
+    class FixedClock:
+        def now(self):
+            return FIXED_NOW
+
+        def monotonic(self) -> float:
+            return 0.0
+
+    dispatcher = OutboxDispatcher(
+        session=session,
+        publisher=FlakyPublisher(),
+        clock=FixedClock(),
+        backoff=BackoffPolicy(base_seconds=60),
+        max_in_flight=4,
+    )
+    assert dispatcher.dispatch_once() == 3
+    assert [event for aggregate, event in published if aggregate == "A"] == ["evt-a1"]
+    assert [event for aggregate, event in published if aggregate == "B"] == ["evt-b1", "evt-b2"]
+    assert all(aggregate != "C" for aggregate, _ in published)
+
+    with Session() as check:
+        rows = {row.id: row for row in check.query(OutboxMessageModel)}
+    assert {key for key, row in rows.items() if row.status == "SENT"} == {"a1", "b1", "b2"}
+    assert rows["a2"].retry_count == 1 and rows["a3"].retry_count == 0
+    assert rows["b1"].published_at is not None
+    assert dispatcher.dispatch_once() == 0
+    session.close()
+    engine.dispose()
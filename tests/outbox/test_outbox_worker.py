@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from prometheus_client import CollectorRegistry
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from sma._local_tools.outbox_dispatcher_cli import build_worker, parse_args
+from sma.infrastructure.persistence.models import Base, OutboxMessageModel
+from sma.phase3_allocation.outbox import (
+    AdaptivePolling,
+    BackoffPolicy,
+    OutboxDrainWorker,
+    OutboxWorkerMetrics,
+)
+
+FIXED_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FixedClock:
+    def now(self):
+        return FIXED_NOW
+
+    def monotonic(self) -> float:
+        return 0.0
+
+
+class RecordingPublisher:
+    def __init__(self) -> None:
+        self.events: list[str] = []
+
+    def publish(self, *, event_type: str, payload: dict, headers: dict[str, str]) -> None:
+        self.events.append(headers["x-event-id"])
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.sqlite'}", future=True)
+    Base.metadata.create_all(engine, tables=[OutboxMessageModel.__table__])
+    yield sessionmaker(bind=engine, expire_on_commit=False, future=True)
+    engine.dispose()
+
+
+def _seed(session_factory, count: int, *, available_at: datetime) -> None:
+    with session_factory() as session:
+        for index in range(count):
+            session.add(
+                OutboxMessageModel(
+                    id=f"row-{index}",
+                    event_id=f"evt-{index}",
+                    aggregate_type="Allocation",
+                    aggregate_id=str(index),
+                    event_type="MentorAssigned",
+                    payload_json="{}",
+                    occurred_at=FIXED_NOW - timedelta(minutes=5),
+                    available_at=available_at,
+                    retry_count=0,
+                    status="PENDING",
+                )
+            )
+        session.commit()
+
+
+def test_adaptive_polling_tracks_backlog() -> None:
+    polling = AdaptivePolling(min_seconds=0.1, max_seconds=0.5)
+    assert polling.next_delay(sent=10, batch_size=10) == 0.0
+    assert polling.next_delay(sent=3, batch_size=10) == 0.1
+    assert [polling.next_delay(sent=0, batch_size=10) for _ in range(4)] == [0.2, 0.4, 0.5, 0.5]
+    assert polling.next_delay(sent=0, batch_size=10, seconds_until_due=0.25) == 0.25
+    assert polling.next_delay(sent=0, batch_size=10, seconds_until_due=0.01) == 0.1
+    with pytest.raises(ValueError):
+        AdaptivePolling(min_seconds=1.0, max_seconds=0.5)
+
+
+def test_worker_drains_backlog_and_reports_metrics(session_factory) -> None:
+    _seed(session_factory, 5, available_at=FIXED_NOW - timedelta(seconds=30))
+    registry = CollectorRegistry()
+    publisher = RecordingPublisher()
+    worker = OutboxDrainWorker(
+        session_factory,
+        publisher,
+        clock=FixedClock(),
+        batch_size=2,
+        polling=AdaptivePolling(min_seconds=0.1, max_seconds=1.0),
+        metrics=OutboxWorkerMetrics(registry),
+    )
+
+    first = worker.run_once()
+    assert first == (2, 0.0)
+    assert registry.get_sample_value("outbox_queue_depth", {"state": "due"}) == 3
+    assert registry.get_sample_value("outbox_dispatch_lag_seconds") == 30.0
+
+    assert worker.run_once() == (2, 0.0)
+    assert worker.run_once() == (1, 0.1)
+    assert worker.run_once() == (0, 0.2)
+    assert sorted(publisher.events) == [f"evt-{index}" for index in range(5)]
+    assert registry.get_sample_value("outbox_dispatched_total") == 5
+    assert registry.get_sample_value("outbox_polls_total", {"result": "idle"}) == 1
+    assert registry.get_sample_value("outbox_queue_depth", {"state": "pending"}) == 0
+    assert registry.get_sample_value("outbox_dispatch_lag_seconds") == 0.0
+
+
+def test_worker_sleeps_until_retry_is_due(session_factory) -> None:
+    _seed(session_factory, 1, available_at=FIXED_NOW + timedelta(seconds=0.3))
+    worker = OutboxDrainWorker(
+        session_factory,
+        RecordingPublisher(),
+        clock=FixedClock(),
+        backoff=BackoffPolicy(base_seconds=1.0),
+        polling=AdaptivePolling(min_seconds=0.1, max_seconds=5.0, growth=10.0),
+    )
+    assert worker.run_once() == (0, 0.1)
+    sent, delay = worker.run_once()
+    assert sent == 0
+    assert delay == pytest.approx(0.3)
+
+
+def test_worker_survives_poll_errors(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.sqlite'}", future=True)
+    registry = CollectorRegistry()
+    worker = OutboxDrainWorker(
+        sessionmaker(bind=engine, future=True),
+        RecordingPublisher(),
+        clock=FixedClock(),
+        polling=AdaptivePolling(min_seconds=0.1, max_seconds=1.0),
+        metrics=OutboxWorkerMetrics(registry),
+    )
+    assert worker.run_once() == (0, 0.1)
+    assert registry.get_sample_value("outbox_polls_total", {"result": "error"}) == 1
+    engine.dispose()
+
+
+def test_run_stops_on_event(session_factory) -> None:
+    _seed(session_factory, 3, available_at=FIXED_NOW - timedelta(seconds=1))
+    publisher = RecordingPublisher()
+    worker = OutboxDrainWorker(session_factory, publisher, clock=FixedClock(), batch_size=2)
+    assert worker.run(max_polls=3) == 3
+
+    stop = threading.Event()
+    stop.set()
+    assert worker.run(stop) == 0
+    assert len(publisher.events) == 3
+
+
+def test_cli_worker_reports_backlog_metrics(session_factory, capsys) -> None:
+    _seed(session_factory, 3, available_at=FIXED_NOW)
+    registry = CollectorRegistry()
+    args = parse_args(["--batch-size", "2", "--metrics-port", "0"])
+    worker = build_worker(args, session_factory, metrics=OutboxWorkerMetrics(registry))
+    sent, _delay = worker.run_once()
+    assert sent == 2
+    assert registry.get_sample_value("outbox_dispatched_total") == 2
+    assert registry.get_sample_value("outbox_queue_depth", {"state": "pending"}) == 1
+    assert capsys.readouterr().out.count("MentorAssigned") == 2
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from prometheus_client import CollectorRegistry
+
+from sma.hardened_api.redis_support import RedisExecutor, RedisNamespaces, RedisRetryConfig
+from sma.phase2_counter_service.academic_year import AcademicYearProvider
+from sma.phase2_counter_service.counter_runtime import CounterResult, CounterRuntime, CounterRuntimeError
+from sma.phase2_counter_service.runtime_metrics import CounterRuntimeMetrics
+
+pytest.importorskip("lupa")
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class _CountingRedis(fakeredis.FakeAsyncRedis):
+    """Fake Redis that records which scripting commands were sent."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.commands: list[str] = []
+
+    async def eval(self, *args, **kwargs):
+        self.commands.append("EVAL")
+        return await super().eval(*args, **kwargs)
+
+    async def evalsha(self, *args, **kwargs):
+        self.commands.append("EVALSHA")
+        return await super().evalsha(*args, **kwargs)
+
+    async def script_load(self, *args, **kwargs):
+        self.commands.append("SCRIPT LOAD")
+        return await super().script_load(*args, **kwargs)
+
+
+async def _no_sleep(_: float) -> None:
+    return None
+
+
+def _runtime(redis, *, max_serial: int = 9999) -> CounterRuntime:
+    executor = RedisExecutor(
+        config=RedisRetryConfig(attempts=1, base_delay=0.0, max_delay=0.0, jitter=0.0),
+        namespace="counter-runtime-test",
+        rng=lambda: 0.0,
+        monotonic=lambda: 0.0,
+        sleep=_no_sleep,
+    )
+    return CounterRuntime(
+        redis=redis,
+        namespaces=RedisNamespaces("counter-runtime-test"),
+        executor=executor,
+        metrics=CounterRuntimeMetrics(CollectorRegistry()),
+        year_provider=AcademicYearProvider({"1402": "02"}),
+        hash_salt="salt",
+        max_serial=max_serial,
+        wait_attempts=2,
+    )
+
+
+def _payload(student_id: str, gender: int = 0, center: int = 1) -> dict[str, object]:
+    return {"year": "1402", "gender": gender, "center": center, "student_id": student_id}
+
+
+def _summary(outcomes) -> list[tuple[str, str]]:
+    return [
+        (item.counter, item.status) if isinstance(item, CounterResult) else ("error", item.code)
+        for item in outcomes
+    ]
+
+
+def test_scripts_are_loaded_once_and_reloaded_after_noscript() -> None:
+    async def _run() -> None:
+        redis = _CountingRedis()
+        runtime = _runtime(redis)
+        first = await runtime.allocate(_payload("S-1"), correlation_id="c-1")
+        second = await runtime.allocate(_payload("S-2"), correlation_id="c-2")
+        assert (first.counter, second.counter) == ("023730001", "023730002")
+        assert redis.commands == ["SCRIPT LOAD", "EVALSHA", "EVALSHA"]
+
+        await redis.script_flush()
+        redis.commands.clear()
+        reused = await runtime.allocate(_payload("S-1"), correlation_id="c-3")
+        assert (reused.counter, reused.status) == ("023730001", "reused")
+        assert redis.commands == ["EVALSHA", "SCRIPT LOAD", "EVALSHA"]
+        await redis.aclose()
+
+    asyncio.run(_run())
+
+
+def test_allocate_many_matches_sequential_allocation() -> None:
+    payloads = [
+        _payload("S-1"),
+        _payload("S-2", gender=1),
+        {"year": "1402", "gender": 7, "center": 1, "student_id": "bad"},
+        _payload("S-3"),
+        _payload("S-1"),
+        _payload("S-4", gender=1),
+        _payload("S-5"),
+    ]
+
+    async def _sequential() -> list[object]:
+        redis = fakeredis.FakeAsyncRedis()
+        runtime = _runtime(redis, max_serial=2)
+        outcomes: list[object] = []
+        for index, payload in enumerate(payloads):
+            try:
+                outcomes.append(await runtime.allocate(payload, correlation_id=f"seq-{index}"))
+            except CounterRuntimeError as exc:
+                outcomes.append(exc)
+        await redis.aclose()
+        return outcomes
+
+    async def _batched() -> tuple[list[object], list[str]]:
+        redis = _CountingRedis()
+        runtime = _runtime(redis, max_serial=2)
+        outcomes = await runtime.allocate_many(payloads, correlation_id="batch", batch_size=4)
+        await redis.aclose()
+        return outcomes, redis.commands
+
+    expected = asyncio.run(_sequential())
+    outcomes, commands = asyncio.run(_batched())
+    assert _summary(outcomes) == _summary(expected)
+    assert _summary(outcomes)[:5] == [
+        ("023730001", "new"),
+        ("023570001", "new"),
+        ("error", "COUNTER_VALIDATION_ERROR"),
+        ("023730002", "new"),
+        ("023730001", "reused"),
+    ]
+    assert _summary(outcomes)[6] == ("error", "COUNTER_EXHAUSTED")
+    # Six valid students in batches of four: two round trips.
+    assert commands == ["SCRIPT LOAD", "EVALSHA", "EVALSHA"]
+
+
+def test_allocate_many_retries_students_behind_a_placeholder() -> None:
+    async def _run() -> None:
+        redis = fakeredis.FakeAsyncRedis()
+        runtime = _runtime(redis)
+        namespaces = RedisNamespaces("counter-runtime-test")
+        await redis.set(namespaces.counter_student("02", "S-held"), json.dumps({"status": "PENDING"}))
+        outcomes = await runtime.allocate_many(
+            [_payload("S-1"), _payload("S-held")], correlation_id="held"
+        )
+        assert _summary(outcomes) == [("023730001", "new"), ("error", "COUNTER_RETRY_EXHAUSTED")]
+        await redis.aclose()
+
+    asyncio.run(_run())
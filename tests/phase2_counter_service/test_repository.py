@@ -4,7 +4,7 @@ from __future__ import annotations
 import pytest
 from sqlalchemy.orm import Session, sessionmaker
 
-from sma.infrastructure.persistence.models import StudentModel
+from sma.infrastructure.persistence.models import CounterSequenceModel, StudentModel
 from sma.phase2_counter_service.errors import CounterServiceError
 from sma.phase2_counter_service.repository import FaultInjector, SqlAlchemyCounterRepository
 from sma.phase2_counter_service.validation import COUNTER_PREFIX
@@ -122,3 +122,77 @@ def test_next_sequence_raises_after_retries(
             repo._next_sequence(local_session, "25", COUNTER_PREFIX[0])
 
     assert exc.value.detail.code == "E_DB_CONFLICT"
+
+
+def test_reserve_many_binds_contiguous_ranges(
+    repository: SqlAlchemyCounterRepository,
+    session_factory: sessionmaker,
+    session: Session,
+) -> None:
+    for nid, gender in [("1000000001", 0), ("1000000002", 1), ("1000000003", 0), ("1000000005", 0)]:
+        seed_student(session, national_id=nid, gender=gender)
+    seed_student(session, national_id="1000000004", gender=0, counter="253730002")
+
+    outcomes = repository.reserve_and_bind_many(
+        [
+            ("1000000001", 0, "25"),
+            ("1000000002", 1, "25"),
+            ("1000000003", 0, "25"),
+            ("1000000004", 0, "25"),
+            ("1000000001", 0, "25"),
+            ("1000000099", 0, "25"),
+            ("1000000005", 0, "25"),
+        ]
+    )
+
+    summary = [(o.counter, o.reused, o.conflict_type, o.error and o.error.detail.code) for o in outcomes]
+    assert summary == [
+        ("253730001", False, None, None),
+        ("253570001", False, None, None),
+        ("253730003", False, "counter", None),
+        ("253730002", True, None, None),
+        ("253730001", True, None, None),
+        (None, False, None, "E_INVALID_NID"),
+        ("253730004", False, None, None),
+    ]
+    assert repository.snapshot_sequences() == {("25", "373"): 4, ("25", "357"): 1}
+    with session_factory() as fresh:
+        assert fresh.get(StudentModel, "1000000003").counter == "253730003"
+
+
+def test_reserve_many_replays_rows_after_batch_conflict(
+    repository: SqlAlchemyCounterRepository,
+    session: Session,
+    fault_injector: FaultInjector,
+) -> None:
+    seed_student(session, national_id="2000000001", gender=0)
+    seed_student(session, national_id="2000000002", gender=1)
+    fault_injector.duplicate_counter = 2
+
+    outcomes = repository.reserve_and_bind_many([("2000000001", 0, "25"), ("2000000002", 1, "25")])
+
+    # The batch is rolled back and each row replayed on its own, so the injected
+    # conflict is attributed to the single row that hit it.
+    assert [o.conflict_type for o in outcomes] == ["counter", None]
+    assert outcomes[0].counter is not None and outcomes[0].counter.startswith("25373")
+    assert outcomes[1].counter == "253570001"
+    assert repository.fetch_existing_counters(["2000000001", "2000000002"]) == {
+        o.national_id: o.counter for o in outcomes
+    }
+
+
+def test_reserve_many_reports_exhausted_rows(
+    repository: SqlAlchemyCounterRepository,
+    session: Session,
+) -> None:
+    seed_student(session, national_id="3000000001", gender=0)
+    seed_student(session, national_id="3000000002", gender=0)
+    session.add(CounterSequenceModel(year_code="25", gender_code="373", last_seq=9998))
+    session.commit()
+
+    first, second = repository.reserve_and_bind_many([("3000000001", 0, "25"), ("3000000002", 0, "25")])
+
+    assert first.counter == "253739999"
+    assert second.counter is None
+    assert second.error is not None and second.error.detail.code == "E_COUNTER_EXHAUSTED"
+    assert repository.snapshot_sequences()[("25", "373")] == 9999
@@ -1,11 +1,17 @@
 """Common fixtures and helpers for phase 3 allocation tests."""
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from typing import FrozenSet, Iterable, Mapping
 
 import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
 
+from sma.infrastructure.persistence.models import Base, MentorModel, StudentModel
+from sma.phase3_allocation.allocation_tx import AllocationRequest, PolicyEngine, PolicyVerdict
 from sma.phase3_allocation.contracts import (
     AllocationConfig,
     NormalizedMentor,
@@ -104,3 +110,96 @@ def normalized_mentor(**overrides: object) -> NormalizedMentor:
     base.update(overrides)
     return NormalizedMentor(**base)
 
+
+class FakeClock:
+    def __init__(self, start: datetime | None = None) -> None:
+        self._wall = start or datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self._mono = 0.0
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        with self._lock:
+            return self._wall
+
+    def monotonic(self) -> float:
+        with self._lock:
+            return self._mono
+
+    def advance(self, seconds: float) -> None:
+        with self._lock:
+            self._wall += timedelta(seconds=seconds)
+            self._mono += seconds
+
+
+class StubPolicy(PolicyEngine):
+    def __init__(self, approve: bool = True) -> None:
+        self.approve = approve
+        self.calls: list[tuple[str, int]] = []
+
+    def evaluate(self, *, student: StudentModel, mentor: MentorModel, request: AllocationRequest) -> PolicyVerdict:  # type: ignore[override]
+        self.calls.append((student.national_id, mentor.mentor_id))
+        if self.approve:
+            return PolicyVerdict(approved=True, code="POLICY_OK", details={})
+        return PolicyVerdict(approved=False, code="POLICY_DENIED", details={})
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    db_path = tmp_path / "alloc.db"
+    engine = create_engine(
+        f"sqlite:///{db_path}", future=True, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def session_factory(engine):
+    return sessionmaker(bind=engine, expire_on_commit=False, future=True)
+
+
+def seed_base_data(session: Session) -> None:
+    student = StudentModel(
+        national_id="0012345678",
+        first_name="علی",
+        last_name="رضایی",
+        gender=1,
+        edu_status=1,
+        reg_center=1,
+        reg_status=1,
+        group_code=101,
+        school_code=5001,
+        student_type=0,
+    )
+    mentor = MentorModel(
+        mentor_id=42,
+        name="Mentor",
+        gender=1,
+        type="عادی",
+        capacity=10,
+        current_load=0,
+        is_active=True,
+    )
+    session.add_all([student, mentor])
+    session.commit()
+
+
+def seed_batch_data(session: Session, count: int) -> None:
+    seed_base_data(session)
+    for index in range(1, count):
+        session.add(
+            StudentModel(
+                national_id=f"00123456{index:02d}",
+                first_name="علی",
+                last_name="رضایی",
+                gender=1,
+                edu_status=1,
+                reg_center=1,
+                reg_status=1,
+                group_code=101,
+                school_code=5001,
+                student_type=0,
+            )
+        )
+    session.commit()
@@ -2,15 +2,12 @@ from __future__ import annotations
 
 import threading
 import json
-from datetime import datetime, timedelta, timezone
 
-import pytest
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 
 from sma.infrastructure.persistence.models import (
     AllocationRecord,
-    Base,
     MentorModel,
     OutboxMessageModel,
     StudentModel,
@@ -20,43 +17,14 @@ from sma.phase3_allocation.allocation_tx import (
     AllocationRequest,
     AllocationSequenceProvider,
     AtomicAllocator,
+    CounterBlockSequenceProvider,
     PolicyEngine,
-    PolicyVerdict,
+    SimpleAllocationSequenceProvider,
 )
 from sma.phase3_allocation.outbox import BackoffPolicy, OutboxDispatcher
 from sma.phase3_allocation.uow import SQLAlchemyUnitOfWork
 
-
-class FakeClock:
-    def __init__(self, start: datetime | None = None) -> None:
-        self._wall = start or datetime(2025, 1, 1, tzinfo=timezone.utc)
-        self._mono = 0.0
-        self._lock = threading.Lock()
-
-    def now(self) -> datetime:
-        with self._lock:
-            return self._wall
-
-    def monotonic(self) -> float:
-        with self._lock:
-            return self._mono
-
-    def advance(self, seconds: float) -> None:
-        with self._lock:
-            self._wall += timedelta(seconds=seconds)
-            self._mono += seconds
-
-
-class StubPolicy(PolicyEngine):
-    def __init__(self, approve: bool = True) -> None:
-        self.approve = approve
-        self.calls: list[tuple[str, int]] = []
-
-    def evaluate(self, *, student: StudentModel, mentor: MentorModel, request: AllocationRequest) -> PolicyVerdict:  # type: ignore[override]
-        self.calls.append((student.national_id, mentor.mentor_id))
-        if self.approve:
-            return PolicyVerdict(approved=True, code="POLICY_OK", details={})
-        return PolicyVerdict(approved=False, code="POLICY_DENIED", details={})
+from tests.phase3.conftest import FakeClock, StubPolicy, seed_base_data, seed_batch_data
 
 
 class StubSequence(AllocationSequenceProvider):
@@ -77,48 +45,6 @@ class StubSequence(AllocationSequenceProvider):
         )
 
 
-@pytest.fixture()
-def engine(tmp_path):
-    db_path = tmp_path / "alloc.db"
-    engine = create_engine(
-        f"sqlite:///{db_path}", future=True, connect_args={"check_same_thread": False}
-    )
-    Base.metadata.create_all(engine)
-    yield engine
-    engine.dispose()
-
-
-@pytest.fixture()
-def session_factory(engine):
-    return sessionmaker(bind=engine, expire_on_commit=False, future=True)
-
-
-def seed_base_data(session: Session) -> None:
-    student = StudentModel(
-        national_id="0012345678",
-        first_name="علی",
-        last_name="رضایی",
-        gender=1,
-        edu_status=1,
-        reg_center=1,
-        reg_status=1,
-        group_code=101,
-        school_code=5001,
-        student_type=0,
-    )
-    mentor = MentorModel(
-        mentor_id=42,
-        name="Mentor",
-        gender=1,
-        type="عادی",
-        capacity=10,
-        current_load=0,
-        is_active=True,
-    )
-    session.add_all([student, mentor])
-    session.commit()
-
-
 def build_allocator(session_factory, clock: FakeClock, policy: PolicyEngine | None = None) -> AtomicAllocator:
     sequence = StubSequence(clock)
 
@@ -387,3 +313,93 @@ def test_request_validation_handles_zero_width(session_factory) -> None:
     result = allocator.allocate(request)
     assert result.status == "OK"
 
+
+def test_allocate_many_single_transaction(session_factory) -> None:
+    clock = FakeClock()
+    allocator = AtomicAllocator(
+        uow_factory=lambda: SQLAlchemyUnitOfWork(session_factory=session_factory),
+        sequence_provider=SimpleAllocationSequenceProvider(clock=clock),
+        policy_engine=StubPolicy(),
+        clock=clock,
+    )
+    with session_factory() as session:
+        seed_batch_data(session, 4)
+
+    requests = [
+        AllocationRequest(studentId="0012345678", mentorId="42", requestId="r-0"),
+        AllocationRequest(studentId="0012345601", mentorId="42", requestId="r-1"),
+        AllocationRequest(studentId="0012345601", mentorId="42", requestId="r-1"),
+        AllocationRequest(studentId="0012345602", mentorId="99", requestId="r-2"),
+        AllocationRequest(studentId="0012345603", mentorId="42", requestId="r-3"),
+        AllocationRequest(studentId="0012345603", mentorId="42", requestId="r-4"),
+    ]
+    results = allocator.allocate_many(requests)
+    assert [r.status for r in results] == [
+        "OK",
+        "OK",
+        "ALREADY_ASSIGNED",
+        "MENTOR_NOT_FOUND",
+        "OK",
+        "ALREADY_ASSIGNED",
+    ]
+    assert [r.allocation_id for r in results] == [1, 2, 2, None, 3, 3]
+    assert results[0].allocation_code == "2500000001"
+    assert results[2].idempotency_key == results[1].idempotency_key
+    assert results[5].idempotency_key != results[4].idempotency_key
+
+    with session_factory() as session:
+        assert len(session.execute(select(AllocationRecord)).scalars().all()) == 3
+        assert len(session.execute(select(OutboxMessageModel)).scalars().all()) == 3
+
+    replay = allocator.allocate_many(requests[:2])
+    assert [r.status for r in replay] == ["ALREADY_ASSIGNED", "ALREADY_ASSIGNED"]
+    assert [r.allocation_id for r in replay] == [1, 2]
+
+
+def test_allocate_many_matches_single_results(session_factory) -> None:
+    clock = FakeClock()
+    allocator = build_allocator(session_factory, clock, policy=StubPolicy(approve=False))
+    with session_factory() as session:
+        seed_batch_data(session, 2)
+
+    requests = [
+        AllocationRequest(studentId="0012345678", mentorId="42"),
+        AllocationRequest(studentId="0099999999", mentorId="42"),
+    ]
+    batch = allocator.allocate_many(requests)
+    single = [allocator.allocate(request) for request in requests]
+    assert batch == single
+    assert allocator.allocate_many(requests, dry_run=True) == [
+        allocator.allocate(request, dry_run=True) for request in requests
+    ]
+
+
+def test_allocate_many_reserves_only_inserted_rows(session_factory) -> None:
+    clock = FakeClock()
+    allocator = AtomicAllocator(
+        uow_factory=lambda: SQLAlchemyUnitOfWork(session_factory=session_factory),
+        sequence_provider=CounterBlockSequenceProvider(
+            session_factory=session_factory, clock=clock, block_size=1
+        ),
+        policy_engine=StubPolicy(),
+        clock=clock,
+    )
+    with session_factory() as session:
+        seed_batch_data(session, 4)
+
+    first = allocator.allocate_many(
+        [
+            AllocationRequest(studentId="0012345678", mentorId="42", requestId="a-0"),
+            AllocationRequest(studentId="0012345601", mentorId="42", requestId="a-1"),
+            AllocationRequest(studentId="0012345601", mentorId="42", requestId="a-2"),
+        ]
+    )
+    assert [r.allocation_id for r in first] == [1, 2, 2]
+    second = allocator.allocate_many(
+        [
+            AllocationRequest(studentId="0012345678", mentorId="42", requestId="b-0"),
+            AllocationRequest(studentId="0012345602", mentorId="42", requestId="b-1"),
+        ]
+    )
+    assert [r.status for r in second] == ["ALREADY_ASSIGNED", "OK"]
+    assert [r.allocation_id for r in second] == [1, 3]
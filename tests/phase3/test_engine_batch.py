@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import List
+
+from sma.phase3_allocation.contracts import AllocationConfig
+from sma.phase3_allocation.engine import AllocationEngine
+from sma.phase3_allocation.mentor_index import MentorEligibilityIndex
+from sma.phase3_allocation.policy import EligibilityPolicy
+
+from tests.phase3.conftest import (
+    DictManagerCentersProvider,
+    DictSpecialSchoolsProvider,
+    DummyMentor,
+    DummyStudent,
+    normalized_student,
+)
+
+
+def _roster() -> List[DummyMentor]:
+    return [
+        DummyMentor(101, 0, ["A"], [0], 4, 2, True, "NORMAL"),
+        DummyMentor(102, 0, ["A", "B"], [0, 1], 4, 1, True, "NORMAL"),
+        DummyMentor(103, 1, ["A"], [0], 4, 0, True, "NORMAL"),
+        DummyMentor(104, 0, ["A"], [0], 5, 0, True, "SCHOOL", special_schools=[101]),
+        DummyMentor(105, 0, ["A"], [0], 3, 3, True, "NORMAL"),
+        DummyMentor(106, 0, ["A"], [0], 5, 0, True, "NORMAL", manager_id=99),
+        DummyMentor("bad", 0, ["A"], [0], 5, 0, True, "NORMAL"),
+        DummyMentor(107, 0, ["A"], [0], 4, 1, True, "NORMAL"),
+    ]
+
+
+def _cohort() -> List[DummyStudent]:
+    return [
+        DummyStudent(gender=0, group_code="A", reg_center=0, reg_status=0),
+        DummyStudent(gender=0, group_code="B", reg_center=1, reg_status=0),
+        DummyStudent(gender=1, group_code="A", reg_center=0, reg_status=0),
+        DummyStudent(gender=0, group_code="Z", reg_center=0, reg_status=0),
+        DummyStudent(
+            gender=0,
+            group_code="A",
+            reg_center=0,
+            reg_status=0,
+            school_code=101,
+            student_type=1,
+            roster_year=1402,
+        ),
+        DummyStudent(gender=7, group_code="A", reg_center=0, reg_status=0),
+    ]
+
+
+def _engine(
+    special: DictSpecialSchoolsProvider,
+    manager: DictManagerCentersProvider,
+    config: AllocationConfig | None = None,
+) -> AllocationEngine:
+    return AllocationEngine(policy=EligibilityPolicy(special, manager, config or AllocationConfig()))
+
+
+def test_batch_matches_single_student_selection_and_traces(
+    special_provider: DictSpecialSchoolsProvider, manager_provider: DictManagerCentersProvider
+) -> None:
+    engine = _engine(special_provider, manager_provider)
+    mentors = _roster()
+    for trace in (True, False):
+        batch = engine.evaluate_batch(_cohort(), mentors, trace=trace)
+        assert batch == [engine.evaluate(student, mentors, trace=trace) for student in _cohort()]
+
+
+def test_batch_trace_rejected_reproduces_full_trace(
+    special_provider: DictSpecialSchoolsProvider, manager_provider: DictManagerCentersProvider
+) -> None:
+    engine = _engine(special_provider, manager_provider, AllocationConfig(fast_fail=True))
+    mentors = _roster()
+    batch = engine.evaluate_batch(_cohort(), mentors, trace_rejected=True)
+    assert batch == [engine.evaluate(student, mentors) for student in _cohort()]
+
+
+def test_batch_without_trace_rejected_keeps_roster_order(
+    special_provider: DictSpecialSchoolsProvider, manager_provider: DictManagerCentersProvider
+) -> None:
+    engine = _engine(special_provider, manager_provider)
+    mentors = _roster()
+    batch = engine.evaluate_batch(_cohort(), mentors, trace_rejected=False)
+    for student, (best, evaluations) in zip(_cohort(), batch, strict=True):
+        expected_best, expected = engine.evaluate(student, mentors)
+        assert best is expected_best
+        if expected and expected[0].mentor is None:  # student failed normalization
+            assert evaluations == expected
+            continue
+        assert [entry.mentor for entry in evaluations] == mentors
+        for entry, reference in zip(evaluations, expected, strict=True):
+            assert (entry.passed, entry.ranking_key) == (reference.passed, reference.ranking_key)
+            assert entry.trace in ([], reference.trace)
+        assert evaluations[6].trace == expected[6].trace  # normalization failure is kept
+
+
+def test_index_only_returns_partition_matches(policy: EligibilityPolicy) -> None:
+    index = MentorEligibilityIndex.build(policy, _roster())
+    assert len(index) == 8
+    ids = [item.normalized.mentor_id for item in index.candidates(normalized_student())]
+    assert ids == [101, 102, 105, 106, 107]
+    special = normalized_student(student_type=1, school_code=101)
+    assert [item.normalized.mentor_id for item in index.candidates(special)] == [104]
+    assert index.candidates(normalized_student(group_code="Z")) == ()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import pytest
+
+from sma.phase3_allocation.contracts import AllocationConfig
+from sma.phase3_allocation.policy import (
+    EligibilityPolicy,
+    MentorNormalizationCache,
+    NormalizationError,
+)
+
+from tests.phase3.conftest import DictManagerCentersProvider, DictSpecialSchoolsProvider, DummyMentor
+
+
+def _policy(
+    special: DictSpecialSchoolsProvider, manager: DictManagerCentersProvider
+) -> tuple[EligibilityPolicy, MentorNormalizationCache]:
+    cache = MentorNormalizationCache()
+    return EligibilityPolicy(special, manager, AllocationConfig(), mentor_cache=cache), cache
+
+
+def test_cache_reuses_normalized_mentor(
+    special_provider: DictSpecialSchoolsProvider, manager_provider: DictManagerCentersProvider
+) -> None:
+    policy, cache = _policy(special_provider, manager_provider)
+    mentor = DummyMentor("۱۲", 0, ["A‌"], ["0"], "۵", 1, True, "normal")
+    first = policy.normalize_mentor(mentor)
+    second = policy.normalize_mentor(mentor)
+    assert first is second
+    assert first.mentor_id == 12 and first.capacity == 5
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_detects_changed_rows(
+    special_provider: DictSpecialSchoolsProvider, manager_provider: DictManagerCentersProvider
+) -> None:
+    policy, cache = _policy(special_provider, manager_provider)
+    mentor = DummyMentor(7, 0, ["A"], [0], 5, 1, True, "NORMAL")
+    assert policy.normalize_mentor(mentor).current_load == 1
+    mentor.current_load = 4
+    mentor.allowed_groups = ["A", "B"]
+    refreshed = policy.normalize_mentor(mentor)
+    assert refreshed.current_load == 4
+    assert refreshed.allowed_groups == frozenset({"A", "B"})
+    assert len(cache) == 1
+    cache.invalidate()
+    assert len(cache) == 0 and cache.generation == 1
+
+
+def test_cache_replays_normalization_errors(
+    special_provider: DictSpecialSchoolsProvider, manager_provider: DictManagerCentersProvider
+) -> None:
+    policy, cache = _policy(special_provider, manager_provider)
+    mentor = DummyMentor(8, 0, ["A"], [0], 5, 1, True, "UNKNOWN")
+    for _ in range(2):
+        with pytest.raises(NormalizationError) as excinfo:
+            policy.normalize_mentor(mentor)
+        assert excinfo.value.rule_code == "SCHOOL_TYPE_COMPATIBLE"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("value", [1.0, True])
+def test_cache_distinguishes_equal_values_of_other_types(
+    special_provider: DictSpecialSchoolsProvider,
+    manager_provider: DictManagerCentersProvider,
+    value: object,
+) -> None:
+    policy, cache = _policy(special_provider, manager_provider)
+    mentor = DummyMentor(9, 0, ["A"], [0], 5, 1, True, "NORMAL")
+    assert policy.normalize_mentor(mentor).current_load == 1
+    mentor.current_load = value
+    with pytest.raises(NormalizationError):
+        policy.normalize_mentor(mentor)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_cache_evicts_oldest_entry() -> None:
+    cache = MentorNormalizationCache(max_entries=1)
+    policy = EligibilityPolicy(
+        DictSpecialSchoolsProvider({}), DictManagerCentersProvider({}), mentor_cache=cache
+    )
+    policy.normalize_mentor(DummyMentor(1, 0, ["A"], [0], 5, 1, True, "NORMAL"))
+    policy.normalize_mentor(DummyMentor(2, 0, ["A"], [0], 5, 1, True, "NORMAL"))
+    assert len(cache) == 1
+
+
+def test_cache_bypasses_one_shot_iterables(
+    special_provider: DictSpecialSchoolsProvider, manager_provider: DictManagerCentersProvider
+) -> None:
+    policy, cache = _policy(special_provider, manager_provider)
+    mentor = DummyMentor(9, 0, iter(["10", "20"]), iter([0]), 5, 1, True, "NORMAL")
+    normalized = policy.normalize_mentor(mentor)
+    assert normalized.allowed_groups == frozenset({"10", "20"})
+    assert normalized.allowed_centers == frozenset({0})
+    assert len(cache) == 0 and (cache.hits, cache.misses) == (0, 0)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import itertools
+
+from sma.phase3_allocation.contracts import AllocationConfig
+from sma.phase3_allocation.engine import AllocationEngine
+from sma.phase3_allocation.pipeline import CompiledRulePipeline
+from sma.phase3_allocation.policy import EligibilityPolicy
+from sma.phase3_allocation.rules import (
+    ALL_RULES,
+    CenterAllowedRule,
+    GenderMatchRule,
+    ManagerCenterGateRule,
+)
+
+from tests.phase3.conftest import (
+    DictManagerCentersProvider,
+    DictSpecialSchoolsProvider,
+    DummyMentor,
+    DummyStudent,
+    normalized_mentor,
+    normalized_student,
+)
+
+
+def test_predicates_agree_with_check(manager_provider: DictManagerCentersProvider) -> None:
+    rules = (*ALL_RULES, ManagerCenterGateRule(manager_provider))
+    students = [
+        normalized_student(gender=gender, reg_center=center, edu_status=edu, student_type=stype, school_code=school)
+        for gender, center, edu, stype, school in itertools.product((0, 1), (0, 2), (0, 1), (0, 1), (None, 101, 999))
+    ]
+    mentors = [
+        normalized_mentor(mentor_type=mtype, current_load=load, is_active=active, manager_id=manager)
+        for mtype, load, active, manager in itertools.product(("NORMAL", "SCHOOL"), (-1, 2, 5), (True, False), (None, 10, 11, 99))
+    ]
+    for rule in rules:
+        for student, mentor in itertools.product(students, mentors):
+            assert rule.passes(student, mentor) is rule.check(student, mentor).passed, rule.code
+
+
+def test_pipeline_moves_selective_rules_first() -> None:
+    pipeline = CompiledRulePipeline((GenderMatchRule(), CenterAllowedRule()), reorder_interval=4)
+    mentor = normalized_mentor(gender=0, allowed_centers=frozenset({1}))
+    for _ in range(4):
+        assert pipeline.passes(normalized_student(), mentor) is False
+    assert pipeline.order == ("CENTER_ALLOWED", "GENDER_MATCH")
+    assert pipeline.counters_snapshot() == {
+        "GENDER_MATCH": {"evaluated": 4, "rejected": 0},
+        "CENTER_ALLOWED": {"evaluated": 4, "rejected": 4},
+    }
+
+
+def test_engine_trace_free_selection_matches_traced(
+    special_provider: DictSpecialSchoolsProvider, manager_provider: DictManagerCentersProvider
+) -> None:
+    policy = EligibilityPolicy(special_provider, manager_provider, AllocationConfig(rule_reorder_interval=2))
+    engine = AllocationEngine(policy=policy)
+    student = DummyStudent(gender=0, group_code="A", reg_center=0, reg_status=0)
+    mentors = [
+        DummyMentor(101, 1, ["A"], [0], 4, 0, True, "NORMAL"),
+        DummyMentor(102, 0, ["B"], [0], 4, 0, True, "NORMAL"),
+        DummyMentor(103, 0, ["A"], [0], 4, 3, True, "NORMAL"),
+        DummyMentor(104, 0, ["A"], [0], 4, 1, True, "NORMAL"),
+    ]
+    best, traced = engine.evaluate(student, mentors)
+    fast_best, fast = engine.evaluate(student, mentors, trace=False)
+    assert fast_best is best is mentors[3]
+    assert [entry.passed for entry in fast] == [entry.passed for entry in traced]
+    assert all(entry.trace == [] for entry in fast)
+    counters = policy.rule_counters()
+    assert counters["GENDER_MATCH"]["rejected"] == 1
+    assert counters["GROUP_ALLOWED"]["rejected"] == 1
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from sqlalchemy import select
+
+from sma.infrastructure.persistence.models import AllocationSequenceCounterModel
+from sma.phase3_allocation.allocation_tx import (
+    AllocationRequest,
+    AtomicAllocator,
+    CounterBlockSequenceProvider,
+)
+from sma.phase3_allocation.uow import SQLAlchemyUnitOfWork
+
+from tests.phase3.conftest import FakeClock, StubPolicy, seed_batch_data
+
+
+def test_blocks_are_disjoint_across_workers(session_factory) -> None:
+    clock = FakeClock()
+    first = CounterBlockSequenceProvider(session_factory=session_factory, clock=clock, block_size=3)
+    second = CounterBlockSequenceProvider(session_factory=session_factory, clock=clock, block_size=3)
+    with session_factory() as session:
+        a = [item.allocation_id for item in first.reserve(session=session, count=2)]
+        b = [item.allocation_id for item in second.reserve(session=session, count=4)]
+        c = [item.allocation_id for item in first.reserve(session=session, count=2)]
+    assert a == [1, 2]
+    assert b == [4, 5, 6, 7]
+    assert c == [3, 8]
+    with session_factory() as session:
+        counter = session.execute(select(AllocationSequenceCounterModel)).scalar_one()
+        assert counter.last_value == 10
+
+
+def test_allocations_keep_legacy_code_and_seed_from_existing_rows(session_factory) -> None:
+    clock = FakeClock()
+    with session_factory() as session:
+        seed_batch_data(session, 3)
+    factory = lambda: SQLAlchemyUnitOfWork(session_factory=session_factory)  # noqa: E731
+    legacy = AtomicAllocator(
+        uow_factory=factory,
+        sequence_provider=CounterBlockSequenceProvider(session_factory=session_factory, clock=clock),
+        policy_engine=StubPolicy(),
+        clock=clock,
+    )
+    result = legacy.allocate(AllocationRequest(studentId="0012345678", mentorId="42"))
+    assert (result.allocation_id, result.allocation_code) == (1, "2500000001")
+
+    with session_factory() as session:
+        session.query(AllocationSequenceCounterModel).delete()
+        session.commit()
+    allocator = AtomicAllocator(
+        uow_factory=factory,
+        sequence_provider=CounterBlockSequenceProvider(session_factory=session_factory, clock=clock, block_size=5),
+        policy_engine=StubPolicy(),
+        clock=clock,
+    )
+    results = allocator.allocate_many(
+        [
+            AllocationRequest(studentId="0012345601", mentorId="42"),
+            AllocationRequest(studentId="0012345602", mentorId="42"),
+        ]
+    )
+    assert [r.allocation_code for r in results] == ["2500000002", "2500000003"]
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import zipfile
+from datetime import datetime
+from hashlib import sha256
+
+import httpx
+import pytest
+from fakeredis import FakeStrictRedis
+from prometheus_client import CollectorRegistry
+
+from sma.phase2_uploads.app import create_app
+from sma.phase2_uploads.clock import BAKU_TZ, FrozenClock
+from sma.phase2_uploads.config import UploadsConfig
+from sma.phase2_uploads.errors import UploadError
+from sma.phase2_uploads.metrics import UploadsMetrics
+from sma.phase2_uploads.multipart_stream import (
+    FormFileReader,
+    MultipartParser,
+    PartData,
+    PartEnd,
+    PartStart,
+)
+from sma.phase2_uploads.repository import create_sqlite_repository
+from sma.phase2_uploads.service import CHUNK_SIZE, UploadService
+from sma.phase2_uploads.storage import AtomicStorage
+from sma.phase2_uploads.validator import CSVValidator
+from sma.phase2_uploads.zip_utils import open_csv_from_zip
+
+HEADER = "student_id,school_code,mobile,national_id,first_name,last_name\r\n"
+
+
+class RequestBody(io.RawIOBase):
+    """Non-seekable body that records the largest read request."""
+
+    def __init__(self, payload: bytes) -> None:
+        self._payload = io.BytesIO(payload)
+        self.largest_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        self.largest_read = max(self.largest_read, size)
+        return self._payload.read(size)
+
+
+@pytest.fixture
+def streaming_service(tmp_path):
+    repositories = []
+
+    def _build(max_upload_bytes: int = 50 * 1024 * 1024) -> UploadService:
+        base_dir = tmp_path / f"streaming-{len(repositories)}"
+        config = UploadsConfig.from_dict(
+            {
+                "base_dir": base_dir,
+                "storage_dir": base_dir / "storage",
+                "manifest_dir": base_dir / "manifests",
+                "max_upload_bytes": max_upload_bytes,
+                "namespace": "streaming",
+            }
+        )
+        config.ensure_directories()
+        repository = create_sqlite_repository(str(base_dir / "uploads.db"))
+        repositories.append(repository)
+        return UploadService(
+            config=config,
+            repository=repository,
+            storage=AtomicStorage(config.storage_dir),
+            validator=CSVValidator(),
+            redis_client=FakeStrictRedis(),
+            metrics=UploadsMetrics(CollectorRegistry()),
+            clock=FrozenClock(datetime(2024, 1, 1, tzinfo=BAKU_TZ)),
+        )
+
+    yield _build
+    for repository in repositories:
+        repository.engine.dispose()
+
+
+def _payload(rows: int) -> bytes:
+    body = "".join(f"{idx},123,09123456789,0012345678,مینا,یوسفی\r\n" for idx in range(1, rows + 1))
+    return (HEADER + body).encode("utf-8")
+
+
+def test_request_body_streams_into_storage_in_chunks(streaming_service) -> None:
+    service = streaming_service()
+    payload = _payload(120_000)
+    body = RequestBody(payload)
+    digest, path, size, validation = service._write_csv(service._iter_stream(body))
+    assert digest == sha256(payload).hexdigest()
+    assert size == len(payload)
+    assert body.largest_read == CHUNK_SIZE
+    assert path.read_bytes() == payload
+    assert validation == service.validator.validate(path)
+    assert validation.record_count == 120_000
+
+
+def test_non_seekable_zip_is_spooled_and_member_streamed(streaming_service) -> None:
+    service = streaming_service()
+    payload = _payload(50)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("roster.csv", payload)
+    spooled = service._spool_zip(RequestBody(archive.getvalue()))
+    try:
+        name, stream = open_csv_from_zip(spooled)
+        assert name == "roster.csv"
+        assert b"".join(stream) == payload
+        # Replaying the member (e.g. on a storage retry) starts from the top.
+        digest, _, _, validation = service._write_csv(iter(stream))
+    finally:
+        spooled.close()
+    assert digest == sha256(payload).hexdigest()
+    assert validation.record_count == 50
+
+
+def test_oversized_stream_aborts_without_partials(streaming_service) -> None:
+    service = streaming_service(max_upload_bytes=128)
+    with pytest.raises(UploadError) as exc:
+        service._write_csv(service._iter_stream(RequestBody(_payload(10))))
+    assert exc.value.envelope.code == "UPLOAD_SIZE_EXCEEDED"
+    assert not list((service.storage.base_dir / "tmp").glob("*.part"))
+    with pytest.raises(UploadError) as zip_exc:
+        service._spool_zip(RequestBody(b"PK" * 100))
+    assert zip_exc.value.envelope.code == "UPLOAD_SIZE_EXCEEDED"
+
+
+ROW = "1,123,09123456789,0012345678,مینا,یوسفی".encode("utf-8")
+
+
+@pytest.mark.parametrize(
+    ("tail", "valid"),
+    [
+        ([ROW + b"\r\n"], True),
+        ([ROW + b"\r", b"\n" + ROW + b"\r\n"], True),
+        ([ROW, b"\r\n", b"", ROW], True),
+        ([ROW, b"\n"], False),
+        ([b"\n"], False),
+        ([ROW + b"\r\r\n\n"], False),
+        ([ROW + b"\r\n", b"", b"\n"], False),
+    ],
+)
+def test_crlf_validation_across_chunk_boundaries(streaming_service, tail, valid) -> None:
+    service = streaming_service()
+    chunks = [HEADER.encode("utf-8"), *tail]
+    if valid:
+        _, path, _, _ = service._write_csv(iter(chunks))
+        assert path.read_bytes() == b"".join(chunks)
+        return
+    with pytest.raises(UploadError) as exc:
+        service._write_csv(iter(chunks))
+    assert exc.value.envelope.details == {"reason": "CRLF_REQUIRED"}
+    assert not list((service.storage.base_dir / "tmp").glob("*.part"))
+
+
+def test_single_pass_validation_errors_abort_the_write(streaming_service) -> None:
+    service = streaming_service()
+    chunks = [HEADER.encode("utf-8"), ROW + b"\r\n", "2,0,09123456789,1,=cmd,x\r\n".encode("utf-8")]
+    with pytest.raises(UploadError) as exc:
+        service._write_csv(iter(chunks))
+    assert exc.value.envelope.details == {"reason": "FORMULA_GUARD", "row": 3}
+    assert not list((service.storage.base_dir / "tmp").glob("*.part"))
+    assert not (service.storage.base_dir / "sha256").exists()
+
+    with pytest.raises(UploadError) as utf8:
+        service._write_csv(iter([HEADER.encode("utf-8"), b"\xff\xfe\r\n"]))
+    assert utf8.value.envelope.details == {"reason": "UTF8_REQUIRED"}
+
+
+
+BOUNDARY = "----streamed-upload"
+
+
+def _field(name: str, value: str) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+        f"{value}\r\n"
+    ).encode("utf-8")
+
+
+def _file(filename: str, payload: bytes) -> bytes:
+    header = (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+    ).encode("utf-8")
+    return header + payload + b"\r\n"
+
+
+def _closing() -> bytes:
+    return f"--{BOUNDARY}--\r\n".encode("utf-8")
+
+
+def test_multipart_parser_handles_arbitrary_chunking() -> None:
+    payload = _payload(20)
+    body = _field("profile", "ROSTER_V1") + _file("r.csv", payload) + _closing()
+    parser = MultipartParser(BOUNDARY.encode("utf-8"))
+    events = []
+    for offset in range(0, len(body), 7):
+        events.extend(parser.feed(body[offset : offset + 7]))
+    parser.close()
+    starts = [event for event in events if isinstance(event, PartStart)]
+    assert starts == [PartStart("profile", None), PartStart("file", "r.csv")]
+    file_index = events.index(starts[1])
+    data = b"".join(event.data for event in events[file_index:] if isinstance(event, PartData))
+    assert data == payload
+    assert sum(isinstance(event, PartEnd) for event in events) == 2
+
+
+@pytest.fixture
+def upload_client(streaming_service):
+    base = streaming_service()
+    app = create_app(
+        config=base.config,
+        repository=base.repository,
+        redis_client=FakeStrictRedis(),
+        clock=FrozenClock(datetime(2024, 1, 1, tzinfo=BAKU_TZ)),
+        registry=CollectorRegistry(),
+    )
+    service = app.state.upload_service
+    sources: list[type] = []
+    upload = service.upload
+
+    def recording_upload(context, file_obj):
+        sources.append(type(file_obj))
+        return upload(context, file_obj)
+
+    service.upload = recording_upload
+
+    def post(body: bytes, *, chunk_size: int = 64 * 1024) -> httpx.Response:
+        async def chunks():
+            for offset in range(0, len(body), chunk_size):
+                yield body[offset : offset + chunk_size]
+
+        async def send() -> httpx.Response:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+                return await client.post(
+                    "/uploads",
+                    content=chunks(),
+                    headers={
+                        "content-type": f"multipart/form-data; boundary={BOUNDARY}",
+                        "Idempotency-Key": f"idem-{len(sources)}-{len(body)}",
+                    },
+                )
+
+        return asyncio.run(send())
+
+    return post, service, sources
+
+
+def test_http_upload_streams_request_body_into_service(upload_client) -> None:
+    post, service, sources = upload_client
+    payload = _payload(30_000)
+    body = _field("profile", "ROSTER_V1") + _field("year", "1402") + _file("r.csv", payload) + _closing()
+    response = post(body, chunk_size=65_537)
+    assert response.status_code == 200, response.text
+    manifest = response.json()["manifest"]
+    assert manifest["sha256"] == sha256(payload).hexdigest()
+    assert manifest["record_count"] == 30_000
+    assert manifest["size_bytes"] == len(payload)
+    assert sources == [FormFileReader]
+    stored = service.storage.base_dir / "sha256" / f"{manifest['sha256']}.csv"
+    assert stored.read_bytes() == payload
+
+
+def test_http_upload_spools_when_fields_follow_the_file(upload_client) -> None:
+    post, _service, sources = upload_client
+    payload = _payload(10)
+    body = _file("r.csv", payload) + _field("profile", "ROSTER_V1") + _field("year", "1401") + _closing()
+    response = post(body, chunk_size=100)
+    assert response.status_code == 200, response.text
+    assert response.json()["manifest"]["record_count"] == 10
+    assert sources and sources[0] is not FormFileReader
+
+
+def test_http_upload_rejects_second_file_after_streaming(upload_client) -> None:
+    post, service, _sources = upload_client
+    payload = _payload(5)
+    body = (
+        _field("profile", "ROSTER_V1")
+        + _field("year", "1402")
+        + _file("one.csv", payload)
+        + _file("two.csv", payload)
+        + _closing()
+    )
+    response = post(body, chunk_size=50)
+    assert response.status_code == 400
+    assert response.json()["code"] == "UPLOAD_MULTIPART_FILE_COUNT"
+    assert not (service.storage.base_dir / "sha256").exists()
+    assert not list((service.storage.base_dir / "tmp").glob("*.part"))